@@ -1,2 +1,11 @@
-from ._syringe import Syringe
-from ._flow_experiment import FlowExperiment
+from FlowCalc._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "Syringe": "._syringe",
+        "StepProfile": "._step_profile",
+        "Precision": "._precision",
+        "FlowExperiment": "._flow_experiment",
+    },
+)
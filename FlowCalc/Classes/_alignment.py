@@ -0,0 +1,109 @@
+import numpy as np
+from FlowCalc.Utils import units
+from ._step_profile import StepProfile
+
+
+def _shares_time_axis(syringes):
+    """
+    Check whether all syringes have the same time axis in the same unit.
+
+    Parameters
+    ----------
+    syringes: list[Syringe]
+
+    Returns
+    -------
+    shared: bool
+    """
+
+    if any(syringe.cycles > 1 for syringe in syringes):
+        # Repeated cycles are only expanded when the profiles are aligned.
+        return False
+
+    first = syringes[0]
+    for syringe in syringes[1:]:
+        if syringe.time_unit != first.time_unit:
+            return False
+        if syringe.time is first.time:
+            continue
+        if not np.array_equal(syringe.time, first.time):
+            return False
+
+    return True
+
+
+def _step_profile_in_unit(syringe, time_unit):
+    """
+    Get the whole flow profile of a syringe, with all of its cycles, as a
+    StepProfile with its breakpoints converted to time_unit.
+
+    Parameters
+    ----------
+    syringe: Syringe
+    time_unit: str
+
+    Returns
+    -------
+    step_profile: StepProfile
+    """
+
+    step_profile = syringe.unrolled_step_profile()
+
+    if syringe.time_unit == time_unit:
+        return step_profile
+
+    breakpoints = units.convert(step_profile.breakpoints, syringe.time_unit, time_unit)
+    end = units.convert(step_profile.end, syringe.time_unit, time_unit)
+
+    return StepProfile(breakpoints, step_profile.values, end=end)
+
+
+def align_profiles(syringes: dict):
+    """
+    Express the flow profiles of a set of syringes on one time axis.
+
+    If the syringes share a time axis, their flow profiles are returned as
+    they are. Otherwise, the time axis is the sorted union of the time points
+    of all syringes, and each flow profile is resampled onto it as a
+    piecewise constant function (zero outside the time span of the
+    syringe). If the syringes use different time units, the union is
+    expressed in seconds.
+
+    Parameters
+    ----------
+    syringes: dict[str, Syringe]
+
+    Returns
+    -------
+    time: numpy.ndarray
+    time_unit: str
+    profiles: dict[str, numpy.ndarray]
+        {syringe name: flow profile on time}, each in its syringe's flow
+        unit.
+    """
+
+    syringe_list = [syringes[s] for s in syringes]
+
+    if len(syringe_list) == 0:
+        raise ValueError("No syringes to align.")
+
+    if _shares_time_axis(syringe_list):
+        first = syringe_list[0]
+        profiles = {s: np.asarray(syringes[s].flow_profile) for s in syringes}
+        return np.asarray(first.time), first.time_unit, profiles
+
+    time_units = {syringe.time_unit for syringe in syringe_list}
+    if len(time_units) == 1:
+        time_unit = time_units.pop()
+    else:
+        time_unit = units.SI_unit(syringe_list[0].time_unit)
+
+    step_profiles = {s: _step_profile_in_unit(syringes[s], time_unit) for s in syringes}
+
+    time = np.unique(
+        np.concatenate([step_profiles[s].breakpoints for s in step_profiles])
+    )
+
+    profiles = {s: step_profiles[s].sample(time) for s in step_profiles}
+
+    return time, time_unit, profiles
@@ -1,9 +1,12 @@
 import sys
 import numpy as np
+from FlowCalc.Utils import units
+from ._syringe import Syringe
+from ._alignment import align_profiles
 
 
 class FlowExperiment:
-    def __init__(self, exp_name, syringe_set=[]):
+    def __init__(self, exp_name, syringe_set=[], columnar=False):
         """
         An object to store experimental information.
 
@@ -11,12 +14,29 @@ class FlowExperiment:
         ----------
         exp_name: str
             A name for the experiment.
+        syringe_set: list[Syringe]
+            Syringes to add to the experiment.
+        columnar: bool
+            If True, the flow profiles of the syringes are stored in a single
+            (n_syringes, n_steps) float64 matrix which shares one time axis.
+            See FlowExperiment.make_columnar().
 
         Attributes
         ----------
         self.name: str
         self.reactor_volume: float
         self.syringes: dict
+        self.columnar: bool
+        self.time: numpy.ndarray or None
+            Shared time axis (columnar mode only).
+        self.time_unit: str
+            Unit of the shared time axis (columnar mode only).
+        self.flow_matrix: numpy.ndarray or None
+            Flow profiles, one row per syringe (columnar mode only), stored
+            as set by self.precision.
+        self.precision: Precision or None
+            How the flow rates of all syringes are stored, see
+            FlowExperiment.set_precision().
         """
 
         self.name = exp_name
@@ -31,10 +51,69 @@ class FlowExperiment:
         else:
             self.syringes = {s.name: s for s in syringe_set}
 
+        self.columnar = False
+        self.time = None
+        self.time_unit = ""
+        self.flow_matrix = None
+        self.precision = None
+
+        # Results derived from the syringes, see FlowExperiment._cached().
+        self._cache = {}
+        self._cache_key = None
+
+        if columnar and len(self.syringes) > 0:
+            self.make_columnar()
+        else:
+            self.columnar = columnar
+
+    @classmethod
+    def from_flow_matrix(
+        cls, exp_name, time_vals, time_unit, names, flow_matrix, flow_unit
+    ):
+        """
+        Create a columnar experiment directly from a matrix of flow profiles.
+        The syringes of the experiment are views into flow_matrix, so no
+        per-syringe arrays are created.
+
+        Parameters
+        ----------
+        exp_name: str
+            A name for the experiment.
+        time_vals: array
+            Time axis shared by all of the flow profiles.
+        time_unit: str
+            Time axis unit.
+        names: list[str]
+            Syringe names, one for each row of flow_matrix.
+        flow_matrix: array
+            (n_syringes, n_steps) array of flow rates.
+        flow_unit: str
+            Flow rate unit of all of the flow profiles.
+
+        Returns
+        -------
+        experiment: FlowExperiment
+        """
+
+        experiment = cls(exp_name)
+
+        for name in names:
+            syringe = Syringe(name)
+            syringe.time_unit = time_unit
+            syringe.flow_unit = flow_unit
+            experiment.add_syringe(syringe)
+
+        experiment._pack(time_vals, time_unit, flow_matrix)
+
+        return experiment
+
     def add_syringe(self, syringe):
         """
         Add a Syringe object to the experiment.
 
+        In columnar mode, the syringe is packed into the flow matrix the next
+        time the matrix is requested.
+
         Parameters
         ----------
         syringe: Syringe object
@@ -45,4 +124,502 @@ class FlowExperiment:
         None
         """
 
+        if self.precision is not None and syringe.precision != self.precision:
+            syringe.set_precision(self.precision)
+
         self.syringes[syringe.name] = syringe
+
+    def set_precision(self, precision):
+        """
+        Set how the flow rates of all syringes of the experiment, including
+        those added later, are stored (see FlowCalc.Classes.Precision).
+
+        float32 halves the memory of the flow profiles, and int16 fixed
+        point counts quarter it. Conversions, processing and the writers
+        work on the stored values, so the results differ from float64 by
+        at most Precision.error_bound() of the flow rates.
+
+        Parameters
+        ----------
+        precision: Precision or None
+            If None, flow profiles are stored as they are given.
+
+        Returns
+        -------
+        None
+        """
+
+        if self.columnar and self._is_packed():
+            time, matrix = self.stacked_profiles()
+            self.precision = precision
+            self._pack(time, self.time_unit, matrix)
+            return
+
+        for s in self.syringes:
+            self.syringes[s].set_precision(precision)
+
+        self.precision = precision
+
+    def make_columnar(self):
+        """
+        Switch the experiment to columnar storage.
+
+        The flow profiles of all syringes are copied once into a contiguous
+        (n_syringes, n_steps) float64 matrix, and a single time axis is kept
+        for the experiment. Afterwards, each Syringe's flow_profile is a row
+        view into the matrix and its time (and timesteps) are the shared
+        arrays, so writing to a syringe's profile writes to the matrix.
+
+        All syringes must have flow profiles of the same length, expressed on
+        the same time axis and in the same time unit.
+
+        Returns
+        -------
+        None
+        """
+
+        time, matrix = self._stack_syringes()
+
+        a_syringe = self.syringes[list(self.syringes)[-1]]
+
+        self._pack(time, a_syringe.time_unit, matrix)
+
+    def stacked_profiles(self):
+        """
+        Get the shared time axis and the flow profiles of all syringes as a
+        (n_syringes, n_steps) matrix, with rows in the order of
+        self.syringes.
+
+        In columnar mode, the experiment's own arrays are returned without
+        copying (syringes which have been added or re-assigned since the
+        last call are packed first). Otherwise, the matrix is built by
+        stacking the syringe flow profiles.
+
+        Returns
+        -------
+        time: numpy.ndarray
+            Time axis, in the time unit of the syringes.
+        matrix: numpy.ndarray
+            Flow profiles, one row per syringe, each in its syringe's flow
+            unit.
+        """
+
+        if not self.columnar:
+            return self._stack_syringes()
+
+        if not self._is_packed():
+            self.make_columnar()
+
+        if self.precision is not None:
+            return self.time, self.precision.decode(self.flow_matrix)
+
+        return self.time, self.flow_matrix
+
+    def aligned_profiles(self):
+        """
+        Get the flow profiles of all syringes on a single time axis.
+
+        If the syringes share a time axis, it is used as it is. Otherwise the
+        syringes' time points are merged into one sorted axis and each flow
+        profile is resampled onto it as a step function (see
+        FlowCalc.Classes._alignment.align_profiles()).
+
+        The result is cached until a syringe is added, replaced or given a
+        new flow profile. Call FlowExperiment.invalidate() after modifying
+        flow profile arrays in place.
+
+        Returns
+        -------
+        time: numpy.ndarray
+            Shared time axis.
+        time_unit: str
+            Unit of time.
+        profiles: dict[str, numpy.ndarray]
+            {syringe name: flow profile on time}, each in its syringe's flow
+            unit.
+        """
+
+        return self._cached("aligned_profiles", lambda: align_profiles(self.syringes))
+
+    @property
+    def time_SI(self):
+        """
+        Time axis of FlowExperiment.aligned_profiles() in seconds.
+
+        Returns
+        -------
+        time: numpy.ndarray
+        """
+
+        def compute():
+            time, time_unit, _ = self.aligned_profiles()
+            return units.to_SI(time, time_unit)
+
+        return self._cached("time_SI", compute)
+
+    @property
+    def timesteps_SI(self):
+        """
+        Duration of each step of FlowExperiment.time_SI in seconds. The last
+        step lasts until the latest end of the syringes' last steps (see
+        Syringe.end_time()). Syringes without timesteps for each point of
+        their time axis are taken to hold their last step for as long as
+        the one preceding it.
+
+        Returns
+        -------
+        timesteps: numpy.ndarray
+        """
+
+        def compute():
+            time = self.time_SI
+            if len(time) < 2:
+                end = time[-1] if len(time) > 0 else 0.0
+            else:
+                end = 2 * time[-1] - time[-2]
+            step_ends = [
+                units.to_SI(syringe.end_time(), syringe.time_unit)
+                for syringe in self.syringes.values()
+                if syringe.step_profile is not None
+                or syringe.cycles > 1
+                or syringe._has_timesteps()
+            ]
+            if 0 < len(step_ends) == len(self.syringes):
+                end = max(step_ends)
+            elif len(step_ends) > 0:
+                end = max(end, *step_ends)
+            return np.diff(time, append=end)
+
+        return self._cached("timesteps_SI", compute)
+
+    @property
+    def total_flow(self):
+        """
+        Sum of the flow rates of all syringes at each point of
+        FlowExperiment.time_SI, in L/s.
+
+        Returns
+        -------
+        total_flow: numpy.ndarray
+        """
+
+        def compute():
+            _, _, profiles = self.aligned_profiles()
+            total_flow = np.zeros(len(self.time_SI))
+            si_flow = np.empty(len(self.time_SI))
+            for s in self.syringes:
+                units.to_SI(profiles[s], self.syringes[s].flow_unit, out=si_flow)
+                total_flow += si_flow
+            return total_flow
+
+        return self._cached("total_flow", compute)
+
+    @property
+    def residence_time(self):
+        """
+        Reactor volume divided by the total flow rate at each point of
+        FlowExperiment.time_SI, in s.
+
+        Returns
+        -------
+        residence_time: numpy.ndarray
+        """
+
+        def compute():
+            reactor_volume = units.to_SI(self.reactor_volume, self.reactor_volume_unit)
+            with np.errstate(divide="ignore"):
+                return reactor_volume / self.total_flow
+
+        return self._cached("residence_time", compute)
+
+    @property
+    def step_volumes(self):
+        """
+        Volume dispensed by each syringe during each step of
+        FlowExperiment.time_SI, in L.
+
+        Returns
+        -------
+        step_volumes: dict[str, numpy.ndarray]
+        """
+
+        def compute():
+            _, _, profiles = self.aligned_profiles()
+            step_volumes = {}
+            for s in self.syringes:
+                volume = units.to_SI(profiles[s], self.syringes[s].flow_unit)
+                volume *= self.timesteps_SI
+                step_volumes[s] = volume
+            return step_volumes
+
+        return self._cached("step_volumes", compute)
+
+    @property
+    def total_step_volume(self):
+        """
+        Volume dispensed by all syringes during each step of
+        FlowExperiment.time_SI, in L.
+
+        Returns
+        -------
+        total_step_volume: numpy.ndarray
+        """
+
+        return self._cached(
+            "total_step_volume", lambda: self.total_flow * self.timesteps_SI
+        )
+
+    @property
+    def dispensed_volume(self):
+        """
+        Cumulative volume dispensed by each syringe by the end of each step of
+        FlowExperiment.time_SI, in L.
+
+        Returns
+        -------
+        dispensed_volume: dict[str, numpy.ndarray]
+        """
+
+        def compute():
+            step_volumes = self.step_volumes
+            return {s: np.cumsum(step_volumes[s]) for s in step_volumes}
+
+        return self._cached("dispensed_volume", compute)
+
+    @property
+    def total_dispensed_volume(self):
+        """
+        Cumulative volume dispensed by all syringes by the end of each step of
+        FlowExperiment.time_SI, in L.
+
+        Returns
+        -------
+        total_dispensed_volume: numpy.ndarray
+        """
+
+        return self._cached(
+            "total_dispensed_volume", lambda: np.cumsum(self.total_step_volume)
+        )
+
+    @property
+    def consumed_moles(self):
+        """
+        Cumulative amount of reagent dispensed by each syringe by the end of
+        each step of FlowExperiment.time_SI, in mol. Only syringes with a
+        concentration in molar units are included.
+
+        Returns
+        -------
+        consumed_moles: dict[str, numpy.ndarray]
+        """
+
+        def compute():
+            dispensed_volume = self.dispensed_volume
+            consumed_moles = {}
+            for s in self.syringes:
+                syringe = self.syringes[s]
+                if not units.is_known_unit(syringe.conc_unit):
+                    continue
+                if units.SI_unit(syringe.conc_unit) != "M":
+                    continue
+                concentration = units.to_SI(syringe.concentration, syringe.conc_unit)
+                consumed_moles[s] = concentration * dispensed_volume[s]
+            return consumed_moles
+
+        return self._cached("consumed_moles", compute)
+
+    def invalidate(self):
+        """
+        Discard cached results derived from the syringes.
+
+        Returns
+        -------
+        None
+        """
+
+        self._cache = {}
+        self._cache_key = None
+
+    def _cached(self, name, compute):
+        """
+        Get a result derived from the experiment, computing it if it has not
+        been computed since the experiment last changed.
+
+        Parameters
+        ----------
+        name: str
+            Name of the result.
+        compute: Callable[[], Any]
+            Function computing the result.
+
+        Returns
+        -------
+        result: Any
+        """
+
+        key = self._state_key()
+        if key != self._cache_key:
+            self._cache = {}
+            self._cache_key = key
+
+        if name not in self._cache:
+            self._cache[name] = compute()
+
+        return self._cache[name]
+
+    def _state_key(self):
+        """
+        Get a value which changes whenever the syringes of the experiment,
+        their flow profiles, or the reactor volume change.
+
+        Returns
+        -------
+        key: tuple
+        """
+
+        syringe_keys = tuple(
+            (s, id(syringe), syringe.version, syringe.time_unit, syringe.flow_unit)
+            for s, syringe in self.syringes.items()
+        )
+
+        return (syringe_keys, self.reactor_volume, self.reactor_volume_unit)
+
+    def _is_packed(self):
+        """
+        Check whether every syringe is still a view into the flow matrix.
+
+        Returns
+        -------
+        packed: bool
+        """
+
+        if self.flow_matrix is None:
+            return False
+
+        if self.flow_matrix.shape[0] != len(self.syringes):
+            return False
+
+        for c, s in enumerate(self.syringes):
+            syringe = self.syringes[s]
+            if syringe.time is not self.time:
+                return False
+            profile = syringe.stored_flow_profile
+            if getattr(profile, "base", None) is not self.flow_matrix:
+                return False
+            if profile.ctypes.data != self.flow_matrix[c].ctypes.data:
+                return False
+
+        return True
+
+    def _stack_syringes(self):
+        """
+        Stack the flow profiles of the syringes into a new matrix.
+
+        All of the flow profiles must share the same time axis, which is
+        returned.
+
+        Returns
+        -------
+        time: numpy.ndarray
+        matrix: numpy.ndarray
+        """
+
+        if len(self.syringes) == 0:
+            raise ValueError(f"Experiment {self.name} does not contain any syringes.")
+
+        time_units = {self.syringes[s].time_unit for s in self.syringes}
+        if len(time_units) > 1:
+            raise ValueError(
+                f"Experiment {self.name}: syringes have different time units "
+                f"{sorted(time_units)}, a shared time axis cannot be built."
+            )
+
+        # The stored arrays give the lengths without decoding the profiles.
+        lengths = {len(self.syringes[s].stored_flow_profile) for s in self.syringes}
+        if len(lengths) > 1:
+            raise ValueError(
+                f"Experiment {self.name}: flow profiles have different lengths "
+                f"{sorted(lengths)}, a shared time axis cannot be built."
+            )
+
+        a_syringe = self.syringes[list(self.syringes)[-1]]
+
+        time = np.asarray(a_syringe.time)
+        for s in self.syringes:
+            if not np.array_equal(self.syringes[s].time, time):
+                raise ValueError(
+                    f"Experiment {self.name}: syringes {s} and {a_syringe.name} "
+                    "have different time axes, a shared time axis cannot be "
+                    "built."
+                )
+        dtype = np.float64 if self.precision is None else self.precision.float_dtype
+        matrix = np.stack(
+            [self.syringes[s].flow_profile for s in self.syringes], axis=0
+        ).astype(dtype, copy=False)
+
+        return time, matrix
+
+    def _pack(self, time_vals, time_unit, flow_matrix, end=None):
+        """
+        Make the experiment own time_vals and flow_matrix and point each
+        syringe at them.
+
+        Parameters
+        ----------
+        time_vals: array
+        time_unit: str
+        flow_matrix: array
+            (n_syringes, n_steps) array, rows in the order of self.syringes.
+        end: float or None
+            End of the last step, in time_unit. If None, the last step is
+            held for as long as the one preceding it.
+
+        Returns
+        -------
+        None
+        """
+
+        if self.precision is not None:
+            matrix = np.ascontiguousarray(self.precision.encode(flow_matrix))
+            if matrix.base is not None:
+                matrix = matrix.copy()
+        elif isinstance(flow_matrix, np.memmap):
+            matrix = flow_matrix
+        else:
+            matrix = np.ascontiguousarray(flow_matrix, dtype=np.float64)
+            if matrix.base is not None:
+                matrix = matrix.copy()
+
+        if matrix.ndim != 2 or matrix.shape[0] != len(self.syringes):
+            raise ValueError(
+                f"Experiment {self.name}: flow matrix of shape {matrix.shape} "
+                f"does not match {len(self.syringes)} syringes."
+            )
+
+        time = np.asarray(time_vals, dtype=np.float64)
+        if len(time) != matrix.shape[1]:
+            raise ValueError(
+                f"Experiment {self.name}: time axis of length {len(time)} "
+                f"does not match flow profiles of length {matrix.shape[1]}."
+            )
+
+        self.columnar = True
+        self.time = time
+        self.time_unit = time_unit
+        self.flow_matrix = matrix
+
+        timesteps = None
+        if end is not None:
+            timesteps = np.diff(self.time, append=end)
+
+        for c, s in enumerate(self.syringes):
+            syringe = self.syringes[s]
+            syringe.time = self.time
+            syringe.time_unit = time_unit
+            syringe.precision = self.precision
+            syringe.store_flow_profile(self.flow_matrix[c])
+            if timesteps is None:
+                syringe.calculate_timesteps()
+                timesteps = syringe.timesteps
+            else:
+                syringe.timesteps = timesteps
@@ -0,0 +1,185 @@
+import numpy as np
+
+FLOAT_STORAGE = ("float64", "float32")
+
+
+class Precision:
+    def __init__(self, storage="float64", resolution=None, count_dtype="int32"):
+        """
+        How the flow rates of syringes are stored.
+
+        storage is one of:
+
+        "float64"
+            Values are stored as they are, as float64. The representation
+            error of a value v is at most |v| * 2**-53 (about 1.1e-16 |v|).
+        "float32"
+            Half the memory of float64. The representation error of a value v
+            is at most |v| * 2**-24 (about 6e-8 |v|), far below the
+            resolution of syringe pumps.
+        "fixed"
+            Values are stored as integer counts of resolution (e.g. the flow
+            resolution of the pump, see FlowCalc.Utils.pump.PumpModel). The
+            representation error is at most resolution / 2, and values must
+            not exceed the range of count_dtype times resolution. With int16
+            counts, a quarter of the memory of float64.
+
+        Times are always stored as float64: in float32, times of a week-long
+        experiment would be rounded to steps comparable to the 0.1 s
+        resolution of the Cetoni software.
+
+        Parameters
+        ----------
+        storage: str
+            "float64", "float32" or "fixed".
+        resolution: float or None
+            Size of one count, in the flow unit of each syringe. Required for
+            "fixed" storage.
+        count_dtype: str
+            Integer type of the counts, for "fixed" storage.
+
+        Attributes
+        ----------
+        self.storage: str
+        self.resolution: float or None
+        self.dtype: numpy.dtype
+            Type of the stored arrays.
+        self.float_dtype: numpy.dtype
+            Type of the flow rates obtained from the stored arrays.
+        """
+
+        if storage in FLOAT_STORAGE:
+            self.dtype = np.dtype(storage)
+            self.float_dtype = self.dtype
+            resolution = None
+        elif storage == "fixed":
+            if resolution is None or not resolution > 0:
+                raise ValueError(
+                    "A positive resolution is required for fixed point storage."
+                )
+            self.dtype = np.dtype(count_dtype)
+            if self.dtype.kind != "i":
+                raise ValueError("count_dtype must be a signed integer type.")
+            self.float_dtype = np.dtype(np.float64)
+        else:
+            raise ValueError(
+                f"Unknown storage {storage}, expected one of "
+                f"{FLOAT_STORAGE + ('fixed',)}."
+            )
+
+        self.storage = storage
+        self.resolution = resolution
+
+        # Dividing counts by a whole number of counts per unit, rather than
+        # multiplying by the resolution, gives the closest float to values
+        # such as 3 * 0.01.
+        self._per_unit = None
+        if resolution is not None:
+            per_unit = round(1 / resolution)
+            if per_unit > 0 and abs(per_unit * resolution - 1) < 1e-12:
+                self._per_unit = per_unit
+
+    def __repr__(self):
+        if self.storage == "fixed":
+            return (
+                f"Precision('fixed', resolution={self.resolution}, "
+                f"count_dtype='{self.dtype}')"
+            )
+        return f"Precision('{self.storage}')"
+
+    def __eq__(self, other):
+        if not isinstance(other, Precision):
+            return NotImplemented
+        return (self.storage, self.resolution, self.dtype) == (
+            other.storage,
+            other.resolution,
+            other.dtype,
+        )
+
+    def __hash__(self):
+        return hash((self.storage, self.resolution, self.dtype))
+
+    def encode(self, values):
+        """
+        Convert flow rates to the stored representation. Arrays which are
+        already of a float storage type are not copied.
+
+        Parameters
+        ----------
+        values: array
+
+        Returns
+        -------
+        stored: numpy.ndarray
+        """
+
+        if self.storage != "fixed":
+            return np.asarray(values, dtype=self.dtype)
+
+        counts = np.rint(np.divide(values, self.resolution, dtype=np.float64))
+
+        limits = np.iinfo(self.dtype)
+        if counts.size > 0 and (counts.min() < limits.min or counts.max() > limits.max):
+            raise OverflowError(
+                f"Flow rates exceed the range of {self.dtype} counts of "
+                f"{self.resolution}."
+            )
+
+        return counts.astype(self.dtype)
+
+    def decode(self, stored):
+        """
+        Convert a stored representation to flow rates.
+
+        Parameters
+        ----------
+        stored: numpy.ndarray
+
+        Returns
+        -------
+        values: numpy.ndarray
+            Of type self.float_dtype. For float storage, stored itself.
+        """
+
+        if self.storage != "fixed":
+            return stored
+
+        if self._per_unit is not None:
+            return np.divide(stored, self._per_unit, dtype=np.float64)
+
+        return np.multiply(stored, self.resolution, dtype=np.float64)
+
+    def round(self, values):
+        """
+        Round flow rates to the values which can be stored.
+
+        Parameters
+        ----------
+        values: array
+
+        Returns
+        -------
+        values: numpy.ndarray
+        """
+
+        return self.decode(self.encode(values))
+
+    def error_bound(self, magnitude):
+        """
+        Largest difference between a flow rate and its stored value.
+
+        Parameters
+        ----------
+        magnitude: float or array
+            Largest magnitude of the flow rates.
+
+        Returns
+        -------
+        error: float or numpy.ndarray
+            In the unit of magnitude.
+        """
+
+        if self.storage == "fixed":
+            return self.resolution / 2
+
+        return np.abs(magnitude) * np.finfo(self.dtype).epsneg
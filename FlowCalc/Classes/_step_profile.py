@@ -0,0 +1,270 @@
+import numpy as np
+
+
+class StepProfile:
+    def __init__(self, breakpoints, values, end=None):
+        """
+        A piecewise constant (run-length encoded) flow profile.
+
+        Each value is held from its breakpoint until the next breakpoint, and
+        the final value is held until end.
+
+        Parameters
+        ----------
+        breakpoints: array
+            Strictly increasing start times of the steps.
+        values: array
+            Flow rate held during each step.
+        end: float or None
+            Time at which the final step ends. If None, the final step is
+            held for as long as the one preceding it (as in
+            Syringe.calculate_timesteps()).
+
+        Attributes
+        ----------
+        self.breakpoints: numpy.ndarray
+        self.values: numpy.ndarray
+        self.end: float
+        """
+
+        breakpoints = np.asarray(breakpoints)
+        values = np.asarray(values)
+
+        if breakpoints.ndim != 1 or breakpoints.shape != values.shape:
+            raise ValueError(
+                "breakpoints and values must be 1D arrays of equal length."
+            )
+
+        if len(breakpoints) == 0:
+            raise ValueError("A StepProfile requires at least one step.")
+
+        if np.any(np.diff(breakpoints) <= 0):
+            raise ValueError("breakpoints must be strictly increasing.")
+
+        if end is None:
+            if len(breakpoints) < 2:
+                raise ValueError("end must be given for a single step profile.")
+            end = breakpoints[-1] + (breakpoints[-1] - breakpoints[-2])
+
+        if end <= breakpoints[-1]:
+            raise ValueError("end must be after the final breakpoint.")
+
+        self.breakpoints = breakpoints
+        self.values = values
+        self.end = end
+
+    @classmethod
+    def from_dense(cls, time, flow_profile, tolerance=0.0):
+        """
+        Run-length encode a flow profile sampled at the points in time.
+
+        Parameters
+        ----------
+        time: array
+            Time values of the samples.
+        flow_profile: array
+            Flow rate values of the samples.
+        tolerance: float
+            Changes between consecutive flow values with a magnitude not
+            exceeding tolerance do not start a new step.
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        time = np.asarray(time)
+        flow_profile = np.asarray(flow_profile)
+
+        if len(time) < 2:
+            raise ValueError("At least two samples are required.")
+
+        end = time[-1] + (time[-1] - time[-2])
+
+        delta = np.abs(np.diff(flow_profile))
+        starts = np.hstack(([0], np.flatnonzero(delta > tolerance) + 1))
+
+        return cls(time[starts], flow_profile[starts], end=end)
+
+    def __len__(self):
+        return len(self.breakpoints)
+
+    @property
+    def durations(self):
+        """
+        Duration of each step.
+
+        Returns
+        -------
+        durations: numpy.ndarray
+        """
+
+        return np.diff(self.breakpoints, append=self.end)
+
+    @property
+    def start(self):
+        return self.breakpoints[0]
+
+    def sample(self, time):
+        """
+        Expand the profile onto the points in time.
+
+        Parameters
+        ----------
+        time: array
+            Times at which to evaluate the profile.
+
+        Returns
+        -------
+        flow_profile: numpy.ndarray
+            Flow rate at each time; zero before the first breakpoint and
+            from the end of the profile onwards.
+        """
+
+        time = np.asarray(time)
+
+        idx = np.searchsorted(self.breakpoints, time, side="right") - 1
+        inside = (idx >= 0) & (time < self.end)
+
+        flow_profile = np.zeros(time.shape, dtype=np.result_type(self.values, float))
+        flow_profile[inside] = self.values[idx[inside]]
+
+        return flow_profile
+
+    def to_dense(self, timestep):
+        """
+        Expand the profile onto a regular time grid.
+
+        Parameters
+        ----------
+        timestep: float
+            Spacing of the time grid.
+
+        Returns
+        -------
+        time: numpy.ndarray
+        flow_profile: numpy.ndarray
+        """
+
+        time = np.arange(self.start, self.end, timestep)
+
+        return time, self.sample(time)
+
+    def scaled(self, factor):
+        """
+        Get a copy of the profile with its values multiplied by factor.
+
+        Parameters
+        ----------
+        factor: float
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        return StepProfile(self.breakpoints, self.values * factor, end=self.end)
+
+    def shifted(self, offset):
+        """
+        Get a copy of the profile delayed by offset.
+
+        Parameters
+        ----------
+        offset: float
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        return StepProfile(
+            self.breakpoints + offset, self.values, end=self.end + offset
+        )
+
+    def concatenate(self, other):
+        """
+        Get a profile which runs other after the end of this profile.
+
+        Parameters
+        ----------
+        other: StepProfile
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        offset = self.end - other.start
+        breakpoints = np.hstack((self.breakpoints, other.breakpoints + offset))
+        values = np.hstack((self.values, other.values))
+
+        return StepProfile(breakpoints, values, end=other.end + offset)
+
+    @property
+    def period(self):
+        """
+        Time from the first breakpoint to the end of the profile.
+
+        Returns
+        -------
+        period: float
+        """
+
+        return self.end - self.start
+
+    def repeat(self, cycles):
+        """
+        Get a profile which runs this profile cycles times in a row.
+
+        Parameters
+        ----------
+        cycles: int
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        if cycles < 1:
+            raise ValueError(f"cycles must be at least 1, not {cycles}.")
+
+        offsets = np.arange(cycles) * self.period
+        breakpoints = (self.breakpoints[np.newaxis, :] + offsets[:, np.newaxis]).ravel()
+        values = np.tile(self.values, cycles)
+
+        return StepProfile(breakpoints, values, end=self.end + offsets[-1])
+
+    def repeating_steps(self, tolerance=0.0):
+        """
+        Find the shortest run of steps which the profile repeats.
+
+        Parameters
+        ----------
+        tolerance: float
+            Largest difference between corresponding flow values of the
+            repeats.
+
+        Returns
+        -------
+        n_steps: int
+            Number of steps in each repeat; len(self) if the profile does
+            not repeat.
+        """
+
+        n = len(self)
+        durations = self.durations
+
+        small = [d for d in range(1, int(n**0.5) + 1) if n % d == 0]
+        divisors = sorted(set(small + [n // d for d in small]))
+
+        for n_steps in divisors[:-1]:
+            values = self.values.reshape(-1, n_steps)
+            if np.any(np.abs(values - values[0]) > tolerance):
+                continue
+
+            repeat_durations = durations.reshape(-1, n_steps)
+            if np.allclose(repeat_durations, repeat_durations[0], rtol=1e-9, atol=0.0):
+                return n_steps
+
+        return n
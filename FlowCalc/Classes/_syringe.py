@@ -1,4 +1,5 @@
 import numpy as np
+from ._step_profile import StepProfile
 
 
 class Syringe:
@@ -21,13 +22,33 @@ class Syringe:
         self.time_unit: str
         self.flow_profile: array like
         self.flow_unit: str
+        self.version: int
+            Counter incremented when the profile or concentration changes.
+        self.step_profile: StepProfile or None
+            Piecewise constant flow profile, if one has been set. While it is
+            set, self.time, self.flow_profile and self.timesteps are the
+            breakpoints, values and durations of its steps.
+        self.cycles: int
+            Number of times the flow profile is run in a row. The flow
+            profile holds a single cycle.
+        self.precision: Precision or None
+            How flow rates are stored, see Syringe.set_precision(). If None,
+            arrays are stored as they are given.
         """
 
         self.name = name
 
+        # Incremented whenever the flow profile or concentration is replaced,
+        # so that experiments can tell when cached results are stale.
+        self.version = 0
+
         self.concentration = 0.0
         self.conc_unit = ""
 
+        self.step_profile = None
+        self.cycles = 1
+        self.precision = None
+
         self.time = []
         self.timesteps = []
         self.time_unit = ""
@@ -35,6 +56,74 @@ class Syringe:
         self.flow_profile = []
         self.flow_unit = ""
 
+    @property
+    def time(self):
+        if self.step_profile is not None:
+            return self.step_profile.breakpoints
+        return self._time
+
+    @time.setter
+    def time(self, value):
+        self._drop_step_profile()
+        self._time = value
+        self.version += 1
+
+    @property
+    def flow_profile(self):
+        """
+        The flow rates of the syringe. With fixed point precision (see
+        Syringe.set_precision()), a read-only array decoded from the stored
+        counts: assign a new flow profile to change it.
+
+        Returns
+        -------
+        flow_profile: array
+        """
+
+        if self.step_profile is not None:
+            return self.step_profile.values
+        if self.precision is None or self._flow_profile is None:
+            return self._flow_profile
+        values = self.precision.decode(self._flow_profile)
+        if values is not self._flow_profile:
+            values.flags.writeable = False
+        return values
+
+    @flow_profile.setter
+    def flow_profile(self, value):
+        self._drop_step_profile()
+        if self.precision is not None and value is not None:
+            value = self.precision.encode(value)
+        self._flow_profile = value
+        self.version += 1
+
+    @property
+    def stored_flow_profile(self):
+        """
+        The flow profile as it is stored: the same as Syringe.flow_profile,
+        except for fixed point precision, where it holds integer counts.
+
+        Returns
+        -------
+        stored: array
+        """
+
+        if self.step_profile is not None:
+            return self.step_profile.values
+        return self._flow_profile
+
+    @property
+    def timesteps(self):
+        if self.step_profile is not None:
+            return self.step_profile.durations
+        return self._timesteps
+
+    @timesteps.setter
+    def timesteps(self, value):
+        self._drop_step_profile()
+        self._timesteps = value
+        self.version += 1
+
     def set_concentration(self, value, unit):
         """
         Set the concentration of the syringe.
@@ -49,8 +138,9 @@ class Syringe:
 
         self.concentration = value
         self.conc_unit = unit
+        self.version += 1
 
-    def set_flow_profile(self, time_vals, time_unit, flow_profile, flow_unit):
+    def set_flow_profile(self, time_vals, time_unit, flow_profile, flow_unit, cycles=1):
         """
         Add a flow profile into the Syringe object.
 
@@ -64,12 +154,17 @@ class Syringe:
             time axis unit.
         flow_unit: str
             Flow rate unit.
+        cycles: int
+            Number of times the flow profile is run in a row.
 
         Returns
         -------
         None
         """
 
+        self.step_profile = None
+        self.set_cycles(cycles)
+
         self.time = time_vals
         self.time_unit = time_unit
         self.calculate_timesteps()
@@ -77,14 +172,364 @@ class Syringe:
         self.flow_profile = flow_profile
         self.flow_unit = flow_unit
 
+    def set_step_profile(self, step_profile, time_unit, flow_unit, cycles=1):
+        """
+        Add a piecewise constant flow profile into the Syringe object.
+
+        Only the steps are stored. A dense flow profile can be obtained with
+        Syringe.sample_flow_profile().
+
+        Parameters
+        ----------
+        step_profile: StepProfile
+            Flow profile.
+        time_unit: str
+            Unit of the breakpoints of step_profile.
+        flow_unit: str
+            Flow rate unit.
+        cycles: int
+            Number of times step_profile is run in a row.
+
+        Returns
+        -------
+        None
+        """
+
+        if self.precision is not None:
+            step_profile = StepProfile(
+                step_profile.breakpoints,
+                self.precision.round(step_profile.values),
+                end=step_profile.end,
+            )
+
+        self.step_profile = step_profile
+        self._time = None
+        self._flow_profile = None
+        self._timesteps = None
+        self.set_cycles(cycles)
+
+        self.time_unit = time_unit
+        self.flow_unit = flow_unit
+
+    def set_waveform(self, waveform, time_unit, flow_unit, timestep=None):
+        """
+        Set the flow profile of the syringe from a waveform expression
+        (see FlowCalc.Utils.waveforms). This is where the waveform is
+        evaluated.
+
+        Parameters
+        ----------
+        waveform: Waveform
+            Flow profile, with times in time_unit and values in flow_unit.
+        time_unit: str
+            time axis unit.
+        flow_unit: str
+            Flow rate unit.
+        timestep: float or None
+            Spacing of the time grid the waveform is sampled on. If None, the
+            waveform must be piecewise constant and only its steps are
+            stored, as with Syringe.set_step_profile().
+
+        Returns
+        -------
+        None
+        """
+
+        if timestep is None:
+            if not waveform.piecewise_constant:
+                raise ValueError(
+                    "A timestep is required for waveforms which are not "
+                    "piecewise constant."
+                )
+            self.set_step_profile(waveform.to_step_profile(), time_unit, flow_unit)
+        else:
+            time_vals, flow_profile = waveform.to_grid(timestep)
+            self.set_flow_profile(time_vals, time_unit, flow_profile, flow_unit)
+
+    def compress(self, tolerance=0.0):
+        """
+        Replace the flow profile of the syringe with its run-length encoded
+        StepProfile. The time axis, time unit and flow unit are unchanged.
+
+        Parameters
+        ----------
+        tolerance: float
+            Changes between consecutive flow values with a magnitude not
+            exceeding tolerance do not start a new step.
+
+        Returns
+        -------
+        None
+        """
+
+        if self.step_profile is not None:
+            return
+
+        step_profile = StepProfile.from_dense(
+            self.time, self.flow_profile, tolerance=tolerance
+        )
+        self.set_step_profile(
+            step_profile, self.time_unit, self.flow_unit, cycles=self.cycles
+        )
+
+    def store_flow_profile(self, stored):
+        """
+        Set the flow profile from an array which is already in the stored
+        representation of self.precision (see Syringe.stored_flow_profile),
+        without converting or copying it.
+
+        Parameters
+        ----------
+        stored: array
+
+        Returns
+        -------
+        None
+        """
+
+        self._drop_step_profile()
+        self._flow_profile = stored
+        self.version += 1
+
+    def set_precision(self, precision):
+        """
+        Set how the flow rates of the syringe are stored, converting the
+        current flow profile. Flow rates set afterwards are converted as
+        they are set.
+
+        The flow rates of a StepProfile are rounded to the precision but kept
+        as floats, since StepProfiles hold few values.
+
+        Parameters
+        ----------
+        precision: Precision or None
+            If None, flow profiles are stored as they are given.
+
+        Returns
+        -------
+        None
+        """
+
+        # Converted before anything is changed, in case the flow rates do
+        # not fit the new precision.
+        if self.step_profile is not None:
+            step_profile = self.step_profile
+            if precision is not None:
+                step_profile = StepProfile(
+                    step_profile.breakpoints,
+                    precision.round(step_profile.values),
+                    end=step_profile.end,
+                )
+            self.precision = precision
+            self.step_profile = step_profile
+            self.version += 1
+            return
+
+        stored = self.flow_profile
+        if precision is not None and stored is not None and len(stored) > 0:
+            stored = precision.encode(stored)
+
+        self.precision = precision
+        self.store_flow_profile(stored)
+
+    def set_cycles(self, cycles):
+        """
+        Set the number of times the flow profile is run in a row.
+
+        Parameters
+        ----------
+        cycles: int
+
+        Returns
+        -------
+        None
+        """
+
+        if int(cycles) != cycles or cycles < 1:
+            raise ValueError(f"cycles must be a positive integer, not {cycles}.")
+
+        self.cycles = int(cycles)
+        self.version += 1
+
+    def fold_cycles(self, period=None, tolerance=0.0):
+        """
+        Store a repeating flow profile as a single cycle and a cycle count.
+
+        The flow profile is stored as a StepProfile holding one cycle.
+
+        Parameters
+        ----------
+        period: float or None
+            Duration of a cycle, in self.time_unit. If None, the shortest
+            repeating run of steps is found.
+        tolerance: float
+            Largest difference between corresponding flow values of the
+            cycles.
+
+        Returns
+        -------
+        cycles: int
+            Number of cycles found in the flow profile (1 if it does not
+            repeat).
+        """
+
+        step_profile = self._single_cycle_step_profile()
+        n = len(step_profile)
+
+        if period is None:
+            n_steps = step_profile.repeating_steps(tolerance=tolerance)
+        else:
+            offsets = step_profile.breakpoints - step_profile.start
+            n_steps = int(np.searchsorted(offsets, period * (1 - 1e-12), side="left"))
+            if n_steps == 0 or n % n_steps != 0:
+                raise ValueError(
+                    f"Syringe {self.name}: the flow profile cannot be divided "
+                    f"into cycles of {period} {self.time_unit}."
+                )
+            check = StepProfile(
+                step_profile.breakpoints[:n_steps],
+                step_profile.values[:n_steps],
+                end=step_profile.start + period,
+            ).repeat(n // n_steps)
+            same_times = np.allclose(
+                np.append(check.breakpoints, check.end),
+                np.append(step_profile.breakpoints, step_profile.end),
+                rtol=1e-9,
+                atol=0.0,
+            )
+            same_values = np.all(
+                np.abs(check.values - step_profile.values) <= tolerance
+            )
+            if not (same_times and same_values):
+                raise ValueError(
+                    f"Syringe {self.name}: the flow profile does not repeat "
+                    f"every {period} {self.time_unit}."
+                )
+
+        found = n // n_steps
+        if found == 1:
+            return 1
+
+        single = StepProfile(
+            step_profile.breakpoints[:n_steps],
+            step_profile.values[:n_steps],
+            end=step_profile.breakpoints[n_steps],
+        )
+        self.set_step_profile(
+            single, self.time_unit, self.flow_unit, cycles=self.cycles * found
+        )
+
+        return found
+
+    def unrolled_step_profile(self):
+        """
+        Get the whole flow profile, with all of its cycles, as a StepProfile.
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        step_profile = self._single_cycle_step_profile()
+
+        if self.cycles > 1:
+            return step_profile.repeat(self.cycles)
+
+        return step_profile
+
+    def end_time(self):
+        """
+        Get the time at which the whole flow profile, with all of its
+        cycles, ends.
+
+        Returns
+        -------
+        end: float
+            In self.time_unit.
+        """
+
+        step_profile = self._single_cycle_step_profile()
+
+        return step_profile.end + (self.cycles - 1) * step_profile.period
+
+    def _has_timesteps(self):
+        """
+        Check whether self.timesteps holds a duration for each point of
+        self.time, as set by Syringe.calculate_timesteps() or by processing
+        which changes the time axis.
+
+        Returns
+        -------
+        has_timesteps: bool
+        """
+
+        if self.step_profile is not None:
+            return True
+
+        timesteps = self.timesteps
+        return timesteps is not None and len(timesteps) == len(self.time)
+
+    def _single_cycle_step_profile(self):
+        """
+        Get the stored flow profile as a StepProfile, without merging steps.
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        if self.step_profile is not None:
+            return self.step_profile
+
+        return StepProfile(
+            self.time, self.flow_profile, end=self.time[-1] + self.timesteps[-1]
+        )
+
+    def sample_flow_profile(self, time_vals):
+        """
+        Evaluate the flow profile at arbitrary times, treating it as
+        piecewise constant.
+
+        Parameters
+        ----------
+        time_vals: array
+            Times at which to evaluate the flow profile, in self.time_unit.
+
+        Returns
+        -------
+        flow_profile: numpy.ndarray
+        """
+
+        return self.unrolled_step_profile().sample(time_vals)
+
     def calculate_timesteps(self):
         """
         Calculate the timesteps between the values in self.time
         """
 
+        if self.step_profile is not None:
+            return
+
         time_steps = np.diff(self.time)
 
         # The last flow step will be held for as long as the one preceding it
         time_steps = np.hstack((time_steps, time_steps[-1]))
 
         self.timesteps = time_steps
+
+    def _drop_step_profile(self):
+        """
+        Store the arrays of the step profile as the dense flow profile of the
+        syringe, and discard the step profile.
+        """
+
+        step_profile = self.step_profile
+        if step_profile is None:
+            return
+
+        self.step_profile = None
+        self._time = step_profile.breakpoints
+        self._flow_profile = step_profile.values
+        if self.precision is not None:
+            self._flow_profile = self.precision.encode(step_profile.values)
+        self._timesteps = step_profile.durations
@@ -1,2 +1,13 @@
-from .experiment_from_csv import experiment_from_csv
-from .experiment_from_toml import experiment_from_toml
+from FlowCalc._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "experiment_from_csv": ".experiment_from_csv",
+        "experiment_from_toml": ".experiment_from_toml",
+        "experiment_from_conditions_file": ".experiment_from_conditions_file",
+        "experiment_from_binary": ".experiment_from_binary",
+        "read_config_sections": ".experiments_from_config_file",
+        "experiments_from_config_file": ".experiments_from_config_file",
+    },
+)
@@ -0,0 +1,68 @@
+import numpy as np
+from FlowCalc import Classes
+from FlowCalc.Classes import FlowExperiment
+
+
+def assemble_experiment(
+    name: str,
+    reactor_volume: tuple[float, str],
+    concentrations: dict[str, tuple[float, str]],
+    time: tuple[np.ndarray, str],
+    flow_profiles: dict[str, tuple[np.ndarray, str]],
+    columnar: bool = False,
+) -> FlowExperiment:
+    """
+    Create a FlowExperiment from parsed file contents.
+
+    Parameters
+    ----------
+    name: str
+        Experiment name.
+    reactor_volume: tuple[float, str]
+        (value, unit)
+    concentrations: dict[str, tuple[float, str]]
+        {syringe name: (concentration, unit)}
+    time: tuple[numpy.ndarray, str]
+        (shared time axis, unit)
+    flow_profiles: dict[str, tuple[numpy.ndarray, str]]
+        {syringe name: (flow profile, unit)}
+    columnar: bool
+        If True, the flow profiles are stored in a single matrix (see
+        FlowExperiment.make_columnar()).
+
+    Returns
+    -------
+    experiment: FlowExperiment
+    """
+
+    time_vals, time_unit = time
+
+    flow_units = {flow_profiles[s][1] for s in flow_profiles}
+
+    if columnar and len(flow_units) == 1:
+        matrix = np.empty((len(flow_profiles), len(time_vals)))
+        for c, s in enumerate(flow_profiles):
+            matrix[c] = flow_profiles[s][0]
+
+        experiment = FlowExperiment.from_flow_matrix(
+            name, time_vals, time_unit, list(flow_profiles), matrix, flow_units.pop()
+        )
+    else:
+        experiment = Classes.FlowExperiment(name)
+        for s in flow_profiles:
+            syringe = Classes.Syringe(s)
+            flow_vals, flow_unit = flow_profiles[s]
+            syringe.set_flow_profile(time_vals, time_unit, flow_vals, flow_unit)
+            experiment.add_syringe(syringe)
+
+        if columnar:
+            experiment.make_columnar()
+
+    for s in experiment.syringes:
+        if s in concentrations:
+            experiment.syringes[s].set_concentration(*concentrations[s])
+
+    experiment.reactor_volume = float(reactor_volume[0])
+    experiment.reactor_volume_unit = reactor_volume[1]
+
+    return experiment
@@ -0,0 +1,128 @@
+import json
+import struct
+import numpy as np
+from FlowCalc import Classes
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Writers.flow_experiment.to_binary import ALIGNMENT
+from FlowCalc.Writers.flow_experiment.to_binary import MAGIC
+from FlowCalc.Writers.flow_experiment.to_binary import VERSION
+
+
+def read_binary_header(filename: str) -> tuple[dict, int]:
+    """
+    Read the header of a file written by flow_experiment_to_binary().
+
+    Parameters
+    ----------
+    filename: str
+
+    Returns
+    -------
+    header: dict
+        Experiment metadata.
+    data_offset: int
+        Position of the time axis in the file, in bytes.
+    """
+
+    with open(filename, "rb") as file:
+        magic = file.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a FlowCalc binary file.")
+
+        version, header_length = struct.unpack("<II", file.read(8))
+        if version != VERSION:
+            raise ValueError(
+                f"{filename}: unsupported FlowCalc binary format version {version}."
+            )
+
+        header = json.loads(file.read(header_length).decode("utf-8"))
+
+    preamble_length = len(MAGIC) + 8 + header_length
+    data_offset = preamble_length + (-preamble_length % ALIGNMENT)
+
+    return header, data_offset
+
+
+def experiment_from_binary(
+    filename: str, syringes: list[str] | None = None, mode: str = "r"
+) -> FlowExperiment:
+    """
+    Load an experiment written by flow_experiment_to_binary().
+
+    The time axis and flow profiles are memory mapped rather than read, so
+    opening a file is fast whatever its size and data is only read from
+    disk when it is accessed.
+
+    Parameters
+    ----------
+    filename: str
+    syringes: list[str] or None
+        Names of the syringes to load. If None, all syringes are loaded
+        into a columnar experiment whose flow matrix is memory mapped.
+        Otherwise, each selected syringe's flow profile is mapped
+        separately.
+    mode: str
+        numpy.memmap mode: "r" (read only), "r+" (changes are written to the
+        file) or "c" (copy on write).
+
+    Returns
+    -------
+    experiment: FlowExperiment
+    """
+
+    header, data_offset = read_binary_header(filename)
+
+    n_steps = header["n_steps"]
+    n_syringes = len(header["syringes"])
+    dtype = np.dtype(header["dtype"])
+    time_unit = header["time_unit"]
+
+    time = np.memmap(
+        filename, dtype=dtype, mode=mode, offset=data_offset, shape=(n_steps,)
+    )
+    matrix_offset = data_offset + n_steps * dtype.itemsize
+
+    names = [s["name"] for s in header["syringes"]]
+
+    if syringes is None:
+        flow_matrix = np.memmap(
+            filename,
+            dtype=dtype,
+            mode=mode,
+            offset=matrix_offset,
+            shape=(n_syringes, n_steps),
+        )
+        flow_units = {s["flow_unit"] for s in header["syringes"]}
+        experiment = FlowExperiment.from_flow_matrix(
+            header["name"], time, time_unit, names, flow_matrix, flow_units.pop()
+        )
+        for s in header["syringes"]:
+            experiment.syringes[s["name"]].flow_unit = s["flow_unit"]
+    else:
+        experiment = Classes.FlowExperiment(header["name"])
+        for name in syringes:
+            row = names.index(name)
+            flow_profile = np.memmap(
+                filename,
+                dtype=dtype,
+                mode=mode,
+                offset=matrix_offset + row * n_steps * dtype.itemsize,
+                shape=(n_steps,),
+            )
+            syringe = Classes.Syringe(name)
+            syringe.set_flow_profile(
+                time, time_unit, flow_profile, header["syringes"][row]["flow_unit"]
+            )
+            experiment.add_syringe(syringe)
+
+    for s in header["syringes"]:
+        if s["name"] in experiment.syringes:
+            syringe = experiment.syringes[s["name"]]
+            syringe.set_concentration(s["concentration"], s["conc_unit"])
+
+    experiment.reactor_volume = header["reactor_volume"]
+    experiment.reactor_volume_unit = header["reactor_volume_unit"]
+    experiment.series_values = header["series_values"]
+    experiment.series_unit = header["series_unit"]
+
+    return experiment
@@ -0,0 +1,94 @@
+import numpy as np
+from FlowCalc.Classes import FlowExperiment
+from ._assemble import assemble_experiment
+
+
+def parse_row(text: str) -> np.ndarray:
+    """
+    Parse the values of a row of a conditions file into an array.
+
+    Parameters
+    ----------
+    text: str
+        Comma separated values, optionally with a trailing comma.
+
+    Returns
+    -------
+    values: numpy.ndarray
+    """
+
+    text = text.strip().rstrip(",")
+    if text == "":
+        return np.zeros(0)
+
+    return np.array(text.split(","), dtype=np.float64)
+
+
+def experiment_from_conditions_file(
+    filename: str, columnar: bool = False
+) -> FlowExperiment:
+    """
+    Load a flow experiment, including the flow profiles of its syringes, from
+    a conditions file written by write_flow_experiment_conditions_file().
+
+    The time axis and flow profiles are loaded in the (SI) units in which
+    they were written.
+
+    Parameters
+    ----------
+    filename: str
+        Name of a conditions file.
+    columnar: bool
+        If True, the flow profiles are stored in a single matrix (see
+        FlowExperiment.make_columnar()).
+
+    Returns
+    -------
+    experiment: FlowExperiment
+    """
+
+    with open(filename, "r", encoding="utf-8") as file:
+        text = file.read()
+
+    name = ""
+    rows = {}
+    in_conditions = False
+    for line in text.split("\n"):
+        label, _, values = line.partition(",")
+
+        if label == "Dataset":
+            name = values
+        elif label == "start_conditions":
+            in_conditions = True
+        elif label == "end_conditions":
+            in_conditions = False
+        elif in_conditions and "/ " in label:
+            quantity, unit = label.split("/ ", 1)
+            rows[quantity] = (values, unit)
+
+    time_vals, time_unit = rows["flow_profile_time"]
+    time = (parse_row(time_vals), time_unit)
+
+    flow_profiles = {}
+    for quantity in rows:
+        if quantity.endswith("_flow"):
+            flow_vals, flow_unit = rows[quantity]
+            flow_profiles[quantity[: -len("_flow")]] = (parse_row(flow_vals), flow_unit)
+
+    concentrations = {}
+    for s in flow_profiles:
+        if s in rows:
+            conc_vals, conc_unit = rows[s]
+            concentrations[s] = (parse_row(conc_vals)[0], conc_unit)
+
+    vol_vals, vol_unit = rows["reactor_volume"]
+    reactor_volume = (parse_row(vol_vals)[0], vol_unit)
+
+    return assemble_experiment(
+        name,
+        reactor_volume,
+        concentrations,
+        time,
+        flow_profiles,
+        columnar=columnar,
+    )
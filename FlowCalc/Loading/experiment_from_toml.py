@@ -1,16 +1,26 @@
 import tomli
+import numpy as np
 from FlowCalc import Classes
 from FlowCalc.Classes import FlowExperiment
+from ._assemble import assemble_experiment
 
 
-def experiment_from_toml(filename: str) -> FlowExperiment:
+def experiment_from_toml(filename: str, columnar: bool = False) -> FlowExperiment:
     """
     Initialise a flow experiment from a .toml file.
 
+    Both configuration files (with Exp_code and Reactor_volume entries) and
+    files written by write_flow_experiment_toml_file() can be loaded. For
+    the latter, the syringes are restored with their concentrations and flow
+    profiles, in the (SI) units in which they were written.
+
     Parameters
     ----------
     filename: str
         Name of a formatted configuration file.
+    columnar: bool
+        If True, the flow profiles are stored in a single matrix (see
+        FlowExperiment.make_columnar()).
 
     Returns
     -------
@@ -22,6 +32,9 @@ def experiment_from_toml(filename: str) -> FlowExperiment:
 
     config_dict = tomli.loads(text)
 
+    if "Dataset" in config_dict:
+        return _experiment_from_conditions_dict(config_dict, columnar=columnar)
+
     experiment = Classes.FlowExperiment(config_dict["Exp_code"])
 
     reactor_vol = config_dict["Reactor_volume"][0]
@@ -31,3 +44,49 @@ def experiment_from_toml(filename: str) -> FlowExperiment:
     experiment.reactor_volume_unit = reactor_unit
 
     return experiment
+
+
+def _experiment_from_conditions_dict(
+    conditions_dict: dict, columnar: bool = False
+) -> FlowExperiment:
+    """
+    Create an experiment from the output of flow_experiment_to_dict().
+
+    Parameters
+    ----------
+    conditions_dict: dict
+    columnar: bool
+
+    Returns
+    -------
+    experiment: FlowExperiment
+    """
+
+    conditions = conditions_dict["conditions"]
+
+    time_vals, time_unit = conditions["flow_profile_time"]
+    time = (np.array(time_vals, dtype=np.float64), time_unit)
+
+    flow_profiles = {}
+    concentrations = {}
+    for key in conditions:
+        if key.endswith("_flow_profile"):
+            syr_name = key[: -len("_flow_profile")]
+            flow_vals, flow_unit = conditions[key]
+            flow_profiles[syr_name] = (np.array(flow_vals, dtype=np.float64), flow_unit)
+            if syr_name in conditions:
+                concentrations[syr_name] = tuple(conditions[syr_name])
+
+    experiment = assemble_experiment(
+        conditions_dict["Dataset"],
+        conditions["Reactor_volume"],
+        concentrations,
+        time,
+        flow_profiles,
+        columnar=columnar,
+    )
+
+    experiment.series_values = conditions_dict.get("Series_values", [])
+    experiment.series_unit = conditions_dict.get("Series_unit", "")
+
+    return experiment
@@ -0,0 +1,223 @@
+import numpy as np
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Classes import StepProfile
+from FlowCalc.Classes import Syringe
+from FlowCalc.Utils.conversions import SI_convert_columns
+from FlowCalc.Utils.conversions import parse_header
+
+
+def _section_records(section_header, body, SI_units):
+    """
+    Parse the rows of one section into a structured array.
+
+    Parameters
+    ----------
+    section_header: list[str]
+    body: list[str]
+        Lines of the section, one row each.
+    SI_units: bool
+
+    Returns
+    -------
+    records: numpy.ndarray
+    """
+
+    n_cols = len(section_header)
+
+    if len(body) == 0:
+        cells = np.empty((0, n_cols + 1), dtype=str)
+    else:
+        cells = np.loadtxt(body, delimiter=",", dtype=str, comments=None, ndmin=2)
+
+    if cells.shape[1] < n_cols + 1:
+        raise ValueError(
+            f"Section with {n_cols} headers has rows of {cells.shape[1] - 1} values."
+        )
+
+    labels = cells[:, 0]
+    values = cells[:, 1 : n_cols + 1]
+    # Empty cells are missing values.
+    values = np.where(np.char.str_len(values) == 0, "nan", values).astype(np.float64)
+
+    if SI_units:
+        headers, columns = SI_convert_columns(section_header, values)
+    else:
+        headers, columns = section_header, list(values.T)
+
+    dtype = [("label", labels.dtype)] + [(h, np.float64) for h in headers]
+    records = np.empty(len(labels), dtype=dtype)
+    records["label"] = labels
+    for header, column in zip(headers, columns):
+        records[header] = column
+
+    return records
+
+
+def read_config_sections(
+    filename: str, SI_units: bool = False
+) -> tuple[str, dict[str, np.ndarray]]:
+    """
+    Read a sectioned configuration .csv file (the format read by
+    FlowCalc.Utils.conversions.parameters_from_config_file()) into one
+    NumPy structured array per section.
+
+    Each section is parsed and converted in bulk rather than cell by cell.
+
+    Parameters
+    ----------
+    filename: str
+    SI_units: bool
+        True: converts each column to SI using the unit in its header.
+        False: values are as given in the file.
+
+    Returns
+    -------
+    name: str
+        Experiment name as given in file.
+    sections: dict[str, numpy.ndarray]
+        {Section: structured array}. Each array has a "label" field holding
+        the first cell of each row, and one float field per header. Empty
+        cells are NaN.
+    """
+
+    with open(filename, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    name = ""
+    # [(section, header, first line, last line)]
+    bounds = []
+    for number, line in enumerate(lines):
+        if "Experiment name" in line:
+            name = line.split(",")[1]
+        elif "Section" in line:
+            ins = line.split(",")
+            bounds.append([ins[0], ins[1:], number + 1, len(lines)])
+            if len(bounds) > 1:
+                bounds[-2][3] = number
+
+    sections = {}
+    for section, header, first, last in bounds:
+        # Blank lines and rows of empty cells are skipped.
+        body = [line for line in lines[first:last] if line.strip(", \t") != ""]
+        sections[section] = _section_records(header, body, SI_units)
+
+    return name, sections
+
+
+def _standard_layout_builder(fields: list[str]):
+    """
+    Create a builder for sections laid out with one steady flow experiment
+    per row, see experiments_from_config_file().
+
+    Parameters
+    ----------
+    fields: list[str]
+        Headers of the section.
+
+    Returns
+    -------
+    builder: Callable[[str, dict], FlowExperiment]
+    """
+
+    reactor = None
+    duration = None
+    flows = {}
+    concentrations = {}
+
+    for field in fields:
+        parsed = parse_header(field)
+        key = parsed.name.lower().replace("_", " ").strip()
+        if key == "reactor volume":
+            reactor = (field, parsed.unit)
+        elif key == "duration":
+            duration = (field, parsed.unit)
+        elif key.endswith(" flow"):
+            flows[parsed.name[: -len(" flow")].strip()] = (field, parsed.unit)
+        elif key.endswith(" concentration"):
+            syringe = parsed.name[: -len(" concentration")].strip()
+            concentrations[syringe] = (field, parsed.unit)
+
+    if duration is None or len(flows) == 0:
+        raise ValueError(
+            "A section needs a duration column and at least one "
+            "<syringe> flow column to build experiments."
+        )
+
+    for field, unit in [duration, *flows.values()]:
+        if unit is None:
+            raise ValueError(f"No unit found in header {field}.")
+
+    def build(label, row):
+        experiment = FlowExperiment(label)
+
+        if reactor is not None:
+            experiment.reactor_volume = row[reactor[0]]
+            experiment.reactor_volume_unit = reactor[1]
+
+        for s, (field, flow_unit) in flows.items():
+            syringe = Syringe(s)
+            step_profile = StepProfile([0.0], [row[field]], end=row[duration[0]])
+            syringe.set_step_profile(step_profile, duration[1], flow_unit)
+            if s in concentrations:
+                conc_field, conc_unit = concentrations[s]
+                syringe.set_concentration(row[conc_field], conc_unit)
+            experiment.add_syringe(syringe)
+
+        return experiment
+
+    return build
+
+
+def experiments_from_config_file(
+    filename: str, section: str, builder=None, SI_units: bool = False
+) -> list[FlowExperiment]:
+    """
+    Build one FlowExperiment per row of a section of a sectioned
+    configuration .csv file.
+
+    By default, each row describes a steady flow experiment with the
+    columns:
+        duration (unit)
+        <syringe> flow (unit), for each syringe
+        <syringe> concentration (unit), optional
+        Reactor_volume (unit), optional
+    Each syringe holds its flow rate for the duration as a StepProfile. The
+    experiments are named by the first cell of their rows.
+
+    Parameters
+    ----------
+    filename: str
+    section: str
+        Name of the section to build experiments from.
+    builder: Callable[[str, dict], FlowExperiment] or None
+        Called with the label and the {header: value} dict of each row, for
+        other layouts.
+    SI_units: bool
+        True: converts each column to SI before building the experiments.
+
+    Returns
+    -------
+    experiments: list[FlowExperiment]
+    """
+
+    _, sections = read_config_sections(filename, SI_units=SI_units)
+
+    if section not in sections:
+        raise KeyError(f"No section {section} in {filename}.")
+
+    records = sections[section]
+    fields = list(records.dtype.names[1:])
+
+    if builder is None:
+        builder = _standard_layout_builder(fields)
+
+    # Whole columns to lists once, rather than indexing records per cell.
+    columns = {field: records[field].tolist() for field in fields}
+    labels = records["label"].tolist()
+
+    experiments = []
+    for r, label in enumerate(labels):
+        row = {field: columns[field][r] for field in fields}
+        experiments.append(builder(label, row))
+
+    return experiments
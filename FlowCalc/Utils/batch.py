@@ -0,0 +1,119 @@
+"""
+Building and exporting batches of experiments for parameter sweeps.
+
+A sweep is given as {parameter name: list of values}. Every combination of
+values is passed to a builder function which returns a FlowExperiment, and
+the outputs of each experiment are written with
+FlowCalc.Writers.export_experiment(), optionally across a pool of processes.
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from FlowCalc.Writers.export import DEFAULT_WRITERS
+from FlowCalc.Writers.export import export_experiment
+
+
+def sweep_points(sweep: dict[str, list]) -> list[dict]:
+    """
+    Expand a sweep specification into its parameter combinations.
+
+    Parameters
+    ----------
+    sweep: dict[str, list]
+        {parameter name: values}. The last parameter varies fastest.
+
+    Returns
+    -------
+    points: list[dict]
+        One {parameter name: value} dict per combination.
+    """
+
+    names = list(sweep)
+    combinations = itertools.product(*(sweep[n] for n in names))
+
+    return [dict(zip(names, values)) for values in combinations]
+
+
+def _build_and_export(builder, index, params, output_dir, writers, name_format):
+    """
+    Build the experiment for one point of a sweep and write its outputs.
+
+    Parameters
+    ----------
+    builder: Callable[..., FlowExperiment]
+    index: int
+    params: dict
+    output_dir: str
+    writers: tuple[str]
+    name_format: str
+
+    Returns
+    -------
+    entry: dict
+        {"index", "params", "name", "files"}
+    """
+
+    experiment = builder(**params)
+
+    basename = name_format.format(index=index, name=experiment.name, **params)
+
+    paths = export_experiment(
+        experiment, output_dir, writers=writers, basename=basename
+    )
+
+    return {"index": index, "params": params, "name": basename, "files": paths}
+
+
+def run_sweep(
+    builder,
+    sweep: dict[str, list],
+    output_dir: str,
+    writers=DEFAULT_WRITERS,
+    max_workers: int | None = None,
+    name_format: str = "{name}_{index:04d}",
+) -> list[dict]:
+    """
+    Build and export an experiment for every point of a parameter sweep.
+
+    Parameters
+    ----------
+    builder: Callable[..., FlowExperiment]
+        Called with the parameters of each point as keyword arguments,
+        returns the experiment for that point. When using more than one
+        worker, it must be picklable (e.g. a function defined at the top
+        level of a module).
+    sweep: dict[str, list]
+        {parameter name: values}, see sweep_points().
+    output_dir: str
+        Directory for the output files.
+    writers: tuple[str]
+        Outputs to write for each experiment, see
+        FlowCalc.Writers.export_experiment().
+    max_workers: int or None
+        Number of worker processes. None uses one per CPU, 1 builds and
+        writes every experiment in the calling process.
+    name_format: str
+        Format string for the base name of each experiment's files. It may
+        use {index} (position of the point in the sweep), {name} (name of
+        the built experiment) and the sweep parameter names.
+
+    Returns
+    -------
+    manifest: list[dict]
+        One entry per point, in sweep order: {"index": int, "params": dict,
+        "name": str, "files": {output: path}}.
+    """
+
+    points = sweep_points(sweep)
+    tasks = [
+        (builder, c, params, output_dir, writers, name_format)
+        for c, params in enumerate(points)
+    ]
+
+    if max_workers == 1:
+        return [_build_and_export(*task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_build_and_export, *task) for task in tasks]
+        manifest = [future.result() for future in futures]
+
+    return manifest
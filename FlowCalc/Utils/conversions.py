@@ -3,70 +3,49 @@ Conversions from common units to SI units. By no means comprehensive, units are
 written in so many ways in the wild.
 """
 import re
+import functools
+import warnings
 import numpy as np
 from typing import Callable
+from typing import NamedTuple
+from FlowCalc.Utils import units
 
-# A dictionary of lambda functions used to convert flow
-# profile units into SI units.
-# mu: U+03BC
-# micro: U+00B5
-SI_conversions: dict[str, tuple[Callable[[float], float], str]] = {
-    # Volumes
-    "µL": (lambda x: x / 1e6, "L"),
-    "μL": (lambda x: x / 1e6, "L"),
-    "uL": (lambda x: x / 1e6, "L"),
-    "µl": (lambda x: x / 1e6, "L"),
-    "μl": (lambda x: x / 1e6, "L"),
-    "ul": (lambda x: x / 1e6, "L"),
-    "mL": (lambda x: x / 1e3, "L"),
-    "ml": (lambda x: x / 1e3, "L"),
-    "L": (lambda x: x, "L"),
-    "l": (lambda x: x, "L"),
-    # Times
-    "s": (lambda x: x, "s"),
-    "h": (lambda x: x * 60, "s"),
-    # Angles
-    "rad": (lambda x: x, "rad"),
-    "degrees": (lambda x: x * np.pi / 180, "rad"),
-    # Concentrations
-    "nM": (lambda x: x / 1e9, "M"),
-    "µM": (lambda x: x / 1e6, "M"),
-    "μM": (lambda x: x / 1e6, "M"),
-    "uM": (lambda x: x / 1e6, "M"),
-    "mM": (lambda x: x / 1e3, "M"),
-    "M": (lambda x: x, "M"),
-    # Flow rates
-    "µL/s": (lambda x: x / 1e6, "L/s"),
-    "μL/s": (lambda x: x / 1e6, "L/s"),
-    "uL/s": (lambda x: x / 1e6, "L/s"),
-    "µl/s": (lambda x: x / 1e6, "L/s"),
-    "μl/s": (lambda x: x / 1e6, "L/s"),
-    "ul/s": (lambda x: x / 1e6, "L/s"),
-    "ml/s": (lambda x: x / 1e3, "L/s"),
-    "mL/s": (lambda x: x / 1e3, "L/s"),
-    "L/s": (lambda x: x, "L/s"),
-    "l/s": (lambda x: x, "L/s"),
-    "µL/min": (lambda x: x / (60 * 1e6), "L/s"),
-    "μL/min": (lambda x: x / (60 * 1e6), "L/s"),
-    "uL/min": (lambda x: x / (60 * 1e6), "L/s"),
-    "µl/min": (lambda x: x / (60 * 1e6), "L/s"),
-    "μl/min": (lambda x: x / (60 * 1e6), "L/s"),
-    "ul/min": (lambda x: x / (60 * 1e6), "L/s"),
-    "mL/min": (lambda x: x / (60 * 1e3), "L/s"),
-    "ml/min": (lambda x: x / (60 * 1e3), "L/s"),
-    "L/min": (lambda x: x / 60, "L/s"),
-    "l/min": (lambda x: x / 60, "L/s"),
-    "µL/h": (lambda x: x / (3600 * 1e6), "L/s"),
-    "μL/h": (lambda x: x / (3600 * 1e6), "L/s"),
-    "uL/h": (lambda x: x / (3600 * 1e6), "L/s"),
-    "µl/h": (lambda x: x / (3600 * 1e6), "L/s"),
-    "μl/h": (lambda x: x / (3600 * 1e6), "L/s"),
-    "ul/h": (lambda x: x / (3600 * 1e6), "L/s"),
-    "mL/h": (lambda x: x / (3600 * 1e3), "L/s"),
-    "ml/h": (lambda x: x / (3600 * 1e3), "L/s"),
-    "L/h": (lambda x: x / 3600, "L/s"),
-    "l/h": (lambda x: x / 3600, "L/s"),
-}
+
+class _SIConversionTable:
+    """
+    Mapping from unit strings to (conversion function, SI unit) tuples.
+
+    Kept for compatibility with code written against the previous table of
+    conversion functions; entries are created on demand from the unit parser
+    in FlowCalc.Utils.units, so any unit it can parse is available.
+    """
+
+    def __getitem__(self, unit: str) -> tuple[Callable, str]:
+        try:
+            si_unit = units.SI_unit(unit)
+        except ValueError as error:
+            raise KeyError(unit) from error
+
+        return functools.partial(units.to_SI, unit=unit), si_unit
+
+    def __contains__(self, unit) -> bool:
+        return isinstance(unit, str) and units.is_known_unit(unit)
+
+    def get(self, unit, default=None):
+        if unit in self:
+            return self[unit]
+
+        return default
+
+
+SI_conversions = _SIConversionTable()
+
+
+class UnitConversionWarning(UserWarning):
+    """
+    Issued when a value is left unconverted because its unit could not be
+    found or is not known.
+    """
 
 
 def field_to_SI(field: tuple[float, str]) -> tuple[float, str]:
@@ -87,23 +66,117 @@ def field_to_SI(field: tuple[float, str]) -> tuple[float, str]:
     unit = field[1]
 
     if not unit in SI_conversions:
-        print(f"No conversion for unit {value}/ {unit}.")
-        print("Returning original value and unit.")
+        warnings.warn(
+            f"No conversion for unit {value}/ {unit}. "
+            "Returning original value and unit.",
+            UnitConversionWarning,
+            stacklevel=2,
+        )
         return field
 
-    conversion_function, si_unit = SI_conversions[unit]
-
-    si_value = conversion_function(value)
+    si_value = units.to_SI(value, unit)
+    si_unit = units.SI_unit(unit)
 
     si_field = (si_value, si_unit)
 
     return si_field
 
 
+# Units in headers, in order of precedence:
+#     name (unit) e.g. Concentration (μM)
+#     name [unit] e.g. concentration [mM]
+#     name/ unit e.g. concentration/ mM
+HEADER_UNIT_PATTERNS = (
+    re.compile(r"^.*\((.*)\)"),
+    re.compile(r"^.*\[(.*)\]"),
+    re.compile(r"^.*?/\s?(.*)$"),
+)
+
+
+class ParsedHeader(NamedTuple):
+    """
+    A header split into its name and unit, and the same header with the SI
+    unit.
+
+    unit is None if no unit was found in the header, and si_header is the
+    original header if the unit is not known.
+    """
+
+    header: str
+    name: str
+    unit: str | None
+    si_header: str
+    known: bool
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_header(header_name: str) -> ParsedHeader:
+    """
+    Find the unit in a header and the header with the unit replaced by its SI
+    unit. Results are cached, as the same few headers are parsed many times.
+
+    Parameters
+    ----------
+    header_name: str
+        Expected formats:
+            name (unit) e.g. Concentration (μM)
+            name/ unit e.g. concentration/ mM
+            name [unit] e.g. concentration [mM]
+
+    Returns
+    -------
+    parsed: ParsedHeader
+    """
+
+    for pattern in HEADER_UNIT_PATTERNS:
+        match = pattern.match(header_name)
+        if match is not None:
+            break
+    else:
+        return ParsedHeader(header_name, header_name.strip(), None, header_name, False)
+
+    start, stop = match.span(1)
+    name = header_name[:start].rstrip(" ([/")
+
+    unit = match.group(1).strip()
+    if not units.is_known_unit(unit):
+        return ParsedHeader(header_name, name, unit, header_name, False)
+
+    si_header = header_name[:start] + units.SI_unit(unit) + header_name[stop:]
+
+    return ParsedHeader(header_name, name, unit, si_header, True)
+
+
+def _warn_unconverted(parsed: ParsedHeader) -> None:
+    """
+    Warn that the values under a header are left in their original units.
+
+    Parameters
+    ----------
+    parsed: ParsedHeader
+
+    Returns
+    -------
+    None
+    """
+
+    if parsed.unit is None:
+        reason = "no unit found"
+    else:
+        reason = f"no SI conversion for {parsed.unit}"
+
+    warnings.warn(
+        f"{parsed.header}: {reason}, values are left unchanged.",
+        UnitConversionWarning,
+        stacklevel=3,
+    )
+
+
 def SI_convert(header_name: str, value: str | int | float) -> tuple[str, float]:
     """
-    Convert a named parameter to its SI equivalent using a find and replace
-    strategy. If the given unit is not in SI_conversions, it is left unchanged.
+    Convert a named parameter to its SI equivalent. If the unit in the header
+    is not known, the header and value are left unchanged and a
+    UnitConversionWarning is issued.
 
     Parameters
     -----------
@@ -125,36 +198,54 @@ def SI_convert(header_name: str, value: str | int | float) -> tuple[str, float]:
             Value of parameter in SI or unchanged units
     """
 
-    paren_units_regex = f"(?:.*)\((.*)\)"
-    sq_brakets_units_regex = f"(?:.*)\[(.*)\]"
-    quantity_calculus_units_regex = f"(?:.*\/\s?)(.*)"
+    parsed = parse_header(header_name)
+
+    if not parsed.known:
+        _warn_unconverted(parsed)
+        return header_name, float(value)
 
-    expressions = [
-        paren_units_regex,
-        sq_brakets_units_regex,
-        quantity_calculus_units_regex,
-    ]
+    return parsed.si_header, units.to_SI(float(value), parsed.unit)
 
-    unit = "<unit not found!>"
-    for expr in expressions:
-        matches = re.match(expr, header_name)
-        if matches != None:
-            unit = matches.group(1)
 
-    if unit in SI_conversions.keys():
-        converted_unit = SI_conversions[unit][1]
-        conversion = SI_conversions[unit][0]
+def SI_convert_columns(headers, columns):
+    """
+    Convert whole columns of values to SI units, using the unit in each
+    column's header. Columns whose units are not known are left unchanged
+    with one UnitConversionWarning per column.
+
+    Parameters
+    ----------
+    headers: list[str]
+    columns: list[array] or numpy.ndarray
+        One column of values per header, or a 2D array with one column per
+        header.
 
-        converted_value = conversion(float(value))
+    Returns
+    -------
+    si_headers: list[str]
+    si_columns: list[numpy.ndarray]
+    """
 
-        new_header_name = header_name.replace(unit, converted_unit)
+    if isinstance(columns, np.ndarray) and columns.ndim == 2:
+        columns = columns.T
 
-        return new_header_name, converted_value
+    if len(columns) != len(headers):
+        raise ValueError(f"{len(columns)} columns given for {len(headers)} headers.")
 
-    else:
-        print("No SI conversion given for <<{}>>".format(unit))
+    si_headers = []
+    si_columns = []
+    for header, column in zip(headers, columns):
+        parsed = parse_header(header)
+        column = np.asarray(column, dtype=np.float64)
+        if parsed.known:
+            si_headers.append(parsed.si_header)
+            si_columns.append(units.to_SI(column, parsed.unit))
+        else:
+            _warn_unconverted(parsed)
+            si_headers.append(header)
+            si_columns.append(column)
 
-        return header_name, float(value)
+    return si_headers, si_columns
 
 
 def parameters_from_config_file(fname, SI_units=False):
@@ -166,7 +257,7 @@ def parameters_from_config_file(fname, SI_units=False):
     fname: str
         File name or path to file with file name appended.
     SI_units: bool
-        True: converts units in spreadsheet to SI using SI_convert()
+        True: converts units in spreadsheet to SI using SI_convert_columns()
         False: Reads in values as given in spreadsheet.
 
     Returns
@@ -178,34 +269,43 @@ def parameters_from_config_file(fname, SI_units=False):
     """
 
     lineproc = lambda x: x.strip("\n").split(",")
-    params = {}
-    readstate = False
+
+    # {Section: (header, row labels, rows)}
+    sections = {}
+    rows = None
     with open(fname, "r") as f:
-        lines = []
         for line in f:
             if "Experiment name" in line:
                 name = lineproc(line)[1]
+                continue
             if "Section" in line:
                 ins = lineproc(line)
-                clef = ins[0]
-                params[clef] = {}
-                section_header = ins[1:]
-                readstate = True
-                line = next(f)
-            if readstate:
+                labels = []
+                rows = []
+                sections[ins[0]] = (ins[1:], labels, rows)
+                continue
+            if rows is not None:
                 ins = lineproc(line)
-                if SI_units:
-                    params[clef][ins[0]] = {
-                        k: v
-                        for k, v in (
-                            helper_functions.SI_convert(x, y)
-                            for x, y in zip(section_header, ins[1:])
-                        )
-                    }
-                else:
-                    params[clef][ins[0]] = {
-                        k: float(v) for k, v in zip(section_header, ins[1:])
-                    }
+                if all(cell.strip() == "" for cell in ins):
+                    continue
+                labels.append(ins[0])
+                rows.append(ins[1:])
+
+    # Each section is converted a column at a time.
+    params = {}
+    for clef, (section_header, labels, rows) in sections.items():
+        values = np.array(rows, dtype=np.float64).reshape(
+            len(rows), len(section_header)
+        )
+        if SI_units:
+            headers, columns = SI_convert_columns(section_header, values)
+        else:
+            headers, columns = section_header, list(values.T)
+
+        params[clef] = {
+            label: {h: float(column[r]) for h, column in zip(headers, columns)}
+            for r, label in enumerate(labels)
+        }
 
     return name, params
 
@@ -0,0 +1,163 @@
+"""
+Content hashes of syringes and experiments, used to find outputs which need
+to be rewritten after an experiment has been changed.
+
+Hashes cover everything the writers use: profile arrays, units and
+concentrations of syringes, and the metadata of experiments. Two objects
+with the same contents have the same hash, regardless of whether their
+arrays are views into a columnar matrix. The dtypes of the arrays and the
+precision of syringes are part of the contents, since they change how the
+values are written.
+"""
+import hashlib
+import numpy as np
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Classes import Syringe
+
+
+def _update(digest, *values):
+    """
+    Add values to a hash. Arrays are hashed by their dtype and their
+    float64 contents, other values by their repr().
+
+    Parameters
+    ----------
+    digest: hashlib hash object
+    values: any
+
+    Returns
+    -------
+    None
+    """
+
+    for value in values:
+        if isinstance(value, (np.ndarray, list, tuple)) and not isinstance(value, str):
+            dtype = np.asarray(value).dtype
+            array = np.ascontiguousarray(value, dtype=np.float64)
+            digest.update(f"array{array.shape}{dtype}".encode())
+            digest.update(memoryview(array).cast("B"))
+        else:
+            digest.update(repr(value).encode("utf-8"))
+        digest.update(b"\x00")
+
+
+def syringe_hash(syringe: Syringe, concentration: bool = True) -> str:
+    """
+    Get a hash of the contents of a syringe.
+
+    Parameters
+    ----------
+    syringe: Syringe
+    concentration: bool
+        If False, the concentration is left out, for outputs which only
+        contain the flow profile.
+
+    Returns
+    -------
+    digest: str
+        Hexadecimal hash.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    _update(
+        digest,
+        syringe.name,
+        syringe.time_unit,
+        syringe.flow_unit,
+        syringe.cycles,
+        syringe.precision,
+    )
+
+    if concentration:
+        _update(digest, syringe.concentration, syringe.conc_unit)
+
+    if syringe.step_profile is not None:
+        step_profile = syringe.step_profile
+        _update(
+            digest,
+            "steps",
+            step_profile.breakpoints,
+            step_profile.values,
+            step_profile.end,
+        )
+    else:
+        _update(digest, "dense", syringe.time, syringe.flow_profile)
+
+    return digest.hexdigest()
+
+
+def profiles_hash(experiment: FlowExperiment, syringe_hashes=None) -> str:
+    """
+    Get a hash of the flow profiles of an experiment: the syringes, in
+    order, without their concentrations or the metadata of the experiment.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    syringe_hashes: dict[str, str] or None
+        Hashes of the syringes without their concentrations (see
+        syringe_hash()), if already calculated.
+
+    Returns
+    -------
+    digest: str
+        Hexadecimal hash.
+    """
+
+    if syringe_hashes is None:
+        syringe_hashes = {
+            s: syringe_hash(experiment.syringes[s], concentration=False)
+            for s in experiment.syringes
+        }
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    # Syringe order matters for the column order of the outputs.
+    for s in experiment.syringes:
+        _update(digest, s, syringe_hashes[s])
+
+    return digest.hexdigest()
+
+
+def experiment_hash(experiment: FlowExperiment, syringe_hashes=None) -> str:
+    """
+    Get a hash of the contents of an experiment: its metadata and all of its
+    syringes.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    syringe_hashes: dict[str, str] or None
+        Hashes of the syringes without their concentrations (see
+        syringe_hash()), if already calculated.
+
+    Returns
+    -------
+    digest: str
+        Hexadecimal hash.
+    """
+
+    if syringe_hashes is None:
+        syringe_hashes = {
+            s: syringe_hash(experiment.syringes[s], concentration=False)
+            for s in experiment.syringes
+        }
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    _update(
+        digest,
+        experiment.name,
+        experiment.reactor_volume,
+        experiment.reactor_volume_unit,
+        experiment.series_unit,
+        repr(list(experiment.series_values)),
+    )
+
+    # Syringe order matters for the column order of the outputs.
+    for s in experiment.syringes:
+        syringe = experiment.syringes[s]
+        _update(digest, s, syringe_hashes[s], syringe.concentration, syringe.conc_unit)
+
+    return digest.hexdigest()
@@ -0,0 +1,368 @@
+"""
+Opt-in timing instrumentation for FlowCalc functions.
+
+Functions decorated with instrument() record their call counts, wall time,
+the size of the arrays passed to them and the bytes they write into a
+global registry, but only while instrumentation is enabled. When disabled,
+the only cost is one flag check per call.
+
+    from FlowCalc.Utils import instrumentation
+
+    with instrumentation.profiling() as registry:
+        export_experiment(experiment, "output")
+
+    print(registry.summary())
+    registry.write_chrome_trace("trace.json")
+
+Trace files can be opened in chrome://tracing or https://ui.perfetto.dev.
+Times are inclusive: a function's time includes the instrumented
+functions it calls.
+"""
+import os
+import json
+import time
+import inspect
+import functools
+import threading
+import contextlib
+import numpy as np
+
+_ENABLED = False
+
+# Trace events beyond this number are counted but not kept.
+MAX_EVENTS = 1_000_000
+
+
+class FunctionStats:
+    """
+    Totals recorded for one instrumented function.
+    """
+
+    __slots__ = ("calls", "wall_time", "bytes_written", "array_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_time = 0.0
+        self.bytes_written = 0
+        self.array_bytes = 0
+
+    def as_dict(self):
+        return {s: getattr(self, s) for s in self.__slots__}
+
+
+class Registry:
+    def __init__(self):
+        """
+        Records of instrumented calls.
+        """
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Discard all records.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            self.stats = {}
+            self.events = []
+            self.dropped_events = 0
+            self.origin = time.perf_counter()
+
+    def record(self, name, start, duration, bytes_written=0, array_bytes=0):
+        """
+        Record one call.
+
+        Parameters
+        ----------
+        name: str
+        start: float
+            time.perf_counter() at the start of the call.
+        duration: float
+            Wall time in s.
+        bytes_written: int
+        array_bytes: int
+            Total size of the arrays passed to the function.
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = FunctionStats()
+            stats.calls += 1
+            stats.wall_time += duration
+            stats.bytes_written += bytes_written
+            stats.array_bytes += array_bytes
+
+            if len(self.events) < MAX_EVENTS:
+                self.events.append(
+                    (
+                        name,
+                        start,
+                        duration,
+                        threading.get_ident(),
+                        bytes_written,
+                        array_bytes,
+                    )
+                )
+            else:
+                self.dropped_events += 1
+
+    def as_dict(self):
+        """
+        Get the totals for each function.
+
+        Returns
+        -------
+        stats: dict[str, dict]
+            {function name: {"calls", "wall_time", "bytes_written",
+            "array_bytes"}}
+        """
+
+        with self._lock:
+            return {name: self.stats[name].as_dict() for name in self.stats}
+
+    def summary(self):
+        """
+        Format the totals for each function as a table, slowest first.
+
+        Returns
+        -------
+        summary: str
+        """
+
+        stats = self.as_dict()
+        order = sorted(stats, key=lambda n: stats[n]["wall_time"], reverse=True)
+
+        width = max([len(n) for n in stats] + [len("function")])
+        lines = [
+            f"{'function':{width}s} {'calls':>8s} {'time/ s':>10s} "
+            f"{'written/ B':>12s} {'arrays/ B':>12s}"
+        ]
+        for name in order:
+            s = stats[name]
+            lines.append(
+                f"{name:{width}s} {s['calls']:8d} {s['wall_time']:10.4f} "
+                f"{s['bytes_written']:12d} {s['array_bytes']:12d}"
+            )
+
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """
+        Get the recorded calls in the Chrome trace event format.
+
+        Returns
+        -------
+        trace: dict
+        """
+
+        pid = os.getpid()
+
+        with self._lock:
+            events = [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"bytes_written": written, "array_bytes": arrays},
+                }
+                for name, start, duration, tid, written, arrays in self.events
+            ]
+            dropped = self.dropped_events
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": dropped},
+        }
+
+    def write_chrome_trace(self, filename):
+        """
+        Write the recorded calls to a Chrome trace .json file.
+
+        Parameters
+        ----------
+        filename: str
+
+        Returns
+        -------
+        None
+        """
+
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+registry = Registry()
+
+
+def enable():
+    """
+    Start recording instrumented calls.
+
+    Returns
+    -------
+    None
+    """
+
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable():
+    """
+    Stop recording instrumented calls.
+
+    Returns
+    -------
+    None
+    """
+
+    global _ENABLED
+    _ENABLED = False
+
+
+def is_enabled():
+    return _ENABLED
+
+
+@contextlib.contextmanager
+def profiling(reset=True):
+    """
+    Record instrumented calls within a with block.
+
+    Parameters
+    ----------
+    reset: bool
+        If True, previous records are discarded first.
+
+    Returns
+    -------
+    registry: Registry
+    """
+
+    was_enabled = _ENABLED
+    if reset:
+        registry.reset()
+
+    enable()
+    try:
+        yield registry
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def _file_size(target):
+    """
+    Get the size of a file, or of all files in a dict or list of paths.
+
+    Parameters
+    ----------
+    target: str, os.PathLike, dict or list
+
+    Returns
+    -------
+    size: int
+        0 for anything which is not a path to an existing file.
+    """
+
+    if isinstance(target, dict):
+        return sum(_file_size(t) for t in target.values())
+    if isinstance(target, (list, tuple)):
+        return sum(_file_size(t) for t in target)
+    if isinstance(target, (str, os.PathLike)) and os.path.isfile(target):
+        return os.path.getsize(target)
+
+    return 0
+
+
+def _array_bytes(args, kwargs):
+    """
+    Get the total size of the arrays among a function's arguments.
+
+    Parameters
+    ----------
+    args: tuple
+    kwargs: dict
+
+    Returns
+    -------
+    size: int
+    """
+
+    size = 0
+    for arg in (*args, *kwargs.values()):
+        if isinstance(arg, np.ndarray):
+            size += arg.nbytes
+
+    return size
+
+
+def instrument(name=None, writes=None):
+    """
+    Decorator recording calls to a function while instrumentation is
+    enabled.
+
+    Parameters
+    ----------
+    name: str or None
+        Name to record calls under. Defaults to <module>.<function>.
+    writes: str or None
+        Where the function writes its output: the name of its parameter
+        holding the output path, or "return" if it returns the path(s)
+        written. The size of the output is recorded as bytes written.
+
+    Returns
+    -------
+    decorator: Callable
+    """
+
+    def decorator(func):
+        label = name
+        if label is None:
+            label = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        signature = inspect.signature(func)
+
+        def call(args, kwargs):
+            array_bytes = _array_bytes(args, kwargs)
+
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            duration = time.perf_counter() - start
+
+            if writes == "return":
+                bytes_written = _file_size(result)
+            elif writes is not None:
+                bound = signature.bind(*args, **kwargs)
+                bytes_written = _file_size(bound.arguments.get(writes))
+            else:
+                bytes_written = 0
+
+            registry.record(label, start, duration, bytes_written, array_bytes)
+
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            return call(args, kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,41 +1,177 @@
+import copy
 import numpy as np
-from copy import deepcopy
 from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils.instrumentation import instrument
 
 
-def minimise_steps(flow_experiment: FlowExperiment) -> FlowExperiment:
+def _unrolled(syringe):
     """
-    Truncate flow profiles based on where flow profiles change.
-    Returns a modified copy of the experiment.
+    Get the flow profile of a syringe with all of its cycles.
+
+    Parameters
+    ----------
+    syringe: Syringe
+
+    Returns
+    -------
+    time: numpy.ndarray
+    flow_profile: numpy.ndarray
+    end: float
+        End of the last step, in the time unit of the syringe.
+    """
+
+    if syringe.step_profile is not None or syringe.cycles > 1:
+        step_profile = syringe.unrolled_step_profile()
+        return step_profile.breakpoints, step_profile.values, step_profile.end
+
+    time = np.asarray(syringe.time)
+    return time, np.asarray(syringe.flow_profile), time[-1] + syringe.timesteps[-1]
+
+
+def _has_cycles(flow_experiment):
+    return any(syringe.cycles > 1 for syringe in flow_experiment.syringes.values())
+
+
+@instrument()
+def change_points(flow_experiment: FlowExperiment, tolerance: float = 0.0):
+    """
+    Find the indices at which any flow profile in the experiment changes.
+    Syringes which repeat their flow profile (see Syringe.cycles) are
+    compared over all of their cycles.
 
     Parameters
     ----------
     flow_experiment: FlowExperiment
+    tolerance: float
+        Changes between consecutive flow values with a magnitude not
+        exceeding tolerance are ignored. In flow profile units.
+
+    Returns
+    -------
+    retain_idx: numpy.ndarray
+        Sorted indices of the first point, every point at which a flow
+        profile differs from the preceding point, and the final point.
+    """
+
+    if flow_experiment.columnar and not _has_cycles(flow_experiment):
+        _, matrix = flow_experiment.stacked_profiles()
+        profiles = list(matrix)
+        unrolled = []
+    else:
+        syringes = flow_experiment.syringes
+        unrolled = [_unrolled(syringes[s]) for s in syringes]
+        profiles = [flow_profile for _, flow_profile, _ in unrolled]
+
+    n_points = len(profiles[0])
+    for profile in profiles:
+        if len(profile) != n_points:
+            raise ValueError(
+                f"Experiment {flow_experiment.name}: flow profiles have "
+                "different lengths."
+            )
+
+    for time, _, _ in unrolled[1:]:
+        if not np.array_equal(time, unrolled[0][0]):
+            raise ValueError(
+                f"Experiment {flow_experiment.name}: flow profiles have "
+                "different time axes."
+            )
+
+    changed = np.zeros(max(n_points - 1, 0), dtype=bool)
+    for profile in profiles:
+        delta = np.diff(profile)
+        np.abs(delta, out=delta)
+        changed |= delta > tolerance
+
+    retain = np.ones(n_points, dtype=bool)
+    retain[1:-1] = changed[:-1]
+
+    return np.flatnonzero(retain)
+
+
+@instrument()
+def minimise_steps(
+    flow_experiment: FlowExperiment, inplace: bool = False, tolerance: float = 0.0
+) -> FlowExperiment:
+    """
+    Truncate flow profiles based on where flow profiles change. Each
+    remaining step lasts until the next one, and the last step still ends
+    when the original profiles did.
+
+    Syringes which repeat their flow profile (see Syringe.cycles) are
+    unrolled if any steps are merged, and are left with a single cycle.
+
+    Parameters
+    ----------
+    flow_experiment: FlowExperiment
+    inplace: bool
+        If True, the syringes of flow_experiment are modified and
+        flow_experiment is returned. Otherwise a modified copy of the
+        experiment is returned which shares its syringes' arrays with the
+        original where they do not need to be truncated.
+    tolerance: float
+        Changes between consecutive flow values with a magnitude not
+        exceeding tolerance are ignored, so that floating point noise does
+        not prevent steps from being merged. In flow profile units.
 
     Returns
     -------
     experiment: FlowExperiment
     """
-    experiment = deepcopy(flow_experiment)
 
-    delta_positions = np.array([], dtype=int)
-    for s in experiment.syringes:
-        syringe = experiment.syringes.get(s)
-        changes = np.hstack(([1.0], np.diff(syringe.flow_profile)))
-        delta_idx = np.where((changes > 0) | (changes < 0))[0]
-        if len(delta_idx) == 0:
-            delta_idx = [0]
-        delta_positions = np.hstack((delta_positions, delta_idx))
+    retain_idx = change_points(flow_experiment, tolerance=tolerance)
+    a_syringe = flow_experiment.syringes[list(flow_experiment.syringes)[-1]]
+    n_points = len(a_syringe.time) * a_syringe.cycles
+    cycles = _has_cycles(flow_experiment)
+    truncate = len(retain_idx) != n_points
+
+    if inplace:
+        experiment = flow_experiment
+    else:
+        experiment = copy.copy(flow_experiment)
+        experiment.series_values = copy.copy(flow_experiment.series_values)
+        experiment.syringes = {
+            s: copy.copy(flow_experiment.syringes[s]) for s in flow_experiment.syringes
+        }
 
-    retain_idx = np.sort(np.unique(delta_positions))
+    if not truncate:
+        return experiment
 
-    # ensure the final timestep is included
-    retain_idx = np.hstack((retain_idx, [-1]))
+    if experiment.columnar:
+        if cycles:
+            time, _, end = _unrolled(a_syringe)
+            syringes = flow_experiment.syringes
+            matrix = np.stack([_unrolled(syringes[s])[1] for s in syringes])
+        else:
+            time, matrix = flow_experiment.stacked_profiles()
+            end = time[-1] + a_syringe.timesteps[-1]
+        experiment._pack(
+            time[retain_idx],
+            experiment.time_unit,
+            np.take(matrix, retain_idx, axis=1),
+            end=end,
+        )
+        for s in experiment.syringes:
+            if experiment.syringes[s].cycles > 1:
+                experiment.syringes[s].set_cycles(1)
+        return experiment
 
     for s in experiment.syringes:
         syringe = experiment.syringes.get(s)
-        syringe.time = syringe.time[retain_idx]
-        syringe.flow_profile = syringe.flow_profile[retain_idx]
-        syringe.calculate_timesteps()
+        if syringe.step_profile is not None or syringe.cycles > 1:
+            time, flow_profile, end = _unrolled(syringe)
+            syringe.time = time[retain_idx]
+            syringe.flow_profile = flow_profile[retain_idx]
+            syringe.set_cycles(1)
+        else:
+            time = np.asarray(syringe.time)
+            end = time[-1] + syringe.timesteps[-1]
+            syringe.time = time[retain_idx]
+            # Truncate the stored values, so that the precision of the syringe
+            # (see Syringe.set_precision()) is kept without converting them.
+            syringe.store_flow_profile(
+                np.asarray(syringe.stored_flow_profile)[retain_idx]
+            )
+        syringe.timesteps = np.diff(syringe.time, append=end)
 
     return experiment
@@ -0,0 +1,381 @@
+"""
+Checking flow experiments against what a syringe pump can do, and snapping
+them onto values the pump can run.
+
+All syringes of an experiment are handled together as a
+(n_syringes, n_steps) matrix on their shared time axis.
+"""
+import copy
+from typing import NamedTuple
+import numpy as np
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils import units
+
+
+class PumpModel:
+    def __init__(
+        self,
+        max_flow,
+        flow_unit,
+        min_flow=0.0,
+        flow_resolution=0.0,
+        min_step_duration=0.0,
+        time_resolution=0.1,
+        time_unit="s",
+        syringe_volume=np.inf,
+        volume_unit="µL",
+    ):
+        """
+        Limits of a syringe pump and the syringes mounted on it.
+
+        Parameters
+        ----------
+        max_flow: float
+            Largest flow rate magnitude, in flow_unit.
+        flow_unit: str
+        min_flow: float
+            Smallest non-zero flow rate magnitude, in flow_unit.
+        flow_resolution: float
+            Flow rates must be multiples of flow_resolution, in flow_unit.
+            0 for no restriction.
+        min_step_duration: float
+            Shortest flow step, in time_unit.
+        time_resolution: float
+            Step times are rounded to multiples of time_resolution when
+            quantizing, in time_unit. The Cetoni software uses 0.1 s.
+        time_unit: str
+        syringe_volume: float
+            Volume of each syringe, in volume_unit.
+        volume_unit: str
+        """
+
+        self.max_flow = max_flow
+        self.flow_unit = flow_unit
+        self.min_flow = min_flow
+        self.flow_resolution = flow_resolution
+        self.min_step_duration = min_step_duration
+        self.time_resolution = time_resolution
+        self.time_unit = time_unit
+        self.syringe_volume = syringe_volume
+        self.volume_unit = volume_unit
+
+
+class Violation(NamedTuple):
+    """
+    Flow steps of a syringe which break one of the limits of a PumpModel.
+
+    kind is one of "max_flow", "min_flow", "flow_resolution",
+    "step_duration" or "capacity". indices are the offending steps on the
+    experiment's aligned time axis; for "step_duration", the aligned steps at
+    which the syringe's own short steps start; for "capacity", the step in
+    which the syringe runs out.
+    """
+
+    syringe: str
+    kind: str
+    indices: np.ndarray
+    message: str
+
+
+# Relative tolerance for flow rates being multiples of the flow resolution.
+RESOLUTION_TOLERANCE = 1e-6
+
+
+def _flow_matrix(experiment: FlowExperiment, flow_unit: str):
+    """
+    Get the aligned flow profiles of an experiment as a matrix in flow_unit.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    flow_unit: str
+
+    Returns
+    -------
+    time: numpy.ndarray
+    time_unit: str
+    matrix: numpy.ndarray
+        (n_syringes, n_steps) flow rates in flow_unit.
+    """
+
+    time, time_unit, profiles = experiment.aligned_profiles()
+
+    matrix = np.empty((len(profiles), len(time)))
+    for row, s in enumerate(experiment.syringes):
+        syringe_unit = experiment.syringes[s].flow_unit
+        units.convert(profiles[s], syringe_unit, flow_unit, out=matrix[row])
+
+    return time, time_unit, matrix
+
+
+def _short_steps(syringe, time, time_unit, min_step):
+    """
+    Find the steps of a syringe which are shorter than min_step.
+
+    Parameters
+    ----------
+    syringe: Syringe
+    time: numpy.ndarray
+        Aligned time axis of the experiment.
+    time_unit: str
+        Unit of time and min_step.
+    min_step: float
+
+    Returns
+    -------
+    indices: numpy.ndarray
+        Indices of time at which the short steps start.
+    """
+
+    step_profile = syringe.unrolled_step_profile()
+    breakpoints = np.asarray(step_profile.breakpoints, dtype=np.float64)
+    durations = step_profile.durations
+    if syringe.time_unit != time_unit:
+        breakpoints = units.convert(breakpoints, syringe.time_unit, time_unit)
+        durations = units.convert(durations, syringe.time_unit, time_unit)
+
+    short = breakpoints[durations < min_step]
+
+    return np.searchsorted(time, short)
+
+
+def check_pump_constraints(
+    experiment: FlowExperiment, pump: PumpModel
+) -> list[Violation]:
+    """
+    Find the flow steps of an experiment which the pump cannot run.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    pump: PumpModel
+
+    Returns
+    -------
+    violations: list[Violation]
+        Empty if the experiment can be run.
+    """
+
+    time, time_unit, matrix = _flow_matrix(experiment, pump.flow_unit)
+    magnitude = np.abs(matrix)
+
+    masks = {
+        "max_flow": magnitude > pump.max_flow,
+        "min_flow": (magnitude > 0) & (magnitude < pump.min_flow),
+    }
+    limits = {
+        "max_flow": f"above the maximum of {pump.max_flow} {pump.flow_unit}",
+        "min_flow": f"below the minimum of {pump.min_flow} {pump.flow_unit}",
+    }
+
+    if pump.flow_resolution > 0:
+        multiples = magnitude / pump.flow_resolution
+        error = np.abs(multiples - np.rint(multiples))
+        masks["flow_resolution"] = error > RESOLUTION_TOLERANCE * np.maximum(
+            multiples, 1.0
+        )
+        limits["flow_resolution"] = (
+            f"not multiples of {pump.flow_resolution} {pump.flow_unit}"
+        )
+
+    min_step = units.convert(pump.min_step_duration, pump.time_unit, time_unit)
+
+    capacity = units.to_SI(pump.syringe_volume, pump.volume_unit)
+
+    violations = []
+    for row, s in enumerate(experiment.syringes):
+        for kind, mask in masks.items():
+            indices = np.flatnonzero(mask[row])
+            if len(indices) > 0:
+                message = f"Syringe {s}: {len(indices)} flow rates {limits[kind]}."
+                violations.append(Violation(s, kind, indices, message))
+
+        # Step durations of the syringe itself: a short step of another
+        # syringe does not shorten this syringe's steps on the aligned axis.
+        short_steps = _short_steps(experiment.syringes[s], time, time_unit, min_step)
+        if len(short_steps) > 0:
+            message = (
+                f"Syringe {s}: {len(short_steps)} steps shorter than "
+                f"{pump.min_step_duration} {pump.time_unit}."
+            )
+            violations.append(Violation(s, "step_duration", short_steps, message))
+
+        # Volume pumped since the start, in either direction.
+        dispensed = np.abs(experiment.dispensed_volume[s])
+        over = np.flatnonzero(dispensed > capacity)
+        if len(over) > 0:
+            used = units.from_SI(dispensed.max(), pump.volume_unit)
+            message = (
+                f"Syringe {s}: requires {used:.6g} {pump.volume_unit}, more "
+                f"than the syringe volume of {pump.syringe_volume} "
+                f"{pump.volume_unit}."
+            )
+            violations.append(Violation(s, "capacity", over[:1], message))
+
+    return violations
+
+
+def quantize_flows(matrix: np.ndarray, pump: PumpModel) -> np.ndarray:
+    """
+    Snap flow rates onto values the pump can run: magnitudes are clipped to
+    pump.max_flow, rounded to pump.flow_resolution, and non-zero magnitudes
+    below pump.min_flow go to whichever of 0 and pump.min_flow is nearer.
+
+    Parameters
+    ----------
+    matrix: numpy.ndarray
+        Flow rates in pump.flow_unit.
+    pump: PumpModel
+
+    Returns
+    -------
+    quantized: numpy.ndarray
+    """
+
+    sign = np.sign(matrix)
+    magnitude = np.minimum(np.abs(matrix), pump.max_flow)
+
+    if pump.flow_resolution > 0:
+        magnitude = np.rint(magnitude / pump.flow_resolution)
+        magnitude *= pump.flow_resolution
+        # Rounding up may step over the maximum.
+        over = magnitude > pump.max_flow
+        magnitude[over] -= pump.flow_resolution
+
+    low = magnitude < pump.min_flow
+    magnitude[low] = np.where(magnitude[low] < pump.min_flow / 2, 0.0, pump.min_flow)
+
+    return sign * magnitude
+
+
+def quantize_time(time: np.ndarray, pump: PumpModel, end=None):
+    """
+    Round step times to pump.time_resolution and find the steps which are
+    still long enough to keep. A dropped step is absorbed into the step
+    before it. The first step is always kept.
+
+    Parameters
+    ----------
+    time: numpy.ndarray
+        Step start times in pump.time_unit.
+    pump: PumpModel
+    end: float or None
+        End of the last step in pump.time_unit, rounded in the same way. If
+        None, the last step is held for as long as the one preceding it.
+
+    Returns
+    -------
+    time: numpy.ndarray
+        Rounded step start times.
+    retain_idx: numpy.ndarray
+        Indices of the steps to keep.
+    """
+
+    time = _round_time(time, pump)
+
+    durations = np.diff(time)
+    if end is not None:
+        durations = np.append(durations, _round_time(end, pump) - time[-1])
+    else:
+        # The last flow step will be held for as long as the one preceding it.
+        durations = np.append(durations, durations[-1] if len(durations) > 0 else 0.0)
+
+    retain = (durations > 0) & (durations >= pump.min_step_duration)
+    retain[0] = True
+
+    return time, np.flatnonzero(retain)
+
+
+def _round_time(time, pump: PumpModel):
+    """
+    Round times to pump.time_resolution.
+
+    Parameters
+    ----------
+    time: float or numpy.ndarray
+        In pump.time_unit.
+    pump: PumpModel
+
+    Returns
+    -------
+    time: float or numpy.ndarray
+    """
+
+    if pump.time_resolution > 0:
+        return np.rint(time / pump.time_resolution) * pump.time_resolution
+
+    return time
+
+
+def quantize_experiment(
+    experiment: FlowExperiment, pump: PumpModel, inplace: bool = False
+) -> FlowExperiment:
+    """
+    Snap the flow profiles of an experiment onto what the pump can run, see
+    quantize_flows() and quantize_time(). Each syringe is quantized on its
+    own time axis (with any cycles unrolled), keeps its time and flow units,
+    and keeps the end time of its last step. Syringe capacity cannot be
+    fixed this way; use check_pump_constraints().
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    pump: PumpModel
+    inplace: bool
+        If True, the syringes of experiment are modified and experiment is
+        returned. Otherwise a modified copy of the experiment is returned.
+
+    Returns
+    -------
+    experiment: FlowExperiment
+    """
+
+    quantized = {}
+    for s in experiment.syringes:
+        syringe = experiment.syringes[s]
+        step_profile = syringe.unrolled_step_profile()
+
+        flows = units.convert(
+            np.asarray(step_profile.values, dtype=np.float64),
+            syringe.flow_unit,
+            pump.flow_unit,
+        )
+        flows = units.convert(
+            quantize_flows(flows, pump), pump.flow_unit, syringe.flow_unit
+        )
+
+        time = units.convert(
+            np.asarray(step_profile.breakpoints, dtype=np.float64),
+            syringe.time_unit,
+            pump.time_unit,
+        )
+        end = units.convert(step_profile.end, syringe.time_unit, pump.time_unit)
+        time, retain_idx = quantize_time(time, pump, end=end)
+
+        time = units.convert(time[retain_idx], pump.time_unit, syringe.time_unit)
+        end = units.convert(_round_time(end, pump), pump.time_unit, syringe.time_unit)
+        quantized[s] = (time, flows[retain_idx], end)
+
+    if not inplace:
+        original = experiment
+        experiment = copy.copy(original)
+        experiment.series_values = copy.copy(original.series_values)
+        experiment.syringes = {
+            s: copy.copy(original.syringes[s]) for s in original.syringes
+        }
+
+    if experiment.columnar:
+        # The syringes of a columnar experiment share their time axis, so
+        # they are quantized onto the same times.
+        time, _, end = quantized[list(quantized)[-1]]
+        matrix = np.stack([quantized[s][1] for s in experiment.syringes])
+        experiment._pack(time, experiment.time_unit, matrix, end=end)
+        return experiment
+
+    for s in experiment.syringes:
+        syringe = experiment.syringes[s]
+        time, flows, end = quantized[s]
+        syringe.set_flow_profile(time, syringe.time_unit, flows, syringe.flow_unit)
+        syringe.timesteps = np.diff(time, append=end)
+
+    return experiment
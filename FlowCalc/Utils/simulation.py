@@ -0,0 +1,243 @@
+"""
+Simulation of the concentrations leaving the reactor of a flow experiment.
+
+Flow rates change over time, so the calculations are carried out against the
+cumulative volume pumped through the reactor rather than against time. For
+a plug flow reactor, the fluid leaving at time t entered when the cumulative
+volume was one reactor volume less than at t. For a series of stirred tanks,
+the inlet concentrations are convolved with the residence volume
+distribution of the tanks.
+
+All results are in SI units: times in s and concentrations in M. Only
+syringes with a concentration in molar units are included.
+"""
+import math
+import numpy as np
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils import units
+
+
+def _molar_concentrations(experiment: FlowExperiment) -> dict[str, float]:
+    """
+    Get the concentrations of the syringes which have molar concentration
+    units, in M.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+
+    Returns
+    -------
+    concentrations: dict[str, float]
+    """
+
+    concentrations = {}
+    for s in experiment.syringes:
+        syringe = experiment.syringes[s]
+        if units.is_known_unit(syringe.conc_unit):
+            if units.SI_unit(syringe.conc_unit) == "M":
+                concentrations[s] = units.to_SI(
+                    syringe.concentration, syringe.conc_unit
+                )
+
+    return concentrations
+
+
+def inlet_concentrations(experiment: FlowExperiment) -> dict[str, np.ndarray]:
+    """
+    Concentration of each syringe's species in the combined stream entering
+    the reactor, during each step of FlowExperiment.time_SI.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+
+    Returns
+    -------
+    concentrations: dict[str, numpy.ndarray]
+        {syringe name: concentration in M}. Zero while nothing flows.
+    """
+
+    _, _, profiles = experiment.aligned_profiles()
+    total_flow = experiment.total_flow
+
+    flowing = total_flow > 0
+
+    concentrations = {}
+    for s, concentration in _molar_concentrations(experiment).items():
+        flow = units.to_SI(profiles[s], experiment.syringes[s].flow_unit)
+        inlet = np.zeros(len(total_flow))
+        inlet[flowing] = concentration * flow[flowing] / total_flow[flowing]
+        concentrations[s] = inlet
+
+    return concentrations
+
+
+def _volume_axis(experiment: FlowExperiment):
+    """
+    Get the cumulative volume pumped at the start of each step and at the
+    end of the final step.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+
+    Returns
+    -------
+    step_times: numpy.ndarray
+        Start of each step and end of the final step, in s.
+    step_volumes: numpy.ndarray
+        Cumulative volume at each of step_times, in L.
+    """
+
+    time = experiment.time_SI
+    step_times = np.append(time, time[-1] + experiment.timesteps_SI[-1])
+    step_volumes = np.concatenate(([0.0], experiment.total_dispensed_volume))
+
+    return step_times, step_volumes
+
+
+def plug_flow_outlet(experiment: FlowExperiment, time=None):
+    """
+    Outlet concentrations of a plug flow reactor.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    time: array or None
+        Times at which to evaluate the outlet concentrations, in s. Defaults
+        to FlowExperiment.time_SI.
+
+    Returns
+    -------
+    time: numpy.ndarray
+        Evaluation times in s.
+    concentrations: dict[str, numpy.ndarray]
+        {syringe name: outlet concentration in M}. NaN until the first fluid
+        pumped has passed through the reactor.
+    """
+
+    if time is None:
+        time = experiment.time_SI
+    time = np.asarray(time, dtype=np.float64)
+
+    reactor_volume = units.to_SI(
+        experiment.reactor_volume, experiment.reactor_volume_unit
+    )
+
+    step_times, step_volumes = _volume_axis(experiment)
+
+    # Cumulative volume is piecewise linear in time. The fluid at the outlet
+    # at time t entered during the step in which the cumulative volume passed
+    # V(t) - reactor_volume.
+    entry_volume = np.interp(time, step_times, step_volumes) - reactor_volume
+    entry_step = np.searchsorted(step_volumes, entry_volume, side="right") - 1
+    entry_step = np.minimum(entry_step, len(step_volumes) - 2)
+    arrived = entry_volume >= 0
+
+    concentrations = {}
+    for s, inlet in inlet_concentrations(experiment).items():
+        outlet = np.full(time.shape, np.nan)
+        outlet[arrived] = inlet[entry_step[arrived]]
+        concentrations[s] = outlet
+
+    return time, concentrations
+
+
+def _fft_convolve(signal, kernel):
+    """
+    Linear convolution of two 1D arrays, truncated to the length of signal.
+
+    Parameters
+    ----------
+    signal: numpy.ndarray
+    kernel: numpy.ndarray
+
+    Returns
+    -------
+    convolved: numpy.ndarray
+    """
+
+    n = len(signal) + len(kernel) - 1
+    size = 1 << (n - 1).bit_length()
+
+    spectrum = np.fft.rfft(signal, size) * np.fft.rfft(kernel, size)
+
+    return np.fft.irfft(spectrum, size)[: len(signal)]
+
+
+def tanks_in_series_outlet(
+    experiment: FlowExperiment,
+    n_tanks: int = 1,
+    time=None,
+    points_per_reactor_volume: int = 200,
+):
+    """
+    Outlet concentrations of a reactor modelled as n_tanks equal, ideally
+    stirred tanks in series (n_tanks=1 is a single CSTR). The reactor is
+    assumed to be initially filled with solvent.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    n_tanks: int
+        Number of tanks. Larger numbers approach plug flow.
+    time: array or None
+        Times at which to evaluate the outlet concentrations, in s. Defaults
+        to FlowExperiment.time_SI.
+    points_per_reactor_volume: int
+        Resolution of the cumulative volume grid on which the convolution is
+        carried out.
+
+    Returns
+    -------
+    time: numpy.ndarray
+        Evaluation times in s.
+    concentrations: dict[str, numpy.ndarray]
+        {syringe name: outlet concentration in M}.
+    """
+
+    if n_tanks < 1:
+        raise ValueError(f"n_tanks must be at least 1, not {n_tanks}.")
+
+    if time is None:
+        time = experiment.time_SI
+    time = np.asarray(time, dtype=np.float64)
+
+    reactor_volume = units.to_SI(
+        experiment.reactor_volume, experiment.reactor_volume_unit
+    )
+    if reactor_volume <= 0:
+        raise ValueError("The reactor volume must be greater than zero.")
+
+    step_times, step_volumes = _volume_axis(experiment)
+
+    dv = reactor_volume / points_per_reactor_volume
+    volume_grid = np.arange(0.0, step_volumes[-1] + dv, dv)
+
+    # Residence volume distribution of the tanks, a gamma distribution with
+    # mean reactor_volume, evaluated at the midpoint of each grid interval
+    # out to where it is negligible.
+    tail = reactor_volume * (1 + 12 / math.sqrt(n_tanks))
+    u = (np.arange(0, int(np.ceil(tail / dv))) + 0.5) * dv
+    tank_volume = reactor_volume / n_tanks
+    log_e = (
+        (n_tanks - 1) * np.log(u)
+        - u / tank_volume
+        - n_tanks * math.log(tank_volume)
+        - math.lgamma(n_tanks)
+    )
+    kernel = np.exp(log_e) * dv
+
+    # Index of the step during which each grid volume was pumped.
+    grid_step = np.searchsorted(step_volumes, volume_grid, side="right") - 1
+    grid_step = np.minimum(grid_step, len(step_volumes) - 2)
+
+    outlet_volume = np.interp(time, step_times, step_volumes)
+
+    concentrations = {}
+    for s, inlet in inlet_concentrations(experiment).items():
+        outlet_grid = _fft_convolve(inlet[grid_step], kernel)
+        concentrations[s] = np.interp(outlet_volume, volume_grid, outlet_grid)
+
+    return time, concentrations
@@ -0,0 +1,252 @@
+"""
+Conversion of unit strings to SI units.
+
+A unit string is parsed once into a Unit record (scale, offset, SI unit),
+which is cached, and is then applied to whole arrays. Compound units are
+composed from prefixed base units separated by "/" (e.g. nL/min, mL/day,
+mmol/L), so each spelling of a unit does not need its own entry.
+"""
+import functools
+import numpy as np
+from typing import NamedTuple
+from FlowCalc.Utils.instrumentation import instrument
+
+# mu: U+03BC
+# micro: U+00B5
+PREFIXES: dict[str, float] = {
+    "p": 1e-12,
+    "n": 1e-9,
+    "µ": 1e-6,
+    "μ": 1e-6,
+    "u": 1e-6,
+    "m": 1e-3,
+    "c": 1e-2,
+    "d": 1e-1,
+    "k": 1e3,
+}
+
+# Base units: symbol: (scale, offset, SI unit, accepts prefixes)
+BASE_UNITS: dict[str, tuple[float, float, str, bool]] = {
+    # Volumes
+    "L": (1.0, 0.0, "L", True),
+    "l": (1.0, 0.0, "L", True),
+    # Times
+    "s": (1.0, 0.0, "s", True),
+    "sec": (1.0, 0.0, "s", False),
+    "min": (60.0, 0.0, "s", False),
+    "h": (3600.0, 0.0, "s", False),
+    "hr": (3600.0, 0.0, "s", False),
+    "d": (86400.0, 0.0, "s", False),
+    "day": (86400.0, 0.0, "s", False),
+    # Angles
+    "rad": (1.0, 0.0, "rad", False),
+    "deg": (np.pi / 180, 0.0, "rad", False),
+    "degrees": (np.pi / 180, 0.0, "rad", False),
+    # Amounts and concentrations
+    "mol": (1.0, 0.0, "mol", True),
+    "M": (1.0, 0.0, "M", True),
+    # Temperatures
+    "K": (1.0, 0.0, "K", False),
+    "°C": (1.0, 273.15, "K", False),
+}
+
+
+class Unit(NamedTuple):
+    """
+    A linear conversion to SI units: si_value = value * scale + offset.
+    """
+
+    scale: float
+    offset: float
+    si_unit: str
+
+
+def _parse_symbol(symbol: str) -> Unit:
+    """
+    Parse a single, optionally prefixed, unit symbol.
+
+    Parameters
+    ----------
+    symbol: str
+
+    Returns
+    -------
+    unit: Unit
+    """
+
+    if symbol in BASE_UNITS:
+        scale, offset, si_unit, _ = BASE_UNITS[symbol]
+        return Unit(scale, offset, si_unit)
+
+    prefix, base = symbol[:1], symbol[1:]
+    if prefix in PREFIXES and base in BASE_UNITS and BASE_UNITS[base][3]:
+        scale, offset, si_unit, _ = BASE_UNITS[base]
+        return Unit(PREFIXES[prefix] * scale, offset, si_unit)
+
+    raise ValueError(f"No SI conversion for unit {symbol}.")
+
+
+@functools.lru_cache(maxsize=None)
+def parse_unit(unit: str) -> Unit:
+    """
+    Parse a unit string into its conversion to SI units.
+
+    Parameters
+    ----------
+    unit: str
+        Unit string, e.g. "µL", "nL/min", "mL/day", "mM".
+
+    Returns
+    -------
+    unit: Unit
+
+    Raises
+    ------
+    ValueError
+        If the unit (or a part of a compound unit) is not known.
+    """
+
+    terms = [t.strip() for t in unit.strip().split("/")]
+
+    if len(terms) == 1:
+        return _parse_symbol(terms[0])
+
+    scale = 1.0
+    numerator = []
+    denominator = []
+    for c, term in enumerate(terms):
+        if c == 0 and term == "1":
+            continue
+
+        part = _parse_symbol(term)
+        if part.offset != 0.0:
+            raise ValueError(f"Unit {term} cannot be part of compound unit {unit}.")
+
+        if c == 0:
+            scale *= part.scale
+            numerator.append(part.si_unit)
+        else:
+            scale /= part.scale
+            denominator.append(part.si_unit)
+
+    si_unit = "/".join(["".join(numerator) or "1"] + denominator)
+
+    return Unit(scale, 0.0, si_unit)
+
+
+@instrument()
+def to_SI(values, unit: str, out=None):
+    """
+    Convert values in a given unit to SI units.
+
+    Parameters
+    ----------
+    values: float or array
+        Values to convert.
+    unit: str
+        Unit of values.
+    out: numpy.ndarray or None
+        Optional output buffer. Pass values itself to convert in place.
+
+    Returns
+    -------
+    si_values: float or numpy.ndarray
+        Values in SI units (out, if it was given).
+    """
+
+    scale, offset, _ = parse_unit(unit)
+
+    si_values = np.multiply(values, scale, out=out)
+    if offset != 0.0:
+        si_values = np.add(si_values, offset, out=out)
+
+    return si_values
+
+
+@instrument()
+def from_SI(si_values, unit: str, out=None):
+    """
+    Convert values in SI units to a given unit.
+
+    Parameters
+    ----------
+    si_values: float or array
+        Values in SI units.
+    unit: str
+        Unit to convert to.
+    out: numpy.ndarray or None
+        Optional output buffer.
+
+    Returns
+    -------
+    values: float or numpy.ndarray
+        Values in the given unit (out, if it was given).
+    """
+
+    scale, offset, _ = parse_unit(unit)
+
+    if offset != 0.0:
+        si_values = np.subtract(si_values, offset, out=out)
+
+    return np.divide(si_values, scale, out=out)
+
+
+@instrument()
+def convert(values, from_unit: str, to_unit: str, out=None):
+    """
+    Convert values between two units with the same SI unit.
+
+    Parameters
+    ----------
+    values: float or array
+    from_unit: str
+    to_unit: str
+    out: numpy.ndarray or None
+        Optional output buffer.
+
+    Returns
+    -------
+    converted: float or numpy.ndarray
+    """
+
+    if SI_unit(from_unit) != SI_unit(to_unit):
+        raise ValueError(f"Cannot convert from {from_unit} to {to_unit}.")
+
+    return from_SI(to_SI(values, from_unit, out=out), to_unit, out=out)
+
+
+def SI_unit(unit: str) -> str:
+    """
+    Get the SI unit corresponding to a unit.
+
+    Parameters
+    ----------
+    unit: str
+
+    Returns
+    -------
+    si_unit: str
+    """
+
+    return parse_unit(unit).si_unit
+
+
+def is_known_unit(unit: str) -> bool:
+    """
+    Check whether a unit can be converted to SI units.
+
+    Parameters
+    ----------
+    unit: str
+
+    Returns
+    -------
+    known: bool
+    """
+
+    try:
+        parse_unit(unit)
+    except ValueError:
+        return False
+
+    return True
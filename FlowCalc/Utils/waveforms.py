@@ -0,0 +1,458 @@
+"""
+Composable waveforms for designing flow profiles.
+
+A waveform is an expression such as
+
+    Constant(100, 600).then(Ramp(100, 500, 3600)) * 2 + Sine(50, 0, 300, 4200)
+
+Building an expression does not evaluate it. Values are only calculated,
+with array operations, when the waveform is sampled onto a time grid (for
+example by Syringe.set_waveform()). Waveforms made only of constant pieces
+can be converted to a StepProfile without any time grid.
+
+Times are relative to the start of the waveform and are in whichever unit
+the waveform is later assigned with. Outside of [0, duration) a waveform is
+zero.
+"""
+import abc
+import numpy as np
+from FlowCalc.Classes import StepProfile
+from FlowCalc.Utils.conversions import sine_params_from_limits
+
+
+class Waveform(abc.ABC):
+    """
+    Base class for waveforms. Subclasses set self.duration and implement
+    _evaluate(time) for times within [0, duration).
+    """
+
+    duration = 0.0
+
+    # True for waveforms which can be converted to a StepProfile.
+    piecewise_constant = False
+
+    def sample(self, time):
+        """
+        Evaluate the waveform at the given times.
+
+        Parameters
+        ----------
+        time: array
+            Times relative to the start of the waveform.
+
+        Returns
+        -------
+        values: numpy.ndarray
+            Waveform values, zero outside of [0, duration).
+        """
+
+        time = np.asarray(time, dtype=np.float64)
+
+        inside = (time >= 0) & (time < self.duration)
+
+        values = np.zeros(time.shape)
+        values[inside] = self._evaluate(time[inside])
+
+        return values
+
+    def __call__(self, time):
+        return self.sample(time)
+
+    def to_grid(self, timestep):
+        """
+        Sample the waveform on a regular time grid covering its duration.
+
+        Parameters
+        ----------
+        timestep: float
+            Spacing of the time grid.
+
+        Returns
+        -------
+        time: numpy.ndarray
+        values: numpy.ndarray
+        """
+
+        time = np.arange(0.0, self.duration, timestep)
+
+        return time, self.sample(time)
+
+    def to_step_profile(self):
+        """
+        Convert a piecewise constant waveform to a StepProfile.
+
+        Returns
+        -------
+        step_profile: StepProfile
+        """
+
+        breakpoints = np.unique(self._breakpoints())
+
+        # Breakpoints of different pieces which only differ by rounding
+        # (e.g. 3 * 0.1 and 0.3) are the same breakpoint.
+        distinct = np.diff(breakpoints, append=self.duration) > 1e-9 * self.duration
+        breakpoints = breakpoints[distinct]
+
+        # Each step is sampled at its midpoint, rather than at its
+        # breakpoint where rounding can give the value of the previous step.
+        midpoints = (breakpoints + np.append(breakpoints[1:], self.duration)) / 2
+
+        return StepProfile(breakpoints, self.sample(midpoints), end=self.duration)
+
+    def then(self, *others):
+        """
+        Get a waveform which runs the others after this one.
+
+        Parameters
+        ----------
+        others: Waveform
+
+        Returns
+        -------
+        sequence: Sequence
+        """
+
+        return Sequence(self, *others)
+
+    def __add__(self, other):
+        if isinstance(other, Waveform):
+            return Sum(self, other)
+        return Sum(self, Constant(other, self.duration))
+
+    __radd__ = __add__
+
+    def __mul__(self, factor):
+        return Scaled(self, factor)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Scaled(self, -1.0)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    @abc.abstractmethod
+    def _evaluate(self, time):
+        """
+        Evaluate the waveform at times within [0, duration).
+
+        Parameters
+        ----------
+        time: numpy.ndarray
+
+        Returns
+        -------
+        values: numpy.ndarray
+        """
+
+    def _breakpoints(self):
+        raise ValueError(f"{type(self).__name__} is not piecewise constant.")
+
+
+class Constant(Waveform):
+    piecewise_constant = True
+
+    def __init__(self, value, duration):
+        """
+        A constant value.
+
+        Parameters
+        ----------
+        value: float
+        duration: float
+        """
+
+        self.value = value
+        self.duration = duration
+
+    def _evaluate(self, time):
+        return np.full(time.shape, self.value, dtype=np.float64)
+
+    def _breakpoints(self):
+        return np.array([0.0])
+
+
+class Step(Waveform):
+    piecewise_constant = True
+
+    def __init__(self, before, after, at, duration):
+        """
+        A single step from one value to another.
+
+        Parameters
+        ----------
+        before: float
+            Value before the step.
+        after: float
+            Value from the step onwards.
+        at: float
+            Time of the step.
+        duration: float
+        """
+
+        self.before = before
+        self.after = after
+        self.at = at
+        self.duration = duration
+
+    def _evaluate(self, time):
+        return np.where(time < self.at, self.before, self.after).astype(np.float64)
+
+    def _breakpoints(self):
+        return np.array([0.0, self.at])[: 2 if 0 < self.at < self.duration else 1]
+
+
+class Ramp(Waveform):
+    def __init__(self, start, stop, duration):
+        """
+        A linear ramp.
+
+        Parameters
+        ----------
+        start: float
+            Value at the start of the ramp.
+        stop: float
+            Value approached at the end of the ramp.
+        duration: float
+        """
+
+        self.start = start
+        self.stop = stop
+        self.duration = duration
+
+    def _evaluate(self, time):
+        return self.start + (self.stop - self.start) * time / self.duration
+
+
+class Sine(Waveform):
+    def __init__(self, amplitude, offset, period, duration, phase=0.0):
+        """
+        A sine wave, offset + amplitude * sin(2 pi t / period + phase).
+
+        Parameters
+        ----------
+        amplitude: float
+        offset: float
+        period: float
+        duration: float
+        phase: float
+            Phase in radians.
+        """
+
+        self.amplitude = amplitude
+        self.offset = offset
+        self.period = period
+        self.duration = duration
+        self.phase = phase
+
+    @classmethod
+    def from_limits(cls, high, low, period, duration, phase=0.0):
+        """
+        Create a sine wave oscillating between low and high.
+
+        Parameters
+        ----------
+        high: float
+        low: float
+        period: float
+        duration: float
+        phase: float
+
+        Returns
+        -------
+        sine: Sine
+        """
+
+        amplitude, offset = sine_params_from_limits(high, low)
+
+        return cls(amplitude, offset, period, duration, phase=phase)
+
+    def _evaluate(self, time):
+        angle = 2 * np.pi * time / self.period + self.phase
+        return self.offset + self.amplitude * np.sin(angle)
+
+
+class Square(Waveform):
+    piecewise_constant = True
+
+    def __init__(self, high, low, period, duration, duty=0.5):
+        """
+        A square wave, starting at high.
+
+        Parameters
+        ----------
+        high: float
+        low: float
+        period: float
+        duration: float
+        duty: float
+            Fraction of each period spent at high.
+        """
+
+        self.high = high
+        self.low = low
+        self.period = period
+        self.duration = duration
+        self.duty = duty
+
+    def _evaluate(self, time):
+        high = np.mod(time, self.period) < self.duty * self.period
+        return np.where(high, self.high, self.low).astype(np.float64)
+
+    def _breakpoints(self):
+        starts = np.arange(0.0, self.duration, self.period)
+        switches = starts + self.duty * self.period
+        breakpoints = np.sort(np.concatenate((starts, switches)))
+        return breakpoints[breakpoints < self.duration]
+
+
+class LogSweep(Waveform):
+    def __init__(self, amplitude, offset, start_period, stop_period, duration):
+        """
+        A sine wave whose frequency changes exponentially (a logarithmic
+        sweep) from 1 / start_period to 1 / stop_period.
+
+        Parameters
+        ----------
+        amplitude: float
+        offset: float
+        start_period: float
+        stop_period: float
+        duration: float
+        """
+
+        self.amplitude = amplitude
+        self.offset = offset
+        self.start_period = start_period
+        self.stop_period = stop_period
+        self.duration = duration
+
+    def _evaluate(self, time):
+        f_start = 1 / self.start_period
+        f_stop = 1 / self.stop_period
+
+        if f_start == f_stop:
+            angle = 2 * np.pi * f_start * time
+        else:
+            rate = np.log(f_stop / f_start) / self.duration
+            angle = 2 * np.pi * f_start * np.expm1(rate * time) / rate
+
+        return self.offset + self.amplitude * np.sin(angle)
+
+
+class Sequence(Waveform):
+    def __init__(self, *segments):
+        """
+        Waveforms run one after the other.
+
+        Parameters
+        ----------
+        segments: Waveform
+        """
+
+        if len(segments) == 0:
+            raise ValueError("A Sequence requires at least one segment.")
+
+        self.segments = []
+        for segment in segments:
+            # Flatten nested sequences.
+            if isinstance(segment, Sequence):
+                self.segments.extend(segment.segments)
+            else:
+                self.segments.append(segment)
+
+        durations = [segment.duration for segment in self.segments]
+        self.starts = np.concatenate(([0.0], np.cumsum(durations)[:-1]))
+        self.duration = float(np.sum(durations))
+        self.piecewise_constant = all(s.piecewise_constant for s in self.segments)
+
+    def _evaluate(self, time):
+        segment_idx = np.searchsorted(self.starts, time, side="right") - 1
+
+        # Group the times by segment so each segment is evaluated once.
+        order = np.argsort(segment_idx, kind="stable")
+        counts = np.bincount(segment_idx, minlength=len(self.segments))
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+
+        values = np.empty(time.shape)
+        for k, segment in enumerate(self.segments):
+            idx = order[bounds[k] : bounds[k + 1]]
+            if len(idx) > 0:
+                values[idx] = segment.sample(time[idx] - self.starts[k])
+
+        return values
+
+    def _breakpoints(self):
+        return np.concatenate(
+            [
+                segment._breakpoints() + start
+                for segment, start in zip(self.segments, self.starts)
+            ]
+        )
+
+
+class Scaled(Waveform):
+    def __init__(self, waveform, factor):
+        """
+        A waveform multiplied by a constant factor.
+
+        Parameters
+        ----------
+        waveform: Waveform
+        factor: float
+        """
+
+        self.waveform = waveform
+        self.factor = factor
+        self.duration = waveform.duration
+        self.piecewise_constant = waveform.piecewise_constant
+
+    def _evaluate(self, time):
+        return self.factor * self.waveform.sample(time)
+
+    def _breakpoints(self):
+        return self.waveform._breakpoints()
+
+
+class Sum(Waveform):
+    def __init__(self, *terms):
+        """
+        The sum of waveforms, lasting as long as the longest of them.
+
+        Parameters
+        ----------
+        terms: Waveform
+        """
+
+        self.terms = terms
+        self.duration = max(term.duration for term in terms)
+        self.piecewise_constant = all(term.piecewise_constant for term in terms)
+
+    def _evaluate(self, time):
+        values = np.zeros(time.shape)
+        for term in self.terms:
+            values += term.sample(time)
+        return values
+
+    def _breakpoints(self):
+        breakpoints = [term._breakpoints() for term in self.terms]
+        # A shorter term ends within the sum.
+        ends = [[term.duration] for term in self.terms if term.duration < self.duration]
+        return np.concatenate(breakpoints + ends)
+
+
+def concatenate(*waveforms):
+    """
+    Run waveforms one after the other.
+
+    Parameters
+    ----------
+    waveforms: Waveform
+
+    Returns
+    -------
+    sequence: Sequence
+    """
+
+    return Sequence(*waveforms)
@@ -1,7 +1,19 @@
-from .flow_experiment.to_csv import flow_experiment_to_csv
-from .flow_experiment.to_dict import flow_experiment_to_dict
-from .flow_experiment.to_labm8 import flow_experiment_to_labm8
-from .flow_experiment.write_toml_file import write_flow_experiment_toml_file
-from .flow_experiment.write_conditions_file import write_flow_experiment_conditions_file
+from FlowCalc._lazy import attach
 
-from .syringe.to_nfp import syringe_to_nfp
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "flow_experiment_to_csv": ".flow_experiment.to_csv",
+        "flow_experiment_to_dict": ".flow_experiment.to_dict",
+        "flow_experiment_to_labm8": ".flow_experiment.to_labm8",
+        "write_flow_experiment_toml_file": ".flow_experiment.write_toml_file",
+        "write_flow_experiment_conditions_file": ".flow_experiment.write_conditions_file",
+        "flow_experiment_to_nfp": ".flow_experiment.to_nfp",
+        "flow_experiment_to_binary": ".flow_experiment.to_binary",
+        "syringe_to_nfp": ".syringe.to_nfp",
+        "export_experiment": ".export",
+        "export_all": ".async_export",
+        "NumberFormat": "._formatting",
+        "export_experiment_async": ".async_export",
+    },
+)
@@ -0,0 +1,384 @@
+"""
+Helpers for writing numeric data to delimited text files in chunks, so that
+memory use is bounded by the chunk size rather than the length of the data.
+
+Numbers are formatted according to a NumberFormat. Every chunk is formatted
+with a single printf style string operation over all of its values, rather
+than one operation per value.
+"""
+import os
+import uuid
+import contextlib
+import numpy as np
+from FlowCalc.Utils import units
+from FlowCalc.Utils.instrumentation import instrument
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def chunk_bounds(n_rows: int, chunk_size: int):
+    """
+    Iterate over (start, stop) index pairs covering n_rows in chunks.
+
+    Parameters
+    ----------
+    n_rows: int
+    chunk_size: int
+
+    Returns
+    -------
+    bounds: iterator of tuple[int, int]
+    """
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, not {chunk_size}.")
+
+    for start in range(0, n_rows, chunk_size):
+        yield start, min(start + chunk_size, n_rows)
+
+
+def text_values(values: np.ndarray) -> list:
+    """
+    Get the values of an array as a list for "%s" formatting.
+
+    float32 values are formatted as the shortest text which reads back as
+    the same float32, rather than as the float64 the value converts to
+    (0.1 rather than 0.10000000149011612), so that files written from
+    experiments stored at float32 precision do not carry meaningless digits.
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+
+    Returns
+    -------
+    values: list
+    """
+
+    if values.dtype == np.float32:
+        return values.astype(str).tolist()
+
+    return values.tolist()
+
+
+def float_values(values: np.ndarray) -> list[float]:
+    """
+    Get the values of an array as a list of floats, with float32 values
+    converted to the float closest to their shortest text (see
+    text_values()).
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+
+    Returns
+    -------
+    values: list[float]
+    """
+
+    if values.dtype == np.float32:
+        return values.astype(str).astype(np.float64).tolist()
+
+    return np.asarray(values, dtype=np.float64).tolist()
+
+
+class NumberFormat:
+    def __init__(self, significant_digits=None, decimals=None):
+        """
+        How the text writers format numbers.
+
+        By default, numbers are written as the shortest text which reads
+        back as the same value (see text_values()). Otherwise numbers are
+        written with a number of significant digits (in %g style, e.g.
+        2.78e-07 for 3 significant digits) or a fixed number of decimal
+        places (e.g. 0.028 for 3 decimals).
+
+        Parameters
+        ----------
+        significant_digits: int or None
+        decimals: int or None
+
+        Attributes
+        ----------
+        self.significant_digits: int or None
+        self.decimals: int or None
+        self.spec: str
+            printf style conversion used for each number.
+        """
+
+        if significant_digits is not None and decimals is not None:
+            raise ValueError("Give either significant_digits or decimals, not both.")
+
+        if significant_digits is not None:
+            if int(significant_digits) != significant_digits or significant_digits < 1:
+                raise ValueError(
+                    "significant_digits must be a positive integer, not "
+                    f"{significant_digits}."
+                )
+            spec = f"%.{int(significant_digits)}g"
+        elif decimals is not None:
+            if int(decimals) != decimals or decimals < 0:
+                raise ValueError(
+                    f"decimals must be a non-negative integer, not {decimals}."
+                )
+            spec = f"%.{int(decimals)}f"
+        else:
+            spec = "%s"
+
+        self.significant_digits = significant_digits
+        self.decimals = decimals
+        self.spec = spec
+
+    def __repr__(self):
+        return (
+            f"NumberFormat(significant_digits={self.significant_digits}, "
+            f"decimals={self.decimals})"
+        )
+
+    def values(self, values: np.ndarray) -> list:
+        """
+        Get the values of an array as a list to be formatted with
+        NumberFormat.spec.
+
+        Parameters
+        ----------
+        values: numpy.ndarray
+
+        Returns
+        -------
+        values: list
+        """
+
+        if self.spec == "%s":
+            return text_values(values)
+
+        return values.tolist()
+
+    def format(self, values, separator: str = ",") -> str:
+        """
+        Format an array of numbers, with separator after every value.
+
+        Parameters
+        ----------
+        values: array
+        separator: str
+
+        Returns
+        -------
+        text: str
+        """
+
+        values = np.asarray(values).ravel()
+
+        return ((self.spec + separator) * len(values)) % tuple(self.values(values))
+
+
+DEFAULT_NUMBER_FORMAT = NumberFormat()
+
+
+def time_to_SI(time: np.ndarray, time_unit: str) -> np.ndarray:
+    """
+    Convert a time axis to seconds for writing. Integer times which are
+    already in seconds are kept as integers, so that they are written as
+    e.g. 2 rather than 2.0.
+
+    Parameters
+    ----------
+    time: numpy.ndarray
+    time_unit: str
+
+    Returns
+    -------
+    si_time: numpy.ndarray
+    """
+
+    time = np.asarray(time)
+    if time.dtype.kind in "iu" and units.parse_unit(time_unit)[:2] == (1.0, 0.0):
+        return time
+
+    return units.to_SI(time, time_unit)
+
+
+def result_dtype(arrays) -> np.dtype:
+    """
+    Get the type for holding the values of arrays after unit conversion:
+    float32 if all of them are float32, otherwise float64.
+
+    Parameters
+    ----------
+    arrays: iterable of numpy.ndarray
+
+    Returns
+    -------
+    dtype: numpy.dtype
+    """
+
+    dtypes = {np.asarray(array).dtype for array in arrays}
+    if dtypes == {np.dtype(np.float32)}:
+        return np.dtype(np.float32)
+
+    return np.dtype(np.float64)
+
+
+@instrument()
+def format_block(
+    block: np.ndarray,
+    delimiter: str = ",",
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> str:
+    """
+    Format a 2D array as delimited text, one line per row.
+
+    The whole block is formatted with a single string operation. With the
+    default number_format, this gives the same text as formatting each value
+    with f"{value}" (see text_values() for float32 blocks).
+
+    Parameters
+    ----------
+    block: numpy.ndarray
+        (n_rows, n_columns) array.
+    delimiter: str
+    number_format: NumberFormat
+
+    Returns
+    -------
+    text: str
+    """
+
+    n_rows, n_columns = block.shape
+    if n_rows == 0:
+        return ""
+
+    row = delimiter.join([number_format.spec] * n_columns) + "\n"
+
+    return (row * n_rows) % tuple(number_format.values(block.ravel()))
+
+
+@instrument()
+def write_columns(
+    file,
+    columns,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> None:
+    """
+    Write equal length 1D arrays to an open text file as delimited columns.
+    Each column is formatted according to its own type (see text_values()).
+
+    Parameters
+    ----------
+    file: text file object
+    columns: list[array]
+    chunk_size: int
+        Number of rows formatted and written at a time.
+    number_format: NumberFormat
+
+    Returns
+    -------
+    None
+    """
+
+    n_rows = len(columns[0])
+    for column in columns:
+        if len(column) != n_rows:
+            raise ValueError(
+                f"Columns have different lengths ({len(column)} and {n_rows})."
+            )
+
+    columns = [np.asarray(column) for column in columns]
+    n_columns = len(columns)
+    row = ",".join([number_format.spec] * n_columns) + "\n"
+
+    for start, stop in chunk_bounds(n_rows, chunk_size):
+        fields = [None] * (n_columns * (stop - start))
+        for c, column in enumerate(columns):
+            fields[c::n_columns] = number_format.values(column[start:stop])
+
+        file.write((row * (stop - start)) % tuple(fields))
+
+
+@instrument()
+def write_row(
+    file,
+    label: str,
+    values,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> None:
+    """
+    Write a labelled row of values to an open text file, in the form
+    label,value_1,value_2,...,value_n,
+
+    Parameters
+    ----------
+    file: text file object
+    label: str
+    values: array
+    chunk_size: int
+        Number of values formatted and written at a time.
+    number_format: NumberFormat
+
+    Returns
+    -------
+    None
+    """
+
+    values = np.asarray(values).ravel()
+
+    file.write(f"{label},")
+    for start, stop in chunk_bounds(len(values), chunk_size):
+        file.write(number_format.format(values[start:stop]))
+    file.write("\n")
+
+
+def open_text_output(target, encoding: str = "utf-8"):
+    """
+    Get a context manager giving a writable text stream for target.
+
+    Parameters
+    ----------
+    target: str, path or text stream
+        A file name, which is opened for writing, or an object with a write()
+        method, which is used as it is and left open.
+    encoding: str
+        Encoding used when target is a file name.
+
+    Returns
+    -------
+    context: context manager
+    """
+
+    if hasattr(target, "write"):
+        return contextlib.nullcontext(target)
+
+    return open(target, "w", encoding=encoding)
+
+
+def write_atomic(write, path: str) -> None:
+    """
+    Write a file by writing a temporary file in the same directory and
+    renaming it, so that path never holds a partly written file.
+
+    Parameters
+    ----------
+    write: Callable[[str], None]
+        Writes the output to the file name it is given.
+    path: str
+
+    Returns
+    -------
+    None
+    """
+
+    directory, filename = os.path.split(os.path.abspath(path))
+    # A unique name, so that concurrent writers of the same path cannot
+    # collide. The writer creates the file with the usual permissions.
+    temp_path = os.path.join(directory, f".{filename}.{uuid.uuid4().hex}.tmp")
+
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
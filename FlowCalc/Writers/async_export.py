@@ -0,0 +1,309 @@
+"""
+asyncio counterparts of the writers, for writing to slow (e.g. network)
+storage without blocking an event loop.
+
+Formatting and writing happen in worker threads. The number of files being
+written at once is bounded by a semaphore, and export_all() waits for a
+write to finish before starting another once the bound is reached, so
+memory use does not grow with the number of experiments.
+"""
+import os
+import asyncio
+import functools
+from FlowCalc.Classes import FlowExperiment
+from .flow_experiment.to_binary import flow_experiment_to_binary
+from .flow_experiment.to_csv import flow_experiment_to_csv
+from .flow_experiment.to_labm8 import flow_experiment_to_labm8
+from .flow_experiment.write_conditions_file import write_flow_experiment_conditions_file
+from .syringe.to_nfp import syringe_to_nfp
+from .export import DEFAULT_WRITERS
+from .export import _experiment_writer
+from .export import export_paths
+from ._formatting import DEFAULT_NUMBER_FORMAT
+from ._formatting import NumberFormat
+from ._formatting import write_atomic
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+async def run_writer(writer, *args, limiter: asyncio.Semaphore | None = None, **kwargs):
+    """
+    Run a blocking writer in a worker thread.
+
+    Parameters
+    ----------
+    writer: Callable
+    args:
+        Positional arguments of writer.
+    limiter: asyncio.Semaphore or None
+        Held while the writer runs, to bound the number of concurrent
+        writes.
+    kwargs:
+        Keyword arguments of writer.
+
+    Returns
+    -------
+    result:
+        Return value of writer.
+    """
+
+    if limiter is None:
+        return await asyncio.to_thread(writer, *args, **kwargs)
+
+    async with limiter:
+        return await asyncio.to_thread(writer, *args, **kwargs)
+
+
+def _async_writer(writer):
+    """
+    Create a coroutine function which runs writer with run_writer().
+
+    Parameters
+    ----------
+    writer: Callable
+
+    Returns
+    -------
+    async_writer: Callable
+    """
+
+    @functools.wraps(writer)
+    async def async_writer(*args, limiter=None, **kwargs):
+        return await run_writer(writer, *args, limiter=limiter, **kwargs)
+
+    async_writer.__name__ = f"{writer.__name__}_async"
+    async_writer.__qualname__ = async_writer.__name__
+    async_writer.__doc__ = (
+        f"Coroutine version of {writer.__name__}(), run in a worker thread.\n"
+        "Takes an optional limiter (asyncio.Semaphore) keyword argument to\n"
+        "bound the number of concurrent writes."
+    )
+
+    return async_writer
+
+
+flow_experiment_to_csv_async = _async_writer(flow_experiment_to_csv)
+flow_experiment_to_labm8_async = _async_writer(flow_experiment_to_labm8)
+flow_experiment_to_binary_async = _async_writer(flow_experiment_to_binary)
+write_flow_experiment_conditions_file_async = _async_writer(
+    write_flow_experiment_conditions_file
+)
+syringe_to_nfp_async = _async_writer(syringe_to_nfp)
+
+
+async def write_flow_experiment_toml_file_async(
+    flow_experiment: FlowExperiment, filename: str, limiter=None
+) -> None:
+    """
+    Coroutine version of write_flow_experiment_toml_file(), run in a worker
+    thread. Takes an optional limiter (asyncio.Semaphore) keyword argument to
+    bound the number of concurrent writes.
+    """
+
+    # Imported here so that tomli_w is only required for .toml output.
+    from .flow_experiment.write_toml_file import write_flow_experiment_toml_file
+
+    await run_writer(
+        write_flow_experiment_toml_file, flow_experiment, filename, limiter=limiter
+    )
+
+
+def _write_output(
+    experiment: FlowExperiment,
+    output: str,
+    path: str,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> None:
+    """
+    Write one output of export_paths() atomically.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    output: str
+    path: str
+    number_format: NumberFormat
+
+    Returns
+    -------
+    None
+    """
+
+    if output.startswith("nfp:"):
+        syringe = experiment.syringes[output[len("nfp:") :]]
+        write_atomic(
+            lambda temp_path: syringe_to_nfp(
+                syringe, temp_path, number_format=number_format
+            ),
+            path,
+        )
+    else:
+        writer = _experiment_writer(output, number_format=number_format)
+        write_atomic(lambda temp_path: writer(experiment, temp_path), path)
+
+
+async def _export(
+    named_experiments,
+    output_dir,
+    writers,
+    max_concurrency,
+    number_format=DEFAULT_NUMBER_FORMAT,
+):
+    """
+    Write the output files of experiments, at most max_concurrency at a
+    time.
+
+    Parameters
+    ----------
+    named_experiments: iterable of tuple[FlowExperiment, str]
+        (experiment, file name prefix)
+    output_dir: str
+    writers: tuple[str]
+    max_concurrency: int
+    number_format: NumberFormat
+
+    Returns
+    -------
+    paths: list[dict[str, str]]
+    """
+
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, not {max_concurrency}.")
+
+    await asyncio.to_thread(os.makedirs, output_dir, exist_ok=True)
+
+    limiter = asyncio.Semaphore(max_concurrency)
+    errors = []
+    tasks = []
+
+    async def write(experiment, output, path):
+        try:
+            await asyncio.to_thread(
+                _write_output, experiment, output, path, number_format
+            )
+        except Exception as error:
+            errors.append(error)
+            raise
+        finally:
+            limiter.release()
+
+    results = []
+    try:
+        for experiment, basename in named_experiments:
+            paths = export_paths(
+                experiment, output_dir, writers=writers, basename=basename
+            )
+            results.append(paths)
+
+            for output, path in paths.items():
+                # Wait for a free slot before starting another write.
+                await limiter.acquire()
+                if len(errors) > 0:
+                    limiter.release()
+                    break
+                tasks.append(asyncio.create_task(write(experiment, output, path)))
+
+            if len(errors) > 0:
+                break
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+    except BaseException:
+        # Cancelled: abandon the writes which have not started.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    if len(errors) > 0:
+        raise errors[0]
+
+    return results
+
+
+async def export_all(
+    experiments,
+    output_dir: str,
+    writers=DEFAULT_WRITERS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    name_format: str = "{name}",
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> list[dict[str, str]]:
+    """
+    Write the output files of many experiments concurrently, see
+    FlowCalc.Writers.export_experiment().
+
+    Every output file (including each syringe's .nfp file) is written in a
+    worker thread, at most max_concurrency at a time. If a write fails, no
+    further writes are started and the exception is raised once the
+    outstanding writes have finished.
+
+    Parameters
+    ----------
+    experiments: iterable of FlowExperiment
+    output_dir: str
+        Directory for the output files. It is created if it does not exist.
+    writers: tuple[str]
+        Names of the outputs: any of "conditions", "csv", "labm8", "toml" and
+        "nfp".
+    max_concurrency: int
+        Largest number of files being written at once.
+    name_format: str
+        Format of the file name prefix of each experiment, with the fields
+        name (the experiment name) and index (position in experiments).
+    number_format: NumberFormat
+        How numbers are formatted in the text outputs.
+
+    Returns
+    -------
+    paths: list[dict[str, str]]
+        Paths of the output files of each experiment, see export_paths().
+    """
+
+    named_experiments = (
+        (experiment, name_format.format(name=experiment.name, index=index))
+        for index, experiment in enumerate(experiments)
+    )
+
+    return await _export(
+        named_experiments, output_dir, writers, max_concurrency, number_format
+    )
+
+
+async def export_experiment_async(
+    experiment: FlowExperiment,
+    output_dir: str,
+    writers=DEFAULT_WRITERS,
+    basename: str | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> dict[str, str]:
+    """
+    Coroutine version of FlowCalc.Writers.export_experiment(), writing the
+    output files concurrently in worker threads.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    output_dir: str
+    writers: tuple[str]
+    basename: str or None
+        Prefix for the file names. Defaults to the experiment name.
+    max_concurrency: int
+        Largest number of files being written at once.
+    number_format: NumberFormat
+        How numbers are formatted in the text outputs.
+
+    Returns
+    -------
+    paths: dict[str, str]
+        Paths of the output files, see export_paths().
+    """
+
+    if basename is None:
+        basename = experiment.name
+
+    results = await _export(
+        [(experiment, basename)], output_dir, writers, max_concurrency, number_format
+    )
+
+    return results[0]
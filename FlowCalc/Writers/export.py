@@ -0,0 +1,363 @@
+import os
+import json
+import functools
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils.hashing import experiment_hash
+from FlowCalc.Utils.hashing import profiles_hash
+from FlowCalc.Utils.hashing import syringe_hash
+from .flow_experiment.to_csv import flow_experiment_to_csv
+from .flow_experiment.to_labm8 import flow_experiment_to_labm8
+from .flow_experiment.write_conditions_file import write_flow_experiment_conditions_file
+from .flow_experiment.to_nfp import flow_experiment_to_nfp
+from .flow_experiment.to_nfp import nfp_filename
+from ._formatting import DEFAULT_NUMBER_FORMAT
+from ._formatting import NumberFormat
+from ._formatting import write_atomic
+from FlowCalc.Utils.instrumentation import instrument
+
+# File name suffixes of the experiment level outputs.
+EXPERIMENT_WRITERS = {
+    "conditions": "_conditions.csv",
+    "csv": ".csv",
+    "labm8": "_labm8.csv",
+    "toml": ".toml",
+}
+
+DEFAULT_WRITERS = ("conditions", "csv", "labm8", "nfp")
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+# Outputs formatted with a NumberFormat (.toml files are formatted by
+# tomli_w).
+FORMATTED_OUTPUTS = ("conditions", "csv", "labm8", "nfp")
+
+# Outputs which only contain the flow profiles of the syringes.
+PROFILE_OUTPUTS = ("csv", "labm8")
+
+
+def _experiment_writer(writer_name, number_format=DEFAULT_NUMBER_FORMAT):
+    """
+    Get the writer function for an experiment level output.
+
+    Parameters
+    ----------
+    writer_name: str
+    number_format: NumberFormat
+        Number format of the text outputs.
+
+    Returns
+    -------
+    writer: Callable[[FlowExperiment, str], None]
+    """
+
+    if writer_name == "conditions":
+        writer = write_flow_experiment_conditions_file
+    elif writer_name == "csv":
+        writer = flow_experiment_to_csv
+    elif writer_name == "labm8":
+        writer = flow_experiment_to_labm8
+    else:
+        writer = None
+
+    if writer is not None:
+        return functools.partial(writer, number_format=number_format)
+
+    if writer_name == "toml":
+        # Imported here so that tomli_w is only required for .toml output.
+        from .flow_experiment.write_toml_file import write_flow_experiment_toml_file
+
+        return write_flow_experiment_toml_file
+
+    raise ValueError(f"Unknown writer {writer_name}.")
+
+
+def export_paths(
+    experiment: FlowExperiment,
+    output_dir: str,
+    writers=DEFAULT_WRITERS,
+    basename: str | None = None,
+) -> dict[str, str]:
+    """
+    Get the paths of the files that export_experiment() writes.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    output_dir: str
+    writers: tuple[str]
+        Names of the outputs: any of "conditions", "csv", "labm8", "toml" and
+        "nfp".
+    basename: str or None
+        Prefix for the file names. Defaults to the experiment name.
+
+    Returns
+    -------
+    paths: dict[str, str]
+        {output: path}, where output is a writer name, or "nfp:<syringe
+        name>" for the .nfp file of each syringe.
+    """
+
+    if basename is None:
+        basename = experiment.name
+
+    paths = {}
+    for writer_name in writers:
+        if writer_name == "nfp":
+            for s in experiment.syringes:
+                filename = nfp_filename(basename, s)
+                paths[f"nfp:{s}"] = os.path.join(output_dir, filename)
+        elif writer_name in EXPERIMENT_WRITERS:
+            filename = f"{basename}{EXPERIMENT_WRITERS[writer_name]}"
+            paths[writer_name] = os.path.join(output_dir, filename)
+        else:
+            raise ValueError(f"Unknown writer {writer_name}.")
+
+    return paths
+
+
+def manifest_path(output_dir: str, basename: str) -> str:
+    """
+    Get the path of the manifest recording the inputs of the files written
+    by export_experiment().
+
+    Parameters
+    ----------
+    output_dir: str
+    basename: str
+
+    Returns
+    -------
+    path: str
+    """
+
+    return os.path.join(output_dir, f"{basename}{MANIFEST_SUFFIX}")
+
+
+def read_manifest(path: str) -> dict[str, dict]:
+    """
+    Read an export manifest.
+
+    Parameters
+    ----------
+    path: str
+
+    Returns
+    -------
+    outputs: dict[str, dict]
+        {output: {"file", "hash", "size"}}. Empty if there is no manifest,
+        or it cannot be read.
+    """
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+
+    return manifest.get("outputs", {})
+
+
+def output_hashes(
+    experiment: FlowExperiment,
+    paths: dict[str, str],
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> dict[str, str]:
+    """
+    Get a hash of the inputs of each output of export_experiment(). A .nfp
+    file depends only on the flow profile of its syringe, and the .csv and
+    LabM8 files only on the flow profiles of the syringes; the other outputs
+    depend on the whole experiment. The text outputs also depend on
+    number_format.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    paths: dict[str, str]
+        See export_paths().
+    number_format: NumberFormat
+
+    Returns
+    -------
+    hashes: dict[str, str]
+        {output: hash}
+    """
+
+    # The arrays of each syringe are hashed once, without its concentration.
+    syringe_hashes = {
+        s: syringe_hash(experiment.syringes[s], concentration=False)
+        for s in experiment.syringes
+    }
+    whole = experiment_hash(experiment, syringe_hashes=syringe_hashes)
+    profiles = profiles_hash(experiment, syringe_hashes=syringe_hashes)
+
+    hashes = {}
+    for output in paths:
+        if output.startswith("nfp:"):
+            s = output[len("nfp:") :]
+            hashes[output] = f"nfp:{syringe_hashes[s]}"
+        elif output in PROFILE_OUTPUTS:
+            hashes[output] = f"{output}:{profiles}"
+        else:
+            hashes[output] = f"{output}:{whole}"
+
+    for output in hashes:
+        if output.split(":")[0] in FORMATTED_OUTPUTS:
+            hashes[output] += f":{number_format.spec}"
+
+    return hashes
+
+
+def stale_outputs(
+    experiment: FlowExperiment,
+    output_dir: str,
+    writers=DEFAULT_WRITERS,
+    basename: str | None = None,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> list[str]:
+    """
+    Find the outputs of export_experiment() which are missing, or were
+    written from different inputs according to the manifest in output_dir.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    output_dir: str
+    writers: tuple[str]
+    basename: str or None
+    number_format: NumberFormat
+
+    Returns
+    -------
+    outputs: list[str]
+        Keys of export_paths() which need to be written.
+    """
+
+    if basename is None:
+        basename = experiment.name
+
+    paths = export_paths(experiment, output_dir, writers=writers, basename=basename)
+    hashes = output_hashes(experiment, paths, number_format=number_format)
+    recorded = read_manifest(manifest_path(output_dir, basename))
+
+    return _stale(paths, hashes, recorded)
+
+
+def _stale(paths, hashes, recorded):
+    """
+    Compare the hashes of outputs to those recorded in a manifest.
+
+    Parameters
+    ----------
+    paths: dict[str, str]
+    hashes: dict[str, str]
+    recorded: dict[str, dict]
+
+    Returns
+    -------
+    outputs: list[str]
+    """
+
+    stale = []
+    for output, path in paths.items():
+        entry = recorded.get(output)
+        if (
+            entry is None
+            or entry.get("hash") != hashes[output]
+            or entry.get("file") != os.path.basename(path)
+            or not os.path.isfile(path)
+            or os.path.getsize(path) != entry.get("size")
+        ):
+            stale.append(output)
+
+    return stale
+
+
+@instrument(writes="return")
+def export_experiment(
+    experiment: FlowExperiment,
+    output_dir: str,
+    writers=DEFAULT_WRITERS,
+    basename: str | None = None,
+    incremental: bool = False,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> dict[str, str]:
+    """
+    Write the output files for an experiment into a directory.
+
+    Each file is written to a temporary file which is then renamed, so an
+    interrupted export does not leave partly written files.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    output_dir: str
+        Directory for the output files. It is created if it does not exist.
+    writers: tuple[str]
+        Names of the outputs: any of "conditions", "csv", "labm8", "toml" and
+        "nfp".
+    basename: str or None
+        Prefix for the file names. Defaults to the experiment name.
+    incremental: bool
+        If True, hashes of the inputs of each file are kept in a manifest
+        next to the outputs (see manifest_path()), and files whose inputs
+        have not changed since they were written are not rewritten.
+    number_format: NumberFormat
+        How numbers are formatted in the text outputs.
+
+    Returns
+    -------
+    paths: dict[str, str]
+        Paths of the output files, see export_paths().
+    """
+
+    if basename is None:
+        basename = experiment.name
+
+    paths = export_paths(experiment, output_dir, writers=writers, basename=basename)
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    if incremental:
+        hashes = output_hashes(experiment, paths, number_format=number_format)
+        manifest_file = manifest_path(output_dir, basename)
+        recorded = read_manifest(manifest_file)
+        outputs = _stale(paths, hashes, recorded)
+    else:
+        outputs = list(paths)
+
+    for output in outputs:
+        if not output.startswith("nfp:"):
+            writer = _experiment_writer(output, number_format=number_format)
+            write_atomic(lambda path: writer(experiment, path), paths[output])
+
+    syringe_names = [o[len("nfp:") :] for o in outputs if o.startswith("nfp:")]
+    if len(syringe_names) > 0:
+        flow_experiment_to_nfp(
+            experiment,
+            output_dir,
+            basename=basename,
+            syringe_names=syringe_names,
+            number_format=number_format,
+        )
+
+    if incremental and len(outputs) > 0:
+        for output in outputs:
+            recorded[output] = {
+                "file": os.path.basename(paths[output]),
+                "hash": hashes[output],
+                "size": os.path.getsize(paths[output]),
+            }
+        text = json.dumps({"version": MANIFEST_VERSION, "outputs": recorded}, indent=1)
+        write_atomic(lambda path: _write_text(path, text), manifest_file)
+
+    return paths
+
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
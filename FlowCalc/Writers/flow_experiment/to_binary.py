@@ -0,0 +1,79 @@
+import json
+import struct
+import numpy as np
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils.instrumentation import instrument
+
+MAGIC = b"FLOWCALC"
+VERSION = 1
+# Data sections start on multiples of ALIGNMENT bytes.
+ALIGNMENT = 64
+
+
+@instrument(writes="filename")
+def flow_experiment_to_binary(experiment: FlowExperiment, filename: str) -> None:
+    """
+    Write an experiment to a binary file which can be memory mapped by
+    experiment_from_binary().
+
+    Layout:
+        8 bytes: b"FLOWCALC"
+        4 bytes: format version (little endian uint32)
+        4 bytes: header length in bytes (little endian uint32)
+        header: UTF-8 JSON with the experiment metadata and units
+        padding to a multiple of 64 bytes
+        time axis: n_steps little endian float64 values
+        flow profiles: (n_syringes, n_steps) little endian float64 values, one
+            row per syringe in the order given in the header
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    filename: str
+
+    Returns
+    -------
+    None
+    """
+
+    # Flow profiles are aligned onto a shared time axis if necessary.
+    time, time_unit, profiles = experiment.aligned_profiles()
+    n_steps = len(time)
+
+    syringes = []
+    for s in experiment.syringes:
+        syringe = experiment.syringes[s]
+        syringes.append(
+            {
+                "name": syringe.name,
+                "concentration": float(syringe.concentration),
+                "conc_unit": syringe.conc_unit,
+                "flow_unit": syringe.flow_unit,
+            }
+        )
+
+    header = {
+        "name": experiment.name,
+        "reactor_volume": float(experiment.reactor_volume),
+        "reactor_volume_unit": experiment.reactor_volume_unit,
+        "series_values": np.asarray(experiment.series_values).tolist(),
+        "series_unit": experiment.series_unit,
+        "time_unit": time_unit,
+        "n_steps": n_steps,
+        "dtype": "<f8",
+        "syringes": syringes,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    preamble_length = len(MAGIC) + 8 + len(header_bytes)
+    padding = b"\0" * (-preamble_length % ALIGNMENT)
+
+    with open(filename, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<II", VERSION, len(header_bytes)))
+        file.write(header_bytes)
+        file.write(padding)
+
+        np.asarray(time, dtype="<f8").tofile(file)
+        for s in experiment.syringes:
+            np.asarray(profiles[s], dtype="<f8").tofile(file)
@@ -1,15 +1,33 @@
 import numpy as np
 from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Writers._formatting import DEFAULT_CHUNK_SIZE
+from FlowCalc.Writers._formatting import DEFAULT_NUMBER_FORMAT
+from FlowCalc.Writers._formatting import NumberFormat
+from FlowCalc.Writers._formatting import write_columns
+from FlowCalc.Utils.instrumentation import instrument
 
 
-def flow_experiment_to_csv(experiment: FlowExperiment, filename: str) -> None:
+@instrument(writes="filename")
+def flow_experiment_to_csv(
+    experiment: FlowExperiment,
+    filename: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> None:
     """
     Write a simple .csv file of the experiment's syringes.
 
+    Rows are formatted and written chunk_size at a time, so memory use does
+    not grow with the length of the flow profiles.
+
     Parameters
     ----------
     experiment: FlowExperiment
     filename: str
+    chunk_size: int
+        Number of rows formatted and written at a time.
+    number_format: NumberFormat
+        How the numbers are formatted.
 
     Returns
     -------
@@ -18,17 +36,11 @@ def flow_experiment_to_csv(experiment: FlowExperiment, filename: str) -> None:
 
     header = ",".join(["time"] + [*experiment.syringes])
 
-    time = np.stack([experiment.syringes[s].time for s in experiment.syringes], axis=0)
-    data = np.stack(
-        [experiment.syringes[s].flow_profile for s in experiment.syringes], axis=0
-    )
-    time = time.T
-    data = data.T
+    # Flow profiles are aligned onto a shared time axis if necessary.
+    time, _, profiles = experiment.aligned_profiles()
+
+    columns = [time] + [profiles[s] for s in experiment.syringes]
 
     with open(filename, "w") as f:
         f.write(f"{header}\n")
-        for x in range(0, data.shape[0]):
-            f.write(f"{time[x,0]}")
-            for y in range(0, data.shape[1]):
-                f.write(f",{data[x,y]}")
-            f.write("\n")
+        write_columns(f, columns, chunk_size=chunk_size, number_format=number_format)
@@ -1,7 +1,11 @@
 from FlowCalc.Classes import FlowExperiment
-from FlowCalc.Utils.conversions import SI_conversions
+from FlowCalc.Utils import units
+from FlowCalc.Writers._formatting import float_values
+from FlowCalc.Writers._formatting import time_to_SI
+from FlowCalc.Utils.instrumentation import instrument
 
 
+@instrument()
 def flow_experiment_to_dict(flow_experiment: FlowExperiment) -> dict[str, list[float]]:
     """
     conditions_dict: dict
@@ -27,36 +31,32 @@ def flow_experiment_to_dict(flow_experiment: FlowExperiment) -> dict[str, list[f
         concentration = flow_experiment.syringes[s].concentration
         conditions_dict["conditions"][syr_name] = [concentration, conc_unit]
 
-    # The following writes a shared time axis for all of the flow profiles.
-    # Thus, it is assumed that all of the flow profiles share the same time
-    # axis.
-    a_syringe = flow_experiment.syringes[list(flow_experiment.syringes)[-1]]
+    # The following writes a shared time axis for all of the flow profiles,
+    # onto which the flow profiles are aligned if necessary.
+    time, time_unit, profiles = flow_experiment.aligned_profiles()
 
-    time_conversion = SI_conversions[a_syringe.time_unit]
-    time = time_conversion[0](a_syringe.time).tolist()
+    time_si = time_to_SI(time, time_unit).tolist()
+    time_unit_si = units.SI_unit(time_unit)
 
-    conditions_dict["conditions"]["flow_profile_time"] = [time, time_conversion[1]]
-
-    tot_flow = np.zeros(len(a_syringe.time))
+    conditions_dict["conditions"]["flow_profile_time"] = [time_si, time_unit_si]
 
     for s in flow_experiment.syringes:
-        flow_conversion = SI_conversions[flow_experiment.syringes[s].flow_unit]
-
-        flow_si = flow_conversion[0](flow_experiment.syringes[s].flow_profile).tolist()
-        flow_unit = flow_conversion[1]
+        syringe = flow_experiment.syringes[s]
 
-        conditions_dict["conditions"][f"{s}_flow_profile"] = [flow_si, flow_unit]
+        flow_si = units.to_SI(profiles[s], syringe.flow_unit)
+        flow_unit = units.SI_unit(syringe.flow_unit)
 
-        tot_flow = tot_flow + flow_si
+        conditions_dict["conditions"][f"{s}_flow_profile"] = [
+            float_values(flow_si),
+            flow_unit,
+        ]
 
-    # Convert residence time to seconds
-    reactor_conversion = SI_conversions[flow_experiment.reactor_volume_unit]
-    residence_time = reactor_conversion[0](flow_experiment.reactor_volume) / tot_flow
-    res_time = residence_time.tolist()
+    # Residence time in seconds
+    res_time = flow_experiment.residence_time.tolist()
 
     conditions_dict["conditions"]["Residence time"] = [
         res_time,
-        time_conversion[1],
+        time_unit_si,
     ]
 
     return conditions_dict
@@ -1,16 +1,36 @@
 import numpy as np
 from FlowCalc.Classes import FlowExperiment
-from FlowCalc.Utils.conversions import SI_conversions
+from FlowCalc.Utils import units
+from FlowCalc.Writers._formatting import DEFAULT_CHUNK_SIZE
+from FlowCalc.Writers._formatting import DEFAULT_NUMBER_FORMAT
+from FlowCalc.Writers._formatting import NumberFormat
+from FlowCalc.Writers._formatting import chunk_bounds
+from FlowCalc.Writers._formatting import format_block
+from FlowCalc.Writers._formatting import result_dtype
+from FlowCalc.Utils.instrumentation import instrument
 
 
-def flow_experiment_to_labm8(experiment: FlowExperiment, filename: str) -> None:
+@instrument(writes="filename")
+def flow_experiment_to_labm8(
+    experiment: FlowExperiment,
+    filename: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> None:
     """
     Convert an experiment to LabM8 format.
 
+    Rows are converted, formatted and written chunk_size at a time, so memory
+    use does not grow with the length of the flow profiles.
+
     Parameters
     ----------
     experiment: FlowExperiment
     filename: str
+    chunk_size: int
+        Number of rows converted and written at a time.
+    number_format: NumberFormat
+        How the numbers are formatted.
 
     Returns
     -------
@@ -18,44 +38,40 @@ def flow_experiment_to_labm8(experiment: FlowExperiment, filename: str) -> None:
 
     """
 
-    header = ",".join(["time"] + [*experiment.syringes])
     header = "volume aspired in time period/ µL"
     for s in experiment.syringes:
         header += f",{s}/ μL/min."
 
-    time = np.stack([experiment.syringes[s].time for s in experiment.syringes], axis=0)
-    # convert to minutes
-    time = time[0] / 60
+    # Flow profiles are aligned onto a shared time axis if necessary.
+    time, time_unit, profiles = experiment.aligned_profiles()
+    n_rows = len(time)
 
-    data = np.zeros((len(experiment.syringes), len(time)))
-    for c, s in enumerate(experiment.syringes):
-        syringe = experiment.syringes.get(s)
-        flow_unit = syringe.flow_unit
-        if flow_unit in SI_conversions:
-            si_conv = SI_conversions[flow_unit][0]
-            # covert to L/s
-            si_flow_profile = si_conv(syringe.flow_profile)
-            # convert from L/s to μL/min
-            microL_per_min = 1e6 * si_flow_profile * 60
-            data[c] = microL_per_min
-        else:
-            print(f"Flow unit {flow_unit} not found.")
+    # Columns: volume aspired, then one column per syringe in μL/min.
+    # float32 if the flow profiles are stored at float32 precision.
+    dtype = result_dtype(profiles.values())
+    block = np.zeros(
+        (min(chunk_size, n_rows), len(experiment.syringes) + 1), dtype=dtype
+    )
 
-    data = data.T
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(f"{header}\n")
+        for start, stop in chunk_bounds(n_rows, chunk_size):
+            chunk = block[: stop - start]
 
-    # create volume column
-    total_volume_aspired = np.zeros(time.shape)
-    for x in range(0, len(time) - 1):
-        previous_flow_values = data[x]
+            for c, s in enumerate(experiment.syringes, start=1):
+                flow_unit = experiment.syringes[s].flow_unit
+                units.convert(
+                    profiles[s][start:stop], flow_unit, "μL/min", out=chunk[:, c]
+                )
 
-        time_elapsed = time[x + 1] - time[x]
+            # Volume aspired between each time point and the next one, the
+            # final time point has no following period. Computed per chunk,
+            # so that no full length arrays are kept.
+            time_min = units.convert(time[start : stop + 1], time_unit, "min")
+            time_elapsed = np.diff(time_min)
 
-        total_volume_aspired[x] = previous_flow_values.sum() * time_elapsed
+            chunk[:, 0] = 0.0
+            n_periods = len(time_elapsed)
+            chunk[:n_periods, 0] = chunk[:n_periods, 1:].sum(axis=1) * time_elapsed
 
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(f"{header}\n")
-        for x in range(0, data.shape[0]):
-            f.write(f"{total_volume_aspired[x]}")
-            for y in range(0, data.shape[1]):
-                f.write(f",{data[x,y]}")
-            f.write("\n")
+            f.write(format_block(chunk, number_format=number_format))
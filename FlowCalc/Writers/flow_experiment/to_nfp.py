@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Writers.syringe.to_nfp import syringe_to_nfp
+from FlowCalc.Writers._formatting import DEFAULT_NUMBER_FORMAT
+from FlowCalc.Writers._formatting import NumberFormat
+from FlowCalc.Writers._formatting import write_atomic
+from FlowCalc.Utils.instrumentation import instrument
+
+
+def nfp_filename(basename: str, syringe_name: str) -> str:
+    """
+    Get the file name used for a syringe's .nfp file.
+
+    Parameters
+    ----------
+    basename: str
+    syringe_name: str
+
+    Returns
+    -------
+    filename: str
+    """
+
+    return f"{basename}_{syringe_name}_flow_profile.nfp"
+
+
+@instrument(writes="return")
+def flow_experiment_to_nfp(
+    experiment: FlowExperiment,
+    output_dir: str,
+    basename: str | None = None,
+    max_workers: int | None = None,
+    syringe_names=None,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> dict[str, str]:
+    """
+    Write a Cetoni .nfp file for every syringe of an experiment.
+
+    The files are formatted and written concurrently in a thread pool, each
+    to a temporary file which is then renamed. The syringes are not
+    modified.
+
+    Parameters
+    ----------
+    experiment: FlowExperiment
+    output_dir: str
+        Directory for the .nfp files. It is created if it does not exist.
+    basename: str or None
+        Prefix for the file names. Defaults to the experiment name.
+    max_workers: int or None
+        Number of threads. None uses the ThreadPoolExecutor default.
+    syringe_names: list[str] or None
+        Only write the files of these syringes. Defaults to all syringes.
+    number_format: NumberFormat
+        How the flow rates are formatted.
+
+    Returns
+    -------
+    manifest: dict[str, str]
+        {syringe name: path of its .nfp file} for the syringes written.
+    """
+
+    if basename is None:
+        basename = experiment.name
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    if syringe_names is None:
+        syringe_names = list(experiment.syringes)
+
+    manifest = {
+        s: os.path.join(output_dir, nfp_filename(basename, s)) for s in syringe_names
+    }
+
+    def write(s):
+        syringe = experiment.syringes[s]
+        write_atomic(
+            lambda path: syringe_to_nfp(syringe, path, number_format=number_format),
+            manifest[s],
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(write, s) for s in manifest]
+        for future in futures:
+            future.result()
+
+    return manifest
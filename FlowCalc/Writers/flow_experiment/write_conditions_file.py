@@ -1,84 +1,106 @@
 import numpy as np
+from typing import TextIO
 from FlowCalc.Classes import FlowExperiment
-from FlowCalc.Utils.conversions import SI_conversions
-
-
+from FlowCalc.Utils import units
+from FlowCalc.Writers._formatting import DEFAULT_CHUNK_SIZE
+from FlowCalc.Writers._formatting import DEFAULT_NUMBER_FORMAT
+from FlowCalc.Writers._formatting import NumberFormat
+from FlowCalc.Writers._formatting import chunk_bounds
+from FlowCalc.Writers._formatting import open_text_output
+from FlowCalc.Writers._formatting import result_dtype
+from FlowCalc.Writers._formatting import time_to_SI
+from FlowCalc.Writers._formatting import write_row
+from FlowCalc.Utils.instrumentation import instrument
+
+
+@instrument(writes="filename")
 def write_flow_experiment_conditions_file(
-    flow_experiment: FlowExperiment, filename: str
+    flow_experiment: FlowExperiment,
+    filename: str | TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
 ) -> None:
     """
     Output draft conditions file
 
+    Each row is converted to SI units as a whole and written as it is
+    formatted, so the document is never held in memory.
+
     Parameters
     ----------
-    filename: str
-        Name for the output file.
+    flow_experiment: FlowExperiment
+    filename: str or text stream
+        Name for the output file, or an open text stream to write to (which
+        is left open).
+    chunk_size: int
+        Number of values formatted and written at a time.
+    number_format: NumberFormat
+        How the time axis, flow rates and residence times are formatted.
 
     Output
     ------
     None
     """
 
-    # Write text
-    text = f"Dataset,{flow_experiment.name}\n"
-    text += "start_experiment_information\n"
-    text += "series_values,#NOT PROVIDED\n"
-
-    text += "start_conditions\n"
-    vol = flow_experiment.reactor_volume
-    vol_unit = flow_experiment.reactor_volume_unit
-    text += f"reactor_volume/ {vol_unit},{vol}\n"
-
-    for s in flow_experiment.syringes:
-        syr_name = flow_experiment.syringes[s].name
-        conc_unit = flow_experiment.syringes[s].conc_unit
-        concentration = flow_experiment.syringes[s].concentration
-        text += f"{syr_name}/ {conc_unit},{concentration}\n"
-
-    a_syringe = flow_experiment.syringes[list(flow_experiment.syringes)[-1]]
-    text += "flow_profile_time/ s,"
-
-    # The following writes a shared time axis for all of the flow profiles.
-    # Thus, it is assumed that all of the flow profiles share the same time
-    # axis.
-    time_conversion_func = SI_conversions[a_syringe.time_unit][0]
-    for x in a_syringe.time:
-        si_time = time_conversion_func(x)
-        text += f"{si_time},"
-
-    text += "\n"
-
-    tot_flow = np.zeros(len(a_syringe.time))
-
-    for s in flow_experiment.syringes:
-        flow_unit_si = SI_conversions[flow_experiment.syringes[s].flow_unit][1]
-        text += f"{s}_flow/ {flow_unit_si},"
-
-        flow_conversion_func = SI_conversions[flow_experiment.syringes[s].flow_unit][0]
-
-        for x in flow_experiment.syringes[s].flow_profile:
-            si_flow = flow_conversion_func(x)
-            text += f"{si_flow},"
-
-        text += "\n"
-
-        tot_flow = tot_flow + flow_conversion_func(
-            flow_experiment.syringes[s].flow_profile
+    # The following writes a shared time axis for all of the flow profiles,
+    # onto which the flow profiles are aligned if necessary.
+    time, time_unit, profiles = flow_experiment.aligned_profiles()
+
+    with open_text_output(filename, encoding="utf-8") as file:
+        file.write(f"Dataset,{flow_experiment.name}\n")
+        file.write("start_experiment_information\n")
+        file.write("series_values,#NOT PROVIDED\n")
+
+        file.write("start_conditions\n")
+        vol = flow_experiment.reactor_volume
+        vol_unit = flow_experiment.reactor_volume_unit
+        file.write(f"reactor_volume/ {vol_unit},{vol}\n")
+
+        for s in flow_experiment.syringes:
+            syr_name = flow_experiment.syringes[s].name
+            conc_unit = flow_experiment.syringes[s].conc_unit
+            concentration = flow_experiment.syringes[s].concentration
+            file.write(f"{syr_name}/ {conc_unit},{concentration}\n")
+
+        si_time = time_to_SI(time, time_unit)
+        write_row(
+            file,
+            "flow_profile_time/ s",
+            si_time,
+            chunk_size=chunk_size,
+            number_format=number_format,
         )
 
-    # Convert residence time to seconds
-    reactor_conversion = SI_conversions[flow_experiment.reactor_volume_unit][0]
-    residence_time = reactor_conversion(flow_experiment.reactor_volume) / tot_flow
-
-    text += "Residence time/ s,"
-
-    for r in residence_time:
-        text += f"{r},"
-
-    text += "\n"
-
-    text += "end_conditions\n"
+        si_flow = np.empty(len(time), dtype=result_dtype(profiles.values()))
+
+        for s in flow_experiment.syringes:
+            syringe = flow_experiment.syringes[s]
+            flow_unit_si = units.SI_unit(syringe.flow_unit)
+
+            units.to_SI(profiles[s], syringe.flow_unit, out=si_flow)
+            write_row(
+                file,
+                f"{s}_flow/ {flow_unit_si}",
+                si_flow,
+                chunk_size=chunk_size,
+                number_format=number_format,
+            )
+
+        # Residence time in seconds, computed chunk_size values at a time so
+        # that no full length total flow array is kept.
+        reactor_volume = units.to_SI(
+            flow_experiment.reactor_volume, flow_experiment.reactor_volume_unit
+        )
 
-    # Write text to file.
-    with open(filename, "w", encoding="utf-8") as file:
-        file.write(text)
+        file.write("Residence time/ s,")
+        for start, stop in chunk_bounds(len(time), chunk_size):
+            tot_flow = np.zeros(stop - start)
+            for s in flow_experiment.syringes:
+                flow_unit = flow_experiment.syringes[s].flow_unit
+                tot_flow += units.to_SI(profiles[s][start:stop], flow_unit)
+            with np.errstate(divide="ignore"):
+                residence_time = np.divide(reactor_volume, tot_flow, out=tot_flow)
+            file.write(number_format.format(residence_time))
+        file.write("\n")
+
+        file.write("end_conditions\n")
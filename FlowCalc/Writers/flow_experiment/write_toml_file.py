@@ -1,8 +1,10 @@
 import tomli_w
 from .to_dict import flow_experiment_to_dict
 from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils.instrumentation import instrument
 
 
+@instrument(writes="filename")
 def write_flow_experiment_toml_file(
     flow_experiment: FlowExperiment, filename: str
 ) -> None:
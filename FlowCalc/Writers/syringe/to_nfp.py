@@ -1,46 +1,97 @@
-import sys
 import numpy as np
 from FlowCalc.Classes import Syringe
-from FlowCalc.Utils.conversions import SI_conversions
+from FlowCalc.Utils import units
+from FlowCalc.Writers._formatting import DEFAULT_CHUNK_SIZE
+from FlowCalc.Writers._formatting import DEFAULT_NUMBER_FORMAT
+from FlowCalc.Writers._formatting import NumberFormat
+from FlowCalc.Writers._formatting import chunk_bounds
+from FlowCalc.Utils.instrumentation import instrument
 
 
-def syringe_to_nfp(syringe: Syringe, filename: str) -> None:
-    """ """
+def syringe_timesteps_in_ms(syringe: Syringe) -> np.ndarray:
+    """
+    Get the duration of each flow step of a syringe in ms, rounded to 0.1 s
+    as required by the Cetoni software. The durations are taken from
+    syringe.timesteps if they are set; otherwise the last flow step is held
+    for as long as the one preceding it. The syringe is not modified.
 
-    number_of_cycles = 1
-    valve_val = 255
+    Parameters
+    ----------
+    syringe: Syringe
 
-    # Get timesteps for the syringe.
-    syringe.calculate_timesteps()
+    Returns
+    -------
+    time_steps_in_ms: numpy.ndarray
+    """
 
-    syr_time_steps = syringe.timesteps
+    if syringe.step_profile is not None:
+        # One line per step of the StepProfile.
+        syr_time_steps = syringe.step_profile.durations
+    elif syringe._has_timesteps():
+        syr_time_steps = np.asarray(syringe.timesteps)
+    else:
+        syr_time_steps = np.diff(syringe.time)
+        # The last flow step will be held for as long as the one preceding it
+        syr_time_steps = np.hstack((syr_time_steps, syr_time_steps[-1]))
 
     time_unit = syringe.time_unit
 
-    if time_unit in SI_conversions:
-        conversion_to_s = SI_conversions[time_unit][0]
-        time_steps_in_s = conversion_to_s(syr_time_steps)
+    if units.is_known_unit(time_unit):
+        time_steps_in_s = units.to_SI(syr_time_steps, time_unit)
     else:
-        syr_name = syringe.name
-        sys.exit(
-            f"""Syringe {syr_name}: Please provide the units for
-                the flow profile time axis, or check if there is a
-                conversion available in Flowcalc.conversions"""
+        raise ValueError(
+            f"Syringe {syringe.name}: Please provide the units for the flow "
+            "profile time axis, or check if there is a conversion available "
+            "in FlowCalc.Utils.units."
         )
 
     # Convert time steps to ms
-    time_steps_in_ms = np.round(time_steps_in_s, 1) * 1000
+    return np.rint(np.round(time_steps_in_s, 1) * 1000).astype(np.int64)
+
+
+@instrument(writes="filename")
+def syringe_to_nfp(
+    syringe: Syringe,
+    filename: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    number_format: NumberFormat = DEFAULT_NUMBER_FORMAT,
+) -> None:
+    """
+    Write the flow profile of a syringe to a Cetoni Nemesys .nfp file.
+
+    Each line holds the duration of a step as a whole number of ms (e.g.
+    500, not 500.0), the flow rate, and the valve setting.
 
-    # Build output text
-    text = ""
-    text += f"{syringe.flow_unit.replace('L','l')}\n" # Cetoni software denotes L as l.
-    text += f"{number_of_cycles}\n"
+    Parameters
+    ----------
+    syringe: Syringe
+    filename: str
+    chunk_size: int
+        Number of lines formatted and written at a time.
+    number_format: NumberFormat
+        How the flow rates are formatted. Step durations are whole ms.
 
-    for x in range(0, len(syringe.flow_profile)):
-        flow_val = syringe.flow_profile[x]
-        time_step = time_steps_in_ms[x]
-        text += f"{time_step}\t {flow_val}\t{valve_val}\n"
+    Returns
+    -------
+    None
+    """
+
+    # The file holds one cycle of the flow profile, which the pump repeats.
+    number_of_cycles = syringe.cycles
+    valve_val = 255
+
+    time_steps_in_ms = syringe_timesteps_in_ms(syringe)
+    flow_profile = np.asarray(syringe.flow_profile)
+
+    line = f"%s\t {number_format.spec}\t{valve_val}\n"
 
-    # Write to file
     with open(filename, "w", encoding="cp1252") as file:
-        file.write(text)
+        # Cetoni software denotes L as l.
+        file.write(f"{syringe.flow_unit.replace('L','l')}\n")
+        file.write(f"{number_of_cycles}\n")
+
+        for start, stop in chunk_bounds(len(flow_profile), chunk_size):
+            fields = [None] * (2 * (stop - start))
+            fields[0::2] = time_steps_in_ms[start:stop].tolist()
+            fields[1::2] = number_format.values(flow_profile[start:stop])
+            file.write((line * (stop - start)) % tuple(fields))
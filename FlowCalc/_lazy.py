@@ -0,0 +1,70 @@
+"""
+Lazy imports for the FlowCalc packages.
+
+A package's public names are only imported from their modules when they are
+first used, so that, for example, importing syringe_to_nfp does not import
+every other writer and their optional dependencies.
+"""
+import sys
+import types
+import importlib
+
+
+class _LazyPackage(types.ModuleType):
+    """
+    Module type for packages using attach().
+
+    When a submodule is imported, Python sets it as an attribute of its
+    package. Where the submodule has the same name as a function exported by
+    the package (e.g. Loading.experiment_from_csv), the function is set
+    instead so that the package attribute keeps referring to the function.
+    """
+
+    def __setattr__(self, name, value):
+        lazy_attributes = self.__dict__.get("_lazy_attributes", {})
+        if name in lazy_attributes and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+
+        super().__setattr__(name, value)
+
+
+def attach(package_name: str, attributes: dict[str, str]):
+    """
+    Make the public names of a package importable on first use.
+
+    Use in a package __init__.py as:
+
+        __getattr__, __dir__, __all__ = attach(__name__, {name: module})
+
+    Parameters
+    ----------
+    package_name: str
+        __name__ of the package.
+    attributes: dict[str, str]
+        {public name: module to import it from, relative to the package}
+
+    Returns
+    -------
+    __getattr__: Callable[[str], object]
+    __dir__: Callable[[], list[str]]
+    __all__: list[str]
+    """
+
+    package = sys.modules[package_name]
+    package._lazy_attributes = attributes
+    package.__class__ = _LazyPackage
+
+    def __getattr__(name):
+        if name not in attributes:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        module = importlib.import_module(attributes[name], package_name)
+        value = getattr(module, name)
+        setattr(package, name, value)
+
+        return value
+
+    def __dir__():
+        return sorted(set(package.__dict__) | set(attributes))
+
+    return __getattr__, __dir__, list(attributes)
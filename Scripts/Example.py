@@ -37,7 +37,7 @@ syringe_2.set_flow_profile(time_axis, time_unit, flow_rates, flow_units)
 experiment.add_syringe(syringe_2)
 
 # Minimise the number of flow steps in the experiment
-processing.minimise_steps(experiment)
+experiment = processing.minimise_steps(experiment)
 
 conditions_filename = f"ExampleOutput/{experiment.name}_conditions.csv"
 write_flow_experiment_conditions_file(experiment, conditions_filename)
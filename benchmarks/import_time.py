@@ -0,0 +1,113 @@
+"""
+Benchmark the time taken to import FlowCalc in a fresh interpreter.
+
+Each statement is run in a new Python process a number of times. The time
+of an empty interpreter start is subtracted, and the modules imported by
+each statement are counted. Results are written as JSON:
+
+    python benchmarks/import_time.py --output import_time.json
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+STATEMENTS = (
+    "import FlowCalc",
+    "import FlowCalc.Classes",
+    "from FlowCalc.Classes import FlowExperiment",
+    "from FlowCalc.Writers import syringe_to_nfp",
+    "from FlowCalc.Writers import export_experiment",
+    "from FlowCalc.Writers import write_flow_experiment_toml_file",
+    "from FlowCalc.Loading import experiment_from_conditions_file",
+    "from FlowCalc.Loading import experiment_from_toml",
+)
+
+# Reports the time of the statement, measured inside the process, and the
+# modules it imported.
+TEMPLATE = """
+import sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+{statement}
+duration = time.perf_counter() - start
+new = sorted(set(sys.modules) - before)
+print(duration, len(new), ",".join(new))
+"""
+
+
+def time_statement(statement: str, repeats: int, env: dict) -> dict:
+    """
+    Time an import statement in fresh interpreters.
+
+    Parameters
+    ----------
+    statement: str
+    repeats: int
+    env: dict
+        Environment of the interpreters.
+
+    Returns
+    -------
+    result: dict
+        {"statement", "times" (s), "best" (s), "median" (s), "modules",
+        "optional_dependencies"}
+    """
+
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", TEMPLATE.format(statement=statement)],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        ).stdout.split()
+        times.append(float(output[0]))
+        modules = output[2].split(",") if len(output) > 2 else []
+
+    return {
+        "statement": statement,
+        "times": times,
+        "best": min(times),
+        "median": float(np.median(times)),
+        "modules": len(modules),
+        "optional_dependencies": [m for m in modules if m in ("tomli", "tomli_w")],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--output", default=None, help="JSON results file (default: stdout)."
+    )
+    args = parser.parse_args(argv)
+
+    # Import FlowCalc from this checkout.
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, env.get("PYTHONPATH")) if p)
+
+    results = []
+    for statement in STATEMENTS:
+        result = time_statement(statement, args.repeats, env)
+        results.append(result)
+        print(
+            f"{statement:64s} {result['best'] * 1000:8.2f} ms "
+            f"{result['modules']:5d} modules",
+            file=sys.stderr,
+        )
+
+    text = json.dumps({"python": sys.version, "results": results}, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Benchmarks for building, processing, writing and loading flow experiments.
+
+Synthetic experiments are built for each combination of syringe count and
+step count. Each benchmark is timed over a number of repeats, both cold (on
+a freshly built experiment, whose cached derived quantities are empty) and
+warm (on an experiment the benchmark has already run on once). Building the
+experiment is not timed. The peak memory allocation of a cold run is
+recorded with tracemalloc in a separate run. Results are written as JSON
+for comparison between versions of FlowCalc:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --syringes 2 8 --steps 1000 100000
+
+Each result is {"name", "n_syringes", "n_steps", "cold", "warm",
+"peak_memory" (bytes)}, where "cold" and "warm" are {"times" (s), "best" (s),
+"median" (s)}.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils import processing
+from FlowCalc.Loading import experiment_from_binary
+from FlowCalc.Loading import experiment_from_conditions_file
+from FlowCalc.Loading import experiment_from_csv
+from FlowCalc.Loading import experiment_from_toml
+from FlowCalc.Writers import flow_experiment_to_binary
+from FlowCalc.Writers import flow_experiment_to_csv
+from FlowCalc.Writers import flow_experiment_to_dict
+from FlowCalc.Writers import flow_experiment_to_labm8
+from FlowCalc.Writers import flow_experiment_to_nfp
+from FlowCalc.Writers import syringe_to_nfp
+from FlowCalc.Writers import write_flow_experiment_conditions_file
+from FlowCalc.Writers import write_flow_experiment_toml_file
+
+DEFAULT_SYRINGES = (2, 8)
+DEFAULT_STEPS = (1_000, 10_000, 100_000)
+
+# Steps to write with toml, which is much slower than the other writers.
+TOML_MAX_STEPS = 10_000
+
+
+def synthetic_profiles(n_syringes: int, n_steps: int):
+    """
+    Create a time axis and flow profiles which hold each flow rate for ten
+    time points, so that minimise_steps() has work to do.
+
+    Parameters
+    ----------
+    n_syringes: int
+    n_steps: int
+
+    Returns
+    -------
+    time_axis: numpy.ndarray
+        Time points 2 s apart.
+    flow_profiles: list[numpy.ndarray]
+        Flow rates in µL/h.
+    """
+
+    time_axis = np.arange(n_steps) * 2.0
+    held = np.repeat(np.arange(-(-n_steps // 10)), 10)[:n_steps]
+
+    flow_profiles = [
+        500 + 400 * np.sin(held / (10 * (c + 1))) for c in range(n_syringes)
+    ]
+
+    return time_axis, flow_profiles
+
+
+def build_experiment(n_syringes: int, n_steps: int) -> FlowExperiment:
+    """
+    Build a synthetic experiment.
+
+    Parameters
+    ----------
+    n_syringes: int
+    n_steps: int
+
+    Returns
+    -------
+    experiment: FlowExperiment
+    """
+
+    time_axis, flow_profiles = synthetic_profiles(n_syringes, n_steps)
+
+    experiment = FlowExperiment("benchmark")
+    experiment.reactor_volume = 411
+    experiment.reactor_volume_unit = "µL"
+
+    for c, flow_profile in enumerate(flow_profiles):
+        syringe = Syringe(f"syringe_{c}")
+        syringe.set_concentration(0.1, "M")
+        syringe.set_flow_profile(time_axis, "s", flow_profile, "µL/h")
+        experiment.add_syringe(syringe)
+
+    return experiment
+
+
+def _timings(times: list[float]) -> dict:
+    return {"times": times, "best": min(times), "median": float(np.median(times))}
+
+
+def measure(setup, function, repeats: int) -> dict:
+    """
+    Time a function, cold and warm, and record its peak memory allocation.
+
+    Parameters
+    ----------
+    setup: Callable[[], Any]
+        Creates the argument of function. It is called before every cold
+        call and is not timed.
+    function: Callable[[Any], None]
+    repeats: int
+        Number of timed calls of each kind.
+
+    Returns
+    -------
+    measurement: dict
+        {"cold", "warm", "peak_memory"}
+    """
+
+    cold = []
+    for _ in range(repeats):
+        state = setup()
+        start = time.perf_counter()
+        function(state)
+        cold.append(time.perf_counter() - start)
+
+    # The last cold call has warmed state up.
+    warm = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(state)
+        warm.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocation down, so memory is measured separately.
+    state = setup()
+    tracemalloc.start()
+    function(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"cold": _timings(cold), "warm": _timings(warm), "peak_memory": peak}
+
+
+def benchmark_cases(n_syringes: int, n_steps: int, directory: str) -> dict:
+    """
+    Get the benchmarks for one experiment size.
+
+    Writers write into directory; the loaders read files written there
+    beforehand.
+
+    Parameters
+    ----------
+    n_syringes: int
+    n_steps: int
+    directory: str
+
+    Returns
+    -------
+    cases: dict[str, tuple[Callable[[], Any], Callable[[Any], None]]]
+        {name: (setup, function)}, see measure().
+    """
+
+    time_axis, flow_profiles = synthetic_profiles(n_syringes, n_steps)
+
+    def path(name):
+        return os.path.join(directory, name)
+
+    def new_experiment():
+        return build_experiment(n_syringes, n_steps)
+
+    def no_setup():
+        return None
+
+    def set_flow_profile(_):
+        syringe = Syringe("syringe")
+        for flow_profile in flow_profiles:
+            syringe.set_flow_profile(time_axis, "s", flow_profile, "µL/h")
+
+    cases = {
+        "build_experiment": (no_setup, lambda _: new_experiment()),
+        "Syringe.set_flow_profile": (no_setup, set_flow_profile),
+    }
+
+    # Benchmarks of an experiment, which is built afresh for each cold call.
+    experiment_cases = {
+        "minimise_steps": processing.minimise_steps,
+        "flow_experiment_to_csv": lambda experiment: flow_experiment_to_csv(
+            experiment, path("experiment.csv")
+        ),
+        "flow_experiment_to_labm8": lambda experiment: flow_experiment_to_labm8(
+            experiment, path("experiment_labm8.csv")
+        ),
+        "write_flow_experiment_conditions_file": lambda experiment: (
+            write_flow_experiment_conditions_file(
+                experiment, path("experiment_conditions.csv")
+            )
+        ),
+        "flow_experiment_to_dict": flow_experiment_to_dict,
+        "flow_experiment_to_binary": lambda experiment: flow_experiment_to_binary(
+            experiment, path("experiment.fcb")
+        ),
+        "syringe_to_nfp": lambda experiment: syringe_to_nfp(
+            experiment.syringes["syringe_0"], path("syringe_0.nfp")
+        ),
+        "flow_experiment_to_nfp": lambda experiment: flow_experiment_to_nfp(
+            experiment, directory, basename="experiment"
+        ),
+    }
+
+    if n_steps <= TOML_MAX_STEPS:
+        experiment_cases["write_flow_experiment_toml_file"] = lambda experiment: (
+            write_flow_experiment_toml_file(experiment, path("experiment.toml"))
+        )
+
+    for name, function in experiment_cases.items():
+        cases[name] = (new_experiment, function)
+
+    # Files for the loaders.
+    experiment = new_experiment()
+    write_flow_experiment_conditions_file(experiment, path("load_conditions.csv"))
+    flow_experiment_to_binary(experiment, path("load.fcb"))
+    with open(path("load_config.csv"), "w", encoding="utf-8") as f:
+        f.write("Exp_code,benchmark\nReactor_volume,411\nReactor_volume_unit,µL\n")
+
+    cases["experiment_from_csv"] = (
+        no_setup,
+        lambda _: experiment_from_csv(path("load_config.csv")),
+    )
+    cases["experiment_from_conditions_file"] = (
+        no_setup,
+        lambda _: experiment_from_conditions_file(path("load_conditions.csv")),
+    )
+    cases["experiment_from_binary"] = (
+        no_setup,
+        lambda _: experiment_from_binary(path("load.fcb")),
+    )
+
+    if n_steps <= TOML_MAX_STEPS:
+        write_flow_experiment_toml_file(experiment, path("load.toml"))
+        cases["experiment_from_toml"] = (
+            no_setup,
+            lambda _: experiment_from_toml(path("load.toml")),
+        )
+
+    return cases
+
+
+def run_benchmarks(
+    syringe_counts=DEFAULT_SYRINGES,
+    step_counts=DEFAULT_STEPS,
+    repeats: int = 3,
+    select: str | None = None,
+) -> dict:
+    """
+    Run the benchmarks for every combination of syringe count and step
+    count.
+
+    Parameters
+    ----------
+    syringe_counts: list[int]
+    step_counts: list[int]
+    repeats: int
+        Number of timed cold and warm calls of each benchmark.
+    select: str or None
+        Only run benchmarks whose names contain select.
+
+    Returns
+    -------
+    results: dict
+        {"environment": {...}, "results": [...]}
+    """
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for n_syringes in syringe_counts:
+            for n_steps in step_counts:
+                cases = benchmark_cases(n_syringes, n_steps, directory)
+                for name, (setup, function) in cases.items():
+                    if select is not None and select not in name:
+                        continue
+                    result = {
+                        "name": name,
+                        "n_syringes": n_syringes,
+                        "n_steps": n_steps,
+                    }
+                    result.update(measure(setup, function, repeats))
+                    results.append(result)
+                    print(
+                        f"{name:40s} {n_syringes:4d} x {n_steps:<9d} "
+                        f"cold {result['cold']['best'] * 1000:10.2f} ms "
+                        f"warm {result['warm']['best'] * 1000:10.2f} ms "
+                        f"{result['peak_memory'] / 2**20:8.2f} MiB",
+                        file=sys.stderr,
+                    )
+
+    environment = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeats": repeats,
+    }
+
+    return {"environment": environment, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--syringes", type=int, nargs="+", default=list(DEFAULT_SYRINGES)
+    )
+    parser.add_argument("--steps", type=int, nargs="+", default=list(DEFAULT_STEPS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--select", default=None, help="Run matching benchmarks.")
+    parser.add_argument(
+        "--output", default=None, help="JSON results file (default: stdout)."
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        syringe_counts=args.syringes,
+        step_counts=args.steps,
+        repeats=args.repeats,
+        select=args.select,
+    )
+
+    text = json.dumps(results, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import FlowExperiment
+
+
+@pytest.fixture
+def build_experiment():
+    """
+    Get a function which builds an experiment for a test. By default, the
+    experiment has two syringes "a" and "b" of 0.1 M and 0.2 M, whose flow
+    rates in µL/h vary smoothly every 2 s for 100 s, and a 411 µL reactor.
+    """
+
+    def build(
+        name="test",
+        names=("a", "b"),
+        time_axis=None,
+        flow_profiles=None,
+        flow_unit="µL/h",
+        concentrations=None,
+        reactor_volume=411,
+        scale=1.0,
+        precision=None,
+        columnar=False,
+    ):
+        """
+        Parameters
+        ----------
+        name: str
+        names: tuple[str]
+            Names of the syringes.
+        time_axis: array or None
+            Time axis of all syringes, in s.
+        flow_profiles: list[array] or None
+            Flow rates of each syringe, in flow_unit. By default,
+            200 + 100 * sin(t / (c + 1)) for the c-th syringe.
+        flow_unit: str
+        concentrations: list[float] or None
+            Concentrations of the syringes, in M. By default, 0.1 M,
+            0.2 M, ...
+        reactor_volume: float
+            In µL.
+        scale: float
+            Factor applied to all flow rates.
+        precision: Precision or None
+        columnar: bool
+
+        Returns
+        -------
+        experiment: FlowExperiment
+        """
+
+        experiment = FlowExperiment(name)
+        experiment.reactor_volume = reactor_volume
+        experiment.reactor_volume_unit = "µL"
+        experiment.set_precision(precision)
+
+        # Copied, so that tests can modify the profiles of their experiment.
+        if time_axis is None:
+            time_axis = np.arange(0, 100, 2.0)
+        else:
+            time_axis = np.array(time_axis)
+        if flow_profiles is None:
+            flow_profiles = [
+                200 + 100 * np.sin(time_axis / (c + 1)) for c in range(len(names))
+            ]
+        if concentrations is None:
+            concentrations = [0.1 * (c + 1) for c in range(len(names))]
+
+        for syr_name, flow_rates, conc in zip(names, flow_profiles, concentrations):
+            syringe = Syringe(syr_name)
+            syringe.set_concentration(conc, "M")
+            flow_rates = np.array(flow_rates)
+            if scale != 1.0:
+                flow_rates = scale * flow_rates
+            syringe.set_flow_profile(time_axis, "s", flow_rates, flow_unit)
+            experiment.add_syringe(syringe)
+
+        if columnar:
+            experiment.make_columnar()
+
+        return experiment
+
+    return build
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import pytest
+from FlowCalc.Writers import export_all
+from FlowCalc.Writers import export_experiment
+from FlowCalc.Writers import export_experiment_async
+from FlowCalc.Writers.async_export import flow_experiment_to_csv_async
+
+
+def test_export_all_matches_export_experiment(build_experiment, tmp_path):
+    experiments = [build_experiment(name=f"exp{i}", scale=i + 1) for i in range(5)]
+
+    results = asyncio.run(
+        export_all(experiments, tmp_path / "async", max_concurrency=3)
+    )
+
+    assert len(results) == 5
+    for experiment, paths in zip(experiments, results):
+        expected = export_experiment(experiment, tmp_path / "sync")
+        assert paths.keys() == expected.keys()
+        for output in paths:
+            with open(paths[output], "rb") as f, open(expected[output], "rb") as g:
+                assert f.read() == g.read()
+
+    # 3 experiment level files and 2 .nfp files per experiment.
+    assert len(os.listdir(tmp_path / "async")) == 5 * 5
+
+
+def test_async_writers(build_experiment, tmp_path):
+    experiment = build_experiment()
+
+    async def main():
+        limiter = asyncio.Semaphore(1)
+        await flow_experiment_to_csv_async(
+            experiment, tmp_path / "test.csv", limiter=limiter
+        )
+        return await export_experiment_async(
+            experiment, tmp_path, writers=("nfp",), basename="other"
+        )
+
+    paths = asyncio.run(main())
+
+    assert (tmp_path / "test.csv").exists()
+    assert set(paths) == {"nfp:a", "nfp:b"}
+    assert os.path.basename(paths["nfp:a"]) == "other_a_flow_profile.nfp"
+
+
+def test_export_all_raises_write_errors(build_experiment, tmp_path):
+    experiment = build_experiment()
+    experiment.syringes["a"].time_unit = "fortnights"
+
+    with pytest.raises(ValueError, match="Syringe a"):
+        asyncio.run(export_all([experiment], tmp_path, writers=("nfp",)))
+
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+
+def test_export_all_stops_after_a_failed_write(build_experiment, tmp_path):
+    experiments = [build_experiment(name=f"exp{i}") for i in range(4)]
+    # The conditions file, the first output, cannot convert the volume.
+    experiments[0].reactor_volume_unit = "fortnights"
+
+    with pytest.raises(ValueError, match="fortnights"):
+        asyncio.run(export_all(experiments, tmp_path, max_concurrency=1))
+
+    written = os.listdir(tmp_path)
+    assert not any(name.endswith(".tmp") for name in written)
+    assert not any(name.startswith("exp1") for name in written)
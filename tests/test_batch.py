@@ -0,0 +1,52 @@
+import os
+import numpy as np
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils.batch import run_sweep
+from FlowCalc.Utils.batch import sweep_points
+
+
+def build(concentration, flow_rate):
+    experiment = FlowExperiment("sweep")
+    experiment.reactor_volume = 411
+    experiment.reactor_volume_unit = "µL"
+
+    time_axis = np.arange(0, 100, 2)
+
+    syringe = Syringe("dihydroxyacetone")
+    syringe.set_concentration(concentration, "M")
+    syringe.set_flow_profile(
+        time_axis, "s", np.full(time_axis.shape, flow_rate), "µL/h"
+    )
+    experiment.add_syringe(syringe)
+
+    return experiment
+
+
+def test_sweep_points():
+    points = sweep_points({"a": [1, 2], "b": ["x", "y", "z"]})
+
+    assert len(points) == 6
+    assert points[0] == {"a": 1, "b": "x"}
+    assert points[1] == {"a": 1, "b": "y"}
+
+
+def test_run_sweep(tmp_path):
+    sweep = {"concentration": [0.1, 0.2], "flow_rate": [500, 1000]}
+
+    serial = run_sweep(build, sweep, tmp_path / "serial", max_workers=1)
+    parallel = run_sweep(build, sweep, tmp_path / "parallel", max_workers=2)
+
+    assert [e["name"] for e in serial] == [f"sweep_{c:04d}" for c in range(4)]
+    assert [e["params"] for e in parallel] == sweep_points(sweep)
+
+    for serial_entry, parallel_entry in zip(serial, parallel):
+        assert serial_entry["files"].keys() == parallel_entry["files"].keys()
+        for output in serial_entry["files"]:
+            with open(serial_entry["files"][output], "rb") as f:
+                serial_bytes = f.read()
+            with open(parallel_entry["files"][output], "rb") as f:
+                parallel_bytes = f.read()
+            assert serial_bytes == parallel_bytes
+
+    assert len(os.listdir(tmp_path / "parallel")) == 4 * 4
@@ -0,0 +1,75 @@
+import warnings
+import numpy as np
+import pytest
+from FlowCalc.Utils.conversions import SI_convert
+from FlowCalc.Utils.conversions import SI_convert_columns
+from FlowCalc.Utils.conversions import UnitConversionWarning
+from FlowCalc.Utils.conversions import parameters_from_config_file
+
+example_strings = [
+    "concentration/ mM",
+    "concentration/mM",
+    "concentration (mM)",
+    "concentration(mM)",
+    "concentration [mM]",
+    "concentration[mM]",
+]
+
+
+@pytest.mark.parametrize("example", example_strings)
+def test_SI_convert(example):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        results = SI_convert(example, 1.0)
+
+    assert results[0] == example.replace("mM", "M")
+    assert np.isclose(results[1], 1e-3)
+
+
+def test_SI_convert_compound_units():
+    assert SI_convert("flow rate (µL/min)", "60") == ("flow rate (L/s)", 1e-6)
+    assert SI_convert("flow rate/ µL/min", 60)[0] == "flow rate/ L/s"
+
+
+def test_SI_convert_unknown_unit_warns():
+    with pytest.warns(UnitConversionWarning):
+        assert SI_convert("colour [blue]", "2") == ("colour [blue]", 2.0)
+
+    with pytest.warns(UnitConversionWarning):
+        assert SI_convert("colour", 2) == ("colour", 2.0)
+
+
+def test_SI_convert_columns():
+    with pytest.warns(UnitConversionWarning):
+        headers, columns = SI_convert_columns(
+            ["time/ min", "count"], np.array([[1.0, 3.0], [2.0, 4.0]])
+        )
+
+    assert headers == ["time/ s", "count"]
+    assert np.array_equal(columns[0], [60.0, 120.0])
+    assert np.array_equal(columns[1], [3.0, 4.0])
+
+
+def test_parameters_from_config_file(tmp_path):
+    config = tmp_path / "config.csv"
+    config.write_text(
+        "Experiment name,test\n"
+        "Section A,concentration/ mM,flow (µL/min)\n"
+        "first,1,60\n"
+        "second,2,120\n"
+        ",,\n"
+        "Section B,time/ min\n"
+        "start,3\n"
+    )
+
+    name, params = parameters_from_config_file(config)
+    assert name == "test"
+    assert params["Section A"]["second"] == {
+        "concentration/ mM": 2.0,
+        "flow (µL/min)": 120.0,
+    }
+
+    name, params = parameters_from_config_file(config, SI_units=True)
+    assert params["Section A"]["first"]["concentration/ M"] == pytest.approx(1e-3)
+    assert params["Section A"]["second"]["flow (L/s)"] == pytest.approx(2e-6)
+    assert params["Section B"] == {"start": {"time/ s": 180.0}}
@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import FlowExperiment
+
+EXPERIMENT = dict(
+    time_axis=np.arange(0, 10, 2),
+    flow_profiles=[np.full(5, 1.0), np.arange(5)],
+)
+
+
+def test_columnar_syringes_are_views(build_experiment):
+    experiment = build_experiment(**EXPERIMENT, columnar=True)
+
+    time, matrix = experiment.stacked_profiles()
+
+    assert matrix.shape == (2, 5)
+    assert matrix.dtype == np.float64
+    assert all(experiment.syringes[s].time is time for s in experiment.syringes)
+
+    experiment.syringes["b"].flow_profile[0] = 10.0
+    assert matrix[1, 0] == 10.0
+
+    # no copy is made on subsequent calls
+    assert experiment.stacked_profiles()[1] is matrix
+
+
+def test_columnar_repacks_added_syringes(build_experiment):
+    experiment = build_experiment(**EXPERIMENT, columnar=True)
+    experiment.stacked_profiles()
+
+    syringe_3 = Syringe("c")
+    syringe_3.set_flow_profile(experiment.time, "s", np.full(5, 3.0), "µL/h")
+    experiment.add_syringe(syringe_3)
+
+    time, matrix = experiment.stacked_profiles()
+
+    assert matrix.shape == (3, 5)
+    assert np.all(matrix[2] == 3.0)
+    assert np.shares_memory(experiment.syringes["c"].flow_profile, matrix)
+
+
+def test_columnar_requires_shared_time_axis():
+    syringe_1 = Syringe("a")
+    syringe_1.set_flow_profile([0, 1, 2], "s", [1.0, 2.0, 3.0], "µL/h")
+    syringe_2 = Syringe("b")
+    syringe_2.set_flow_profile([0, 5, 10], "s", [1.0, 2.0, 3.0], "µL/h")
+
+    experiment = FlowExperiment("test", [syringe_1, syringe_2])
+
+    with pytest.raises(ValueError):
+        experiment.make_columnar()
+
+    assert np.array_equal(syringe_1.time, [0, 1, 2])
+
+
+def test_stacked_profiles_match_between_modes(build_experiment):
+    dense = build_experiment(**EXPERIMENT).stacked_profiles()
+    columnar = build_experiment(**EXPERIMENT, columnar=True).stacked_profiles()
+
+    assert np.array_equal(dense[0], columnar[0])
+    assert np.array_equal(dense[1], columnar[1])
+
+
+def test_from_flow_matrix():
+    matrix = np.ones((3, 4))
+    experiment = FlowExperiment.from_flow_matrix(
+        "test", np.arange(4), "s", ["a", "b", "c"], matrix, "mL/min"
+    )
+
+    assert experiment.syringes["c"].flow_unit == "mL/min"
+    assert np.array_equal(experiment.syringes["b"].timesteps, np.ones(4))
+    assert experiment.stacked_profiles()[1].shape == (3, 4)
+
+
+def test_aligned_profiles_shared_axis_is_not_copied(build_experiment):
+    experiment = build_experiment(**EXPERIMENT)
+
+    time, time_unit, profiles = experiment.aligned_profiles()
+
+    assert time_unit == "s"
+    assert profiles["a"] is experiment.syringes["a"].flow_profile
+    assert experiment.aligned_profiles()[2] is profiles
+
+
+def test_aligned_profiles_different_axes():
+    syringe_1 = Syringe("a")
+    syringe_1.set_flow_profile(np.array([0, 2, 4]), "s", np.array([1, 2, 3]), "µL/h")
+
+    syringe_2 = Syringe("b")
+    syringe_2.set_flow_profile(np.array([1, 3]), "s", np.array([5, 6]), "µL/h")
+
+    experiment = FlowExperiment("test", [syringe_1, syringe_2])
+
+    time, time_unit, profiles = experiment.aligned_profiles()
+
+    assert np.array_equal(time, [0, 1, 2, 3, 4])
+    assert np.array_equal(profiles["a"], [1, 1, 2, 2, 3])
+    # syringe b starts at 1 s and its last step ends at 5 s
+    assert np.array_equal(profiles["b"], [0, 5, 5, 6, 6])
+
+
+def test_aligned_profiles_different_units_and_invalidation():
+    syringe_1 = Syringe("a")
+    syringe_1.set_flow_profile(np.array([0, 1]), "min", np.array([1, 2]), "µL/h")
+
+    syringe_2 = Syringe("b")
+    syringe_2.set_flow_profile(np.array([0, 30, 60]), "s", np.ones(3), "µL/h")
+
+    experiment = FlowExperiment("test", [syringe_1, syringe_2])
+
+    time, time_unit, profiles = experiment.aligned_profiles()
+
+    assert time_unit == "s"
+    assert np.array_equal(time, [0, 30, 60])
+    assert np.array_equal(profiles["a"], [1, 1, 2])
+
+    syringe_2.set_flow_profile(np.array([0, 1]), "min", np.ones(2), "µL/h")
+
+    time, time_unit, profiles = experiment.aligned_profiles()
+
+    assert time_unit == "min"
+    assert np.array_equal(time, [0, 1])
+
+
+def test_derived_quantities(build_experiment):
+    experiment = build_experiment(**EXPERIMENT)
+    experiment.reactor_volume = 10
+    experiment.reactor_volume_unit = "µL"
+    experiment.syringes["a"].set_concentration(2, "mM")
+
+    # a: 1 µL/h, b: 0-4 µL/h, steps of 2 s
+    total_flow = np.array([1, 2, 3, 4, 5]) / 3.6e9
+
+    assert np.allclose(experiment.total_flow, total_flow)
+    assert np.allclose(experiment.residence_time, 1e-5 / total_flow)
+    assert np.allclose(experiment.dispensed_volume["a"], np.arange(1, 6) * 2 / 3.6e9)
+    assert np.allclose(experiment.total_dispensed_volume, np.cumsum(total_flow * 2))
+    assert np.allclose(
+        experiment.consumed_moles["a"], 2e-3 * experiment.dispensed_volume["a"]
+    )
+    assert experiment.total_flow is experiment.total_flow
+
+    # changing a flow profile invalidates the cached values
+    experiment.syringes["a"].flow_profile = np.full(5, 2.0)
+    assert np.allclose(experiment.total_flow, total_flow + 1 / 3.6e9)
+
+
+def test_timesteps_end_with_the_last_step():
+    syringe = Syringe("a")
+    syringe.set_flow_profile([0, 1, 2], "min", [60.0, 60.0, 60.0], "µL/min")
+    experiment = FlowExperiment("test", [syringe])
+    assert np.array_equal(experiment.timesteps_SI, [60, 60, 60])
+
+    # e.g. after minimise_steps or quantize_experiment
+    syringe.timesteps = np.array([1, 1, 1 / 12])
+
+    assert np.allclose(experiment.timesteps_SI, [60, 60, 5])
+    assert np.isclose(experiment.total_dispensed_volume[-1], 125e-6)
@@ -0,0 +1,48 @@
+import json
+import os
+import numpy as np
+from FlowCalc.Utils import instrumentation
+from FlowCalc.Utils import processing
+from FlowCalc.Utils import units
+from FlowCalc.Writers import flow_experiment_to_csv
+
+
+def test_disabled_records_nothing():
+    instrumentation.registry.reset()
+
+    units.to_SI(np.ones(10), "mL")
+
+    assert not instrumentation.is_enabled()
+    assert instrumentation.registry.as_dict() == {}
+
+
+def test_profiling_records_calls(build_experiment, tmp_path):
+    experiment = build_experiment(flow_profiles=[np.full(50, 100.0)] * 2)
+    filename = tmp_path / "test.csv"
+
+    with instrumentation.profiling() as registry:
+        experiment = processing.minimise_steps(experiment)
+        flow_experiment_to_csv(experiment, str(filename))
+        units.to_SI(np.ones(10), "mL")
+
+    assert not instrumentation.is_enabled()
+
+    stats = registry.as_dict()
+    assert stats["processing.minimise_steps"]["calls"] == 1
+    assert stats["processing.change_points"]["calls"] == 1
+    assert stats["units.to_SI"]["array_bytes"] == 80
+    assert stats["to_csv.flow_experiment_to_csv"]["bytes_written"] == (
+        os.path.getsize(filename)
+    )
+    assert stats["_formatting.write_columns"]["calls"] == 1
+
+    assert "processing.minimise_steps" in registry.summary()
+
+    trace_file = tmp_path / "trace.json"
+    registry.write_chrome_trace(trace_file)
+    with open(trace_file) as f:
+        trace = json.load(f)
+
+    names = [event["name"] for event in trace["traceEvents"]]
+    assert "to_csv.flow_experiment_to_csv" in names
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+
+def imported_modules(statement):
+    code = f"import sys\n{statement}\nprint(','.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return output.stdout.strip().split(",")
+
+
+def test_optional_dependencies_are_imported_on_use():
+    modules = imported_modules(
+        "import FlowCalc.Loading\nfrom FlowCalc.Writers import syringe_to_nfp"
+    )
+    assert "tomli" not in modules
+    assert "tomli_w" not in modules
+    assert "FlowCalc.Writers.flow_experiment.to_labm8" not in modules
+
+    modules = imported_modules("from FlowCalc.Loading import experiment_from_toml")
+    assert "tomli" in modules
+
+
+def test_exported_names_are_not_shadowed_by_submodules():
+    import FlowCalc.Loading.experiment_from_conditions_file
+    from FlowCalc import Loading
+
+    assert callable(Loading.experiment_from_conditions_file)
+    assert "experiment_from_toml" in dir(Loading)
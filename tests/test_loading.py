@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from FlowCalc.Loading import experiment_from_binary
+from FlowCalc.Loading import experiment_from_conditions_file
+from FlowCalc.Loading import experiment_from_toml
+from FlowCalc.Loading import experiments_from_config_file
+from FlowCalc.Loading import read_config_sections
+from FlowCalc.Writers import flow_experiment_to_binary
+from FlowCalc.Writers import write_flow_experiment_conditions_file
+from FlowCalc.Writers import write_flow_experiment_toml_file
+
+
+def check_round_trip(original, loaded):
+    assert loaded.name == original.name
+    assert loaded.reactor_volume == 411
+    assert loaded.reactor_volume_unit == "µL"
+    assert list(loaded.syringes) == ["a", "b"]
+
+    for s in original.syringes:
+        syringe = loaded.syringes[s]
+        assert syringe.concentration == original.syringes[s].concentration
+        assert syringe.conc_unit == "M"
+        assert syringe.time_unit == "s"
+        assert syringe.flow_unit == "L/s"
+        assert np.array_equal(syringe.time, original.syringes[s].time)
+        assert np.allclose(
+            syringe.flow_profile * 3.6e9, original.syringes[s].flow_profile
+        )
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_conditions_file_round_trip(build_experiment, tmp_path, columnar):
+    experiment = build_experiment()
+    write_flow_experiment_conditions_file(experiment, tmp_path / "conditions.csv")
+
+    loaded = experiment_from_conditions_file(
+        tmp_path / "conditions.csv", columnar=columnar
+    )
+
+    check_round_trip(experiment, loaded)
+    assert loaded.columnar == columnar
+
+
+def test_toml_round_trip(build_experiment, tmp_path):
+    experiment = build_experiment()
+    write_flow_experiment_toml_file(experiment, tmp_path / "experiment.toml")
+
+    loaded = experiment_from_toml(tmp_path / "experiment.toml")
+
+    check_round_trip(experiment, loaded)
+
+
+def test_binary_round_trip(build_experiment, tmp_path):
+    experiment = build_experiment()
+    flow_experiment_to_binary(experiment, tmp_path / "experiment.fcb")
+
+    loaded = experiment_from_binary(tmp_path / "experiment.fcb")
+
+    assert loaded.columnar
+    assert isinstance(loaded.flow_matrix, np.memmap)
+    assert loaded.stacked_profiles()[1] is loaded.flow_matrix
+
+    for s in experiment.syringes:
+        original = experiment.syringes[s]
+        syringe = loaded.syringes[s]
+        assert syringe.flow_unit == "µL/h"
+        assert syringe.concentration == original.concentration
+        assert np.array_equal(syringe.time, original.time)
+        assert np.array_equal(syringe.flow_profile, original.flow_profile)
+
+
+def test_binary_selected_syringes(build_experiment, tmp_path):
+    experiment = build_experiment()
+    flow_experiment_to_binary(experiment, tmp_path / "experiment.fcb")
+
+    loaded = experiment_from_binary(tmp_path / "experiment.fcb", syringes=["b"])
+
+    assert list(loaded.syringes) == ["b"]
+    assert np.array_equal(
+        loaded.syringes["b"].flow_profile, experiment.syringes["b"].flow_profile
+    )
+
+
+def test_experiments_from_config_file(tmp_path):
+    config = tmp_path / "plan.csv"
+    config.write_text(
+        "Experiment name,plan\n"
+        "Section Conditions,duration (min),A flow (µL/min),B flow (µL/min),"
+        "A concentration (mM),Reactor_volume (µL)\n"
+        "run_1,10,20,40,100,411\n"
+        "run_2,20,30,,50,411\n"
+        ",,,,,\n"
+        "Section Other,temperature (°C)\n"
+        "start,25\n",
+        encoding="utf-8",
+    )
+
+    name, sections = read_config_sections(config, SI_units=True)
+    assert name == "plan"
+    records = sections["Section Conditions"]
+    assert list(records["label"]) == ["run_1", "run_2"]
+    assert np.allclose(records["duration (s)"], [600, 1200])
+    assert np.isnan(records["B flow (L/s)"][1])
+    assert np.isclose(sections["Section Other"]["temperature (K)"][0], 298.15)
+
+    experiments = experiments_from_config_file(config, "Section Conditions")
+    assert [e.name for e in experiments] == ["run_1", "run_2"]
+
+    run_1 = experiments[0]
+    assert run_1.reactor_volume == 411
+    assert run_1.syringes["A"].concentration == 100
+    assert run_1.syringes["A"].conc_unit == "mM"
+    assert run_1.syringes["B"].step_profile.end == 10
+    assert np.array_equal(run_1.syringes["B"].flow_profile, [40])
+    assert np.isclose(run_1.total_dispensed_volume[-1], 600e-6)
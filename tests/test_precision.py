@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import Precision
+from FlowCalc.Utils.processing import minimise_steps
+from FlowCalc.Writers import flow_experiment_to_csv
+from FlowCalc.Writers import syringe_to_nfp
+
+# Steps of 10 s, sampled every 2 s.
+FLOW_PROFILES = [
+    np.repeat(200 + 100 * np.sin(np.arange(10) / (c + 1)), 5) for c in range(2)
+]
+
+
+@pytest.mark.parametrize(
+    "precision",
+    [Precision("float64"), Precision("float32"), Precision("fixed", 0.01, "int16")],
+)
+def test_error_bound(precision):
+    values = np.linspace(-300, 300, 1001)
+
+    error = np.abs(precision.round(values) - values)
+
+    assert np.all(error <= precision.error_bound(300))
+
+
+def test_syringe_storage():
+    syringe = Syringe("a")
+    syringe.set_precision(Precision("fixed", 0.01, "int16"))
+    syringe.set_flow_profile([0, 1, 2], "s", [0.031, 12.5, -3.0], "µL/h")
+
+    assert syringe.stored_flow_profile.dtype == np.int16
+    assert syringe.flow_profile.tolist() == [0.03, 12.5, -3.0]
+
+    # The decoded flow rates are a copy, so writing to them is an error.
+    with pytest.raises(ValueError):
+        syringe.flow_profile[0] = 1.0
+
+    syringe.set_precision(Precision("float32"))
+    assert syringe.flow_profile.dtype == np.float32
+
+    with pytest.raises(OverflowError):
+        syringe.set_precision(Precision("fixed", 0.0001, "int16"))
+    assert syringe.precision == Precision("float32")
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_experiment_precision(build_experiment, columnar):
+    reference = build_experiment(flow_profiles=FLOW_PROFILES, columnar=columnar)
+    experiment = build_experiment(
+        flow_profiles=FLOW_PROFILES, precision=Precision("float32"), columnar=columnar
+    )
+
+    for s in experiment.syringes:
+        assert experiment.syringes[s].flow_profile.dtype == np.float32
+    if columnar:
+        assert experiment.flow_matrix.dtype == np.float32
+
+    minimised = minimise_steps(experiment)
+    assert len(minimised.syringes["a"].time) == 11
+    assert minimised.syringes["a"].flow_profile.dtype == np.float32
+
+    bound = experiment.precision.error_bound(300 / 3.6e9)
+    assert np.allclose(
+        experiment.total_flow, reference.total_flow, rtol=0, atol=bound * 2
+    )
+
+
+def test_fixed_point_columnar(build_experiment):
+    experiment = build_experiment(flow_profiles=FLOW_PROFILES, columnar=True)
+    experiment.set_precision(Precision("fixed", 0.001))
+
+    assert experiment.flow_matrix.dtype == np.int32
+    time, matrix = experiment.stacked_profiles()
+    assert matrix.dtype == np.float64
+    assert np.array_equal(matrix[0], experiment.syringes["a"].flow_profile)
+    assert experiment._is_packed()
+
+    minimised = minimise_steps(experiment)
+    assert minimised.flow_matrix.dtype == np.int32
+    assert minimised.flow_matrix.shape == (2, 11)
+
+
+def test_writers_use_stored_precision(build_experiment, tmp_path):
+    experiment = build_experiment(
+        flow_profiles=FLOW_PROFILES, precision=Precision("float32")
+    )
+
+    flow_experiment_to_csv(experiment, tmp_path / "test.csv")
+    syringe_to_nfp(experiment.syringes["a"], tmp_path / "a.nfp")
+
+    row = (tmp_path / "test.csv").read_text().splitlines()[6].split(",")
+    assert row[1] == str(experiment.syringes["a"].flow_profile[5])
+    assert len(row[1]) < 12
+
+    line = (tmp_path / "a.nfp").read_text(encoding="cp1252").splitlines()[7]
+    assert float(line.split("\t")[1]) == float(row[1])
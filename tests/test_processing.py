@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils.processing import minimise_steps
+
+EXPERIMENT = dict(
+    time_axis=np.arange(0, 20, 2),
+    flow_profiles=[
+        np.array([1, 1, 1, 2, 2, 2, 2, 2, 2, 2], dtype=float),
+        np.array([5, 5, 5, 5, 5, 5, 3, 3, 3, 3], dtype=float),
+    ],
+)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_minimise_steps(build_experiment, columnar):
+    experiment = build_experiment(**EXPERIMENT, columnar=columnar)
+
+    minimised = minimise_steps(experiment)
+
+    assert minimised is not experiment
+    assert np.array_equal(minimised.syringes["a"].time, [0, 6, 12, 18])
+    assert np.array_equal(minimised.syringes["a"].flow_profile, [1, 2, 2, 2])
+    assert np.array_equal(minimised.syringes["b"].flow_profile, [5, 5, 3, 3])
+    # The last step still ends at 20 s.
+    assert np.array_equal(minimised.syringes["b"].timesteps, [6, 6, 6, 2])
+
+    # the original experiment is unchanged
+    assert len(experiment.syringes["a"].time) == 10
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_minimise_steps_keeps_duration_and_volume(build_experiment, columnar):
+    experiment = build_experiment(**EXPERIMENT, columnar=columnar)
+
+    minimised = minimise_steps(experiment)
+
+    assert minimised.timesteps_SI.sum() == experiment.timesteps_SI.sum() == 20
+    assert np.allclose(
+        minimised.total_dispensed_volume[-1], experiment.total_dispensed_volume[-1]
+    )
+    for s in experiment.syringes:
+        assert minimised.syringes[s].end_time() == 20
+
+
+def test_minimise_steps_inplace(build_experiment):
+    experiment = build_experiment(**EXPERIMENT)
+
+    minimised = minimise_steps(experiment, inplace=True)
+
+    assert minimised is experiment
+    assert len(experiment.syringes["b"].flow_profile) == 4
+
+
+def test_minimise_steps_tolerance(build_experiment):
+    experiment = build_experiment(**EXPERIMENT)
+    noise = np.array([0, 1e-12, -1e-12, 0, 1e-12, 0, 0, 0, -1e-12, 0])
+    experiment.syringes["a"].flow_profile = (
+        experiment.syringes["a"].flow_profile + noise
+    )
+
+    assert len(minimise_steps(experiment).syringes["a"].time) > 4
+    assert len(minimise_steps(experiment, tolerance=1e-9).syringes["a"].time) == 4
+
+
+def test_minimise_steps_shares_untruncated_arrays(build_experiment):
+    experiment = build_experiment(**EXPERIMENT)
+    experiment.syringes["a"].flow_profile = np.ones(10)
+    experiment.syringes["b"].flow_profile = np.arange(10.0)
+
+    minimised = minimise_steps(experiment)
+
+    assert minimised.syringes["b"].flow_profile is experiment.syringes["b"].flow_profile
+
+
+def test_minimise_steps_with_cycles():
+    # A single cycle of 6 s, run twice.
+    syringe_1 = Syringe("a")
+    syringe_1.set_flow_profile([0, 2, 4], "s", [1.0, 1.0, 2.0], "µL/h", cycles=2)
+
+    syringe_2 = Syringe("b")
+    flow_2 = np.array([5, 5, 5, 5, 3, 3], dtype=float)
+    syringe_2.set_flow_profile(np.arange(0, 12, 2), "s", flow_2, "µL/h")
+
+    experiment = FlowExperiment("test", [syringe_1, syringe_2])
+
+    minimised = minimise_steps(experiment)
+
+    a = minimised.syringes["a"]
+    assert a.cycles == 1
+    assert np.array_equal(a.time, [0, 4, 6, 8, 10])
+    assert np.array_equal(a.flow_profile, [1, 2, 1, 1, 2])
+    assert np.array_equal(a.timesteps, [4, 2, 2, 2, 2])
+    assert np.array_equal(minimised.syringes["b"].flow_profile, [5, 5, 5, 3, 3])
+
+    # the original experiment is unchanged
+    assert experiment.syringes["a"].cycles == 2
+    assert len(experiment.syringes["a"].time) == 3
+
+    syringe_2.time = np.arange(1, 13, 2)
+    with pytest.raises(ValueError):
+        minimise_steps(experiment)
@@ -0,0 +1,93 @@
+import numpy as np
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Utils.pump import PumpModel
+from FlowCalc.Utils.pump import check_pump_constraints
+from FlowCalc.Utils.pump import quantize_experiment
+
+EXPERIMENT = dict(
+    names=("A", "B"),
+    time_axis=[0.0, 60.0, 120.0, 120.5, 180.0],
+    flow_profiles=[[12.34, 0.2, 7.0, 5.0, 0.0], [1.0, 150.0, 1.0, 1.0, 1.0]],
+    flow_unit="µL/min",
+)
+
+
+def build_pump():
+    return PumpModel(
+        max_flow=100,
+        flow_unit="µL/min",
+        min_flow=0.5,
+        flow_resolution=0.1,
+        min_step_duration=1,
+        syringe_volume=100,
+        volume_unit="µL",
+    )
+
+
+def test_check_pump_constraints(build_experiment):
+    violations = check_pump_constraints(build_experiment(**EXPERIMENT), build_pump())
+
+    found = {(v.syringe, v.kind): list(v.indices) for v in violations}
+
+    assert found[("A", "min_flow")] == [1]
+    assert found[("A", "flow_resolution")] == [0]
+    assert found[("B", "max_flow")] == [1]
+    assert found[("A", "step_duration")] == [2]
+    # B pumps 150 µL in its second minute.
+    assert found[("B", "capacity")] == [1]
+    assert ("A", "capacity") not in found
+
+
+def test_quantize_experiment(build_experiment):
+    for columnar in (False, True):
+        experiment = build_experiment(**EXPERIMENT, columnar=columnar)
+        # The last step ends after 10.04 s rather than being held for 59.5 s.
+        for s in experiment.syringes:
+            experiment.syringes[s].timesteps = np.array([60, 60, 0.5, 59.5, 10.04])
+
+        quantized = quantize_experiment(experiment, build_pump())
+
+        # The original experiment is unchanged.
+        assert len(experiment.syringes["A"].time) == 5
+
+        # The 0.5 s step is absorbed into the step before it.
+        assert np.array_equal(quantized.syringes["A"].time, [0, 60, 120.5, 180])
+        assert np.allclose(quantized.syringes["A"].flow_profile, [12.3, 0, 5, 0])
+        assert np.allclose(quantized.syringes["B"].flow_profile, [1, 100, 1, 1])
+        for s in quantized.syringes:
+            assert np.allclose(quantized.syringes[s].timesteps, [60, 60.5, 59.5, 10])
+
+        kinds = {v.kind for v in check_pump_constraints(quantized, build_pump())}
+        assert kinds == {"capacity"}
+
+
+def test_syringes_on_different_time_axes():
+    syringe_a = Syringe("a")
+    syringe_a.set_flow_profile([0, 60, 120], "s", [10.0, 20.0, 30.0], "µL/min")
+    syringe_b = Syringe("b")
+    syringe_b.set_flow_profile(
+        [0, 30, 30.5, 120.5], "s", [1.0, 2.0, 3.0, 4.0], "µL/min"
+    )
+    experiment = FlowExperiment("test", syringe_set=[syringe_a, syringe_b])
+    pump = build_pump()
+
+    violations = check_pump_constraints(experiment, pump)
+
+    # Only b has a step shorter than 1 s.
+    found = {(v.syringe, v.kind): list(v.indices) for v in violations}
+    assert found == {("b", "step_duration"): [1]}
+
+    quantized = quantize_experiment(experiment, pump)
+
+    a = quantized.syringes["a"]
+    assert np.array_equal(a.time, [0, 60, 120])
+    assert np.array_equal(a.timesteps, [60, 60, 60])
+    assert np.allclose(a.flow_profile, [10, 20, 30])
+
+    # b's 0.5 s step is absorbed into the step before it, and its last step
+    # still ends at 210.5 s.
+    b = quantized.syringes["b"]
+    assert np.array_equal(b.time, [0, 30.5, 120.5])
+    assert np.array_equal(b.timesteps, [30.5, 90, 90])
+    assert np.allclose(b.flow_profile, [1, 3, 4])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from FlowCalc.Utils.simulation import inlet_concentrations
+from FlowCalc.Utils.simulation import plug_flow_outlet
+from FlowCalc.Utils.simulation import tanks_in_series_outlet
+
+TIME_AXIS = np.arange(0, 600, 1.0)
+
+# Two syringes, 60 µL/min in total, into a 100 µL reactor. The reagent
+# syringe is switched on after 60 s.
+EXPERIMENT = dict(
+    names=("reagent", "solvent"),
+    time_axis=TIME_AXIS,
+    flow_profiles=[np.where(TIME_AXIS < 60, 0, 30), np.where(TIME_AXIS < 60, 60, 30)],
+    flow_unit="µL/min",
+    concentrations=[1.0, 0.0],
+    reactor_volume=100,
+)
+
+
+def test_inlet_concentrations(build_experiment):
+    inlet = inlet_concentrations(build_experiment(**EXPERIMENT))
+
+    assert np.all(inlet["reagent"][:60] == 0)
+    assert np.allclose(inlet["reagent"][60:], 0.5)
+
+
+def test_plug_flow_outlet(build_experiment):
+    time, outlet = plug_flow_outlet(
+        build_experiment(**EXPERIMENT), time=[50, 99, 101, 159, 161]
+    )
+
+    # The reactor holds 100 s of flow; the reagent enters at 60 s.
+    assert np.all(np.isnan(outlet["reagent"][:2]))
+    assert np.allclose(outlet["reagent"][2:], [0, 0, 0.5])
+
+
+def test_cstr_outlet(build_experiment):
+    time = np.array([60, 160, 260, 400])
+    time, outlet = tanks_in_series_outlet(
+        build_experiment(**EXPERIMENT), n_tanks=1, time=time
+    )
+
+    # Washout towards the inlet concentration with a 100 s time constant.
+    expected = 0.5 * (1 - np.exp(-(time - 60) / 100))
+    assert np.allclose(outlet["reagent"], expected, atol=5e-3)
+
+
+def test_many_tanks_approach_plug_flow(build_experiment):
+    time = np.array([120, 200])
+    _, outlet = tanks_in_series_outlet(
+        build_experiment(**EXPERIMENT), n_tanks=200, time=time
+    )
+
+    assert outlet["reagent"] == pytest.approx([0, 0.5], abs=1e-2)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import StepProfile
+
+
+def test_from_dense_round_trip():
+    time = np.arange(0, 20, 2)
+    flow = np.array([1, 1, 1, 2, 2, 2, 2, 5, 5, 5], dtype=float)
+
+    step_profile = StepProfile.from_dense(time, flow)
+
+    assert np.array_equal(step_profile.breakpoints, [0, 6, 14])
+    assert np.array_equal(step_profile.values, [1, 2, 5])
+    assert np.array_equal(step_profile.durations, [6, 8, 6])
+    assert np.array_equal(step_profile.sample(time), flow)
+
+
+def test_sample_outside_profile():
+    step_profile = StepProfile([10, 20], [1.0, 2.0], end=30)
+
+    flow = step_profile.sample([0, 10, 25, 30, 40])
+
+    assert np.array_equal(flow, [0, 1, 2, 0, 0])
+
+
+def test_concatenate():
+    first = StepProfile([0, 10], [1.0, 2.0], end=20)
+    second = StepProfile([0], [3.0], end=5)
+
+    joined = first.concatenate(second).scaled(2)
+
+    assert np.array_equal(joined.breakpoints, [0, 10, 20])
+    assert np.array_equal(joined.values, [2, 4, 6])
+    assert joined.end == 25
+
+
+def test_invalid_breakpoints():
+    with pytest.raises(ValueError):
+        StepProfile([0, 0, 1], [1, 2, 3])
+
+
+def test_syringe_step_profile():
+    syringe = Syringe("a")
+    syringe.set_flow_profile(np.arange(0, 10), "s", np.repeat([1.0, 3.0], 5), "µL/h")
+
+    syringe.compress()
+
+    assert syringe.step_profile is not None
+    assert np.array_equal(syringe.time, [0, 5])
+    assert np.array_equal(syringe.timesteps, [5, 5])
+    assert np.array_equal(syringe.sample_flow_profile([4, 5]), [1, 3])
+
+    # assigning a dense array replaces the step profile
+    syringe.flow_profile = np.array([7.0, 8.0])
+    assert syringe.step_profile is None
+    assert np.array_equal(syringe.time, [0, 5])
+
+
+def test_repeat_and_repeating_steps():
+    cycle = StepProfile([0, 10, 15], [1.0, 2.0, 3.0], end=30)
+
+    step_profile = cycle.repeat(3)
+
+    assert step_profile.end == 90
+    assert np.array_equal(step_profile.breakpoints, [0, 10, 15, 30, 40, 45, 60, 70, 75])
+    assert step_profile.repeating_steps() == 3
+    assert cycle.repeating_steps() == 3
+
+
+def test_fold_cycles():
+    time_axis = np.arange(0, 120, 2.0)
+    flow_rates = 200 + 100 * np.sin(2 * np.pi * time_axis / 30)
+
+    syringe = Syringe("a")
+    syringe.set_flow_profile(time_axis, "s", flow_rates, "µL/h")
+
+    assert syringe.fold_cycles(tolerance=1e-9) == 4
+    assert syringe.cycles == 4
+    assert len(syringe.flow_profile) == 15
+    assert syringe.end_time() == 120
+    assert np.allclose(syringe.sample_flow_profile(time_axis), flow_rates)
+
+    syringe.set_flow_profile(time_axis, "s", flow_rates, "µL/h")
+    assert syringe.fold_cycles(period=60, tolerance=1e-9) == 2
+    assert len(syringe.flow_profile) == 30
+
+    syringe.set_flow_profile(time_axis, "s", flow_rates, "µL/h")
+    with pytest.raises(ValueError):
+        syringe.fold_cycles(period=20, tolerance=1e-9)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from FlowCalc.Utils import units
+from FlowCalc.Utils.conversions import SI_conversions
+
+
+@pytest.mark.parametrize(
+    "unit, scale, si_unit",
+    [
+        ("µL", 1e-6, "L"),
+        ("ml", 1e-3, "L"),
+        ("h", 3600.0, "s"),
+        ("mM", 1e-3, "M"),
+        ("μl/h", 1e-6 / 3600, "L/s"),
+        ("nL/min", 1e-9 / 60, "L/s"),
+        ("mL/day", 1e-3 / 86400, "L/s"),
+        ("mmol/L", 1e-3, "mol/L"),
+    ],
+)
+def test_parse_unit(unit, scale, si_unit):
+    parsed = units.parse_unit(unit)
+
+    assert parsed.scale == pytest.approx(scale)
+    assert parsed.offset == 0.0
+    assert parsed.si_unit == si_unit
+
+
+def test_unknown_unit():
+    with pytest.raises(ValueError):
+        units.parse_unit("furlong/fortnight")
+
+    assert "furlong" not in SI_conversions
+
+
+def test_to_SI_into_buffer():
+    values = np.array([60.0, 120.0])
+    out = np.empty(2)
+
+    result = units.to_SI(values, "µL/min", out=out)
+
+    assert result is out
+    assert np.allclose(out, [1e-6, 2e-6])
+
+
+def test_convert_with_offset():
+    assert units.convert(25.0, "°C", "K") == pytest.approx(298.15)
+    assert units.convert(1.0, "mL/min", "μL/h") == pytest.approx(60000.0)
+
+    with pytest.raises(ValueError):
+        units.convert(1.0, "mL", "s")
+
+
+def test_SI_conversions_compatibility():
+    conversion, si_unit = SI_conversions["mL/min"]
+
+    assert si_unit == "L/s"
+    assert conversion(60.0) == pytest.approx(1e-3)
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from FlowCalc.Classes import Syringe
+from FlowCalc.Utils.waveforms import Constant
+from FlowCalc.Utils.waveforms import LogSweep
+from FlowCalc.Utils.waveforms import Ramp
+from FlowCalc.Utils.waveforms import Sine
+from FlowCalc.Utils.waveforms import Square
+from FlowCalc.Utils.waveforms import Step
+from FlowCalc.Utils.waveforms import Waveform
+from FlowCalc.Utils.waveforms import concatenate
+
+
+def test_sequence_matches_manual_profile():
+    waveform = concatenate(Constant(10, 60), Ramp(10, 70, 60), Constant(0, 30)) * 2
+
+    time, values = waveform.to_grid(1.0)
+
+    expected = np.concatenate((np.full(60, 10.0), 10 + np.arange(60.0), np.zeros(30)))
+    assert waveform.duration == 150
+    assert np.array_equal(time, np.arange(150.0))
+    assert np.allclose(values, 2 * expected)
+
+    # Zero outside of the waveform.
+    assert np.array_equal(waveform.sample([-1, 150]), [0, 0])
+
+
+def test_sine_from_limits_and_sum():
+    waveform = Sine.from_limits(30, 10, 40, 80) + 5
+
+    _, values = waveform.to_grid(0.5)
+
+    assert np.isclose(values.max(), 35)
+    assert np.isclose(values.min(), 15)
+
+
+def test_log_sweep_frequency():
+    sweep = LogSweep(1, 0, 100, 10, 1000)
+    time = np.arange(0, 1000, 0.01)
+    values = sweep.sample(time)
+
+    # Local period from the spacing of upward zero crossings.
+    crossings = time[1:][(values[:-1] < 0) & (values[1:] >= 0)]
+    periods = np.diff(crossings)
+
+    # The frequency rises continuously from 1 / 100 to 1 / 10.
+    assert np.all(np.diff(periods) < 0)
+    assert 50 < periods[0] < 100
+    assert np.isclose(periods[-1], 10, rtol=0.05)
+
+    # Equal periods give a plain sine wave.
+    constant = LogSweep(2, 1, 50, 50, 200)
+    assert np.allclose(constant.sample(time[:20000]), Sine(2, 1, 50, 200)(time[:20000]))
+
+
+def test_piecewise_constant_to_step_profile():
+    waveform = Step(0, 5, 10, 40).then(Square(8, 2, 20, 40, duty=0.25))
+
+    step_profile = waveform.to_step_profile()
+
+    assert np.array_equal(step_profile.breakpoints, [0, 10, 40, 45, 60, 65])
+    assert np.array_equal(step_profile.values, [0, 5, 8, 2, 8, 2])
+    assert step_profile.end == 80
+
+    time = np.arange(80.0)
+    assert np.array_equal(step_profile.sample(time), waveform.sample(time))
+
+
+@pytest.mark.parametrize(
+    "square, n_periods",
+    [(Square(2, 1, 3, 30, duty=0.1), 10), (Square(2, 1, 0.1, 1.0), 10)],
+)
+def test_square_to_step_profile_with_rounding(square, n_periods):
+    step_profile = square.to_step_profile()
+
+    assert np.array_equal(step_profile.values, [2, 1] * n_periods)
+    assert np.allclose(step_profile.durations[1::2], (1 - square.duty) * square.period)
+
+
+def test_set_waveform_on_syringe():
+    syringe = Syringe("A")
+
+    syringe.set_waveform(Constant(1, 10).then(Constant(2, 10)), "s", "µL/min")
+    assert syringe.step_profile is not None
+    assert np.array_equal(syringe.flow_profile, [1, 2])
+
+    syringe.set_waveform(Ramp(0, 10, 10), "s", "µL/min", timestep=1.0)
+    assert syringe.step_profile is None
+    assert np.array_equal(syringe.time, np.arange(10.0))
+    assert np.allclose(syringe.flow_profile, np.arange(10.0))
+
+    with pytest.raises(ValueError):
+        syringe.set_waveform(Ramp(0, 10, 10), "s", "µL/min")
+
+
+def test_waveform_requires_evaluate():
+    class Incomplete(Waveform):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,246 @@
+import io
+import os
+import numpy as np
+import pytest
+from FlowCalc.Classes import Syringe
+from FlowCalc.Classes import FlowExperiment
+from FlowCalc.Classes import Precision
+from FlowCalc.Writers import flow_experiment_to_csv
+from FlowCalc.Writers import flow_experiment_to_labm8
+from FlowCalc.Writers import flow_experiment_to_nfp
+from FlowCalc.Writers import syringe_to_nfp
+from FlowCalc.Writers import write_flow_experiment_conditions_file
+from FlowCalc.Writers import export_experiment
+from FlowCalc.Writers import NumberFormat
+from FlowCalc.Writers.export import stale_outputs
+from FlowCalc.Utils.hashing import syringe_hash
+from FlowCalc.Utils.processing import minimise_steps
+
+
+@pytest.mark.parametrize("writer", [flow_experiment_to_csv, flow_experiment_to_labm8])
+def test_chunk_size_does_not_change_output(build_experiment, tmp_path, writer):
+    experiment = build_experiment(names=("a", "b", "c"))
+
+    writer(experiment, tmp_path / "whole.csv")
+    writer(experiment, tmp_path / "chunked.csv", chunk_size=7)
+
+    whole = (tmp_path / "whole.csv").read_text(encoding="utf-8")
+    chunked = (tmp_path / "chunked.csv").read_text(encoding="utf-8")
+
+    assert whole == chunked
+    assert len(whole.splitlines()) == 51
+
+
+def test_labm8_volume_column(build_experiment, tmp_path):
+    experiment = build_experiment(names=("a", "b", "c"))
+
+    flow_experiment_to_labm8(experiment, tmp_path / "labm8.csv")
+
+    data = np.loadtxt(tmp_path / "labm8.csv", delimiter=",", skiprows=1)
+
+    # μL/min multiplied by a 2 s (1/30 min) period
+    assert np.allclose(data[:-1, 0], data[:-1, 1:].sum(axis=1) / 30)
+    assert data[-1, 0] == 0.0
+
+
+def test_conditions_file_to_stream(build_experiment, tmp_path):
+    experiment = build_experiment(names=("a", "b", "c"))
+
+    stream = io.StringIO()
+    write_flow_experiment_conditions_file(experiment, stream, chunk_size=7)
+    write_flow_experiment_conditions_file(experiment, tmp_path / "conditions.csv")
+
+    text = (tmp_path / "conditions.csv").read_text(encoding="utf-8")
+    assert stream.getvalue() == text
+
+    rows = {l.split(",")[0]: l.split(",")[1:] for l in text.splitlines()}
+    assert len(rows["flow_profile_time/ s"]) == 51
+    assert float(rows["a_flow/ L/s"][0]) == pytest.approx(200e-6 / 3600)
+
+
+def test_experiment_to_nfp(build_experiment, tmp_path):
+    experiment = build_experiment(names=("a", "b", "c"))
+
+    manifest = flow_experiment_to_nfp(experiment, tmp_path / "nfp", max_workers=2)
+
+    assert list(manifest) == ["a", "b", "c"]
+
+    lines = open(manifest["b"], encoding="cp1252").read().splitlines()
+    assert lines[:2] == ["µl/h", "1"]
+    assert len(lines) == 52
+    assert lines[2].split("\t")[0] == "2000"
+
+
+def nfp_duration(path):
+    lines = open(path, encoding="cp1252").read().splitlines()
+    return sum(int(line.split("\t")[0]) for line in lines[2:])
+
+
+def test_nfp_duration_after_minimise_steps(build_experiment, tmp_path):
+    experiment = build_experiment(flow_profiles=[np.full(50, 1000.0)] * 2)
+    flow_experiment_to_nfp(experiment, tmp_path / "dense")
+
+    minimised = minimise_steps(experiment)
+    assert np.array_equal(minimised.syringes["a"].timesteps, [98, 2])
+    manifest = flow_experiment_to_nfp(minimised, tmp_path / "minimised")
+
+    assert nfp_duration(manifest["a"]) == 100000
+    assert nfp_duration(manifest["a"]) == nfp_duration(
+        tmp_path / "dense" / os.path.basename(manifest["a"])
+    )
+
+
+def test_incremental_export(build_experiment, tmp_path):
+    experiment = build_experiment(names=("a", "b", "c"))
+
+    paths = export_experiment(experiment, tmp_path, incremental=True)
+    assert stale_outputs(experiment, tmp_path) == []
+
+    def modified_times():
+        return {output: os.stat(paths[output]).st_mtime_ns for output in paths}
+
+    # Mark the files so that rewrites can be detected.
+    for path in paths.values():
+        os.utime(path, ns=(0, 0))
+
+    export_experiment(experiment, tmp_path, incremental=True)
+    assert set(modified_times().values()) == {0}
+
+    # Concentrations and the reactor volume only appear in the conditions
+    # file.
+    experiment.syringes["b"].set_concentration(0.5, "M")
+    experiment.reactor_volume = 500
+    assert stale_outputs(experiment, tmp_path) == ["conditions"]
+
+    flow_rates = np.asarray(experiment.syringes["c"].flow_profile) * 2
+    experiment.syringes["c"].set_flow_profile(
+        experiment.syringes["c"].time, "s", flow_rates, "µL/h"
+    )
+    assert set(stale_outputs(experiment, tmp_path)) == {
+        "conditions",
+        "csv",
+        "labm8",
+        "nfp:c",
+    }
+
+    export_experiment(experiment, tmp_path, incremental=True)
+    rewritten = {output for output, t in modified_times().items() if t != 0}
+    assert rewritten == {"conditions", "csv", "labm8", "nfp:c"}
+
+    # No temporary files are left behind.
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+
+def test_syringe_hash_ignores_storage(build_experiment):
+    experiment = build_experiment(names=("a", "b", "c"))
+    hashes = {s: syringe_hash(experiment.syringes[s]) for s in experiment.syringes}
+
+    experiment.make_columnar()
+    assert hashes == {
+        s: syringe_hash(experiment.syringes[s]) for s in experiment.syringes
+    }
+    assert len(set(hashes.values())) == 3
+
+
+def test_syringe_hash_includes_precision(build_experiment):
+    syringe = build_experiment(names=("a", "b", "c")).syringes["a"]
+    reference = syringe_hash(syringe)
+
+    # float32 storage changes the written text of the flow rates.
+    syringe.set_precision(Precision("float32"))
+    float32 = syringe_hash(syringe)
+    assert float32 != reference
+
+    syringe.set_precision(Precision("fixed", 0.01))
+    assert syringe_hash(syringe) not in (reference, float32)
+
+
+def test_cycles_in_outputs(build_experiment, tmp_path):
+    experiment = build_experiment(names=("a", "b", "c"))
+    experiment.syringes["a"].set_cycles(2)
+
+    manifest = flow_experiment_to_nfp(experiment, tmp_path / "nfp")
+
+    lines = open(manifest["a"], encoding="cp1252").read().splitlines()
+    assert lines[1] == "2"
+    assert len(lines) == 52
+
+    flow_experiment_to_csv(experiment, tmp_path / "cycles.csv")
+    data = np.loadtxt(tmp_path / "cycles.csv", delimiter=",", skiprows=1)
+
+    # Both cycles of syringe a are written. The other syringes have stopped
+    # after the first.
+    assert len(data) == 100
+    assert data[-1, 0] == pytest.approx(198)
+    assert np.all(data[data[:, 0] >= 100, 2:] == 0)
+
+
+def test_number_format():
+    values = np.array([2.777777777777778e-07, 1 / 3, 200.0, -1.5])
+
+    assert (
+        NumberFormat().format(values)
+        == "2.777777777777778e-07,0.3333333333333333,200.0,-1.5,"
+    )
+    assert (
+        NumberFormat(significant_digits=4).format(values)
+        == "2.778e-07,0.3333,200,-1.5,"
+    )
+    assert NumberFormat(decimals=2).format(values, " ") == "0.00 0.33 200.00 -1.50 "
+
+    with pytest.raises(ValueError):
+        NumberFormat(significant_digits=3, decimals=2)
+    with pytest.raises(ValueError):
+        NumberFormat(significant_digits=0)
+
+
+def test_number_format_in_writers(build_experiment, tmp_path):
+    experiment = build_experiment(names=("a", "b", "c"))
+    number_format = NumberFormat(significant_digits=6)
+
+    write_flow_experiment_conditions_file(experiment, tmp_path / "default.csv")
+    write_flow_experiment_conditions_file(
+        experiment, tmp_path / "short.csv", number_format=number_format
+    )
+    default = (tmp_path / "default.csv").read_text(encoding="utf-8")
+    short = (tmp_path / "short.csv").read_text(encoding="utf-8")
+    assert len(short) < 0.6 * len(default)
+
+    rows = {l.split(",")[0]: l.split(",")[1:-1] for l in short.splitlines()}
+    assert rows["a_flow/ L/s"][0] == "5.55556e-08"
+
+    paths = export_experiment(
+        experiment, tmp_path / "out", incremental=True, number_format=number_format
+    )
+    nfp_lines = open(paths["nfp:a"], encoding="cp1252").read().splitlines()
+    assert nfp_lines[3] == "2000\t 290.93\t255"
+    data = np.loadtxt(paths["csv"], delimiter=",", skiprows=1)
+    assert data[1, 1] == 290.93
+
+    # Changing the number format rewrites the text outputs.
+    assert (
+        stale_outputs(experiment, tmp_path / "out", number_format=number_format) == []
+    )
+    assert len(stale_outputs(experiment, tmp_path / "out")) == 6
+
+
+def test_text_formats(tmp_path):
+    syringe = Syringe("a")
+    syringe.set_flow_profile(np.array([0, 2, 4]), "s", [1.5, 2.0, 2.5], "µL/h")
+    experiment = FlowExperiment("test", [syringe])
+    experiment.reactor_volume = 1
+    experiment.reactor_volume_unit = "µL"
+
+    # Step durations are whole ms.
+    syringe_to_nfp(syringe, tmp_path / "a.nfp")
+    lines = (tmp_path / "a.nfp").read_text(encoding="cp1252").splitlines()
+    assert lines[2:] == ["2000\t 1.5\t255", "2000\t 2.0\t255", "2000\t 2.5\t255"]
+
+    # Integer times in seconds are written as integers.
+    flow_experiment_to_csv(experiment, tmp_path / "a.csv")
+    lines = (tmp_path / "a.csv").read_text().splitlines()
+    assert lines[1:] == ["0,1.5", "2,2.0", "4,2.5"]
+
+    write_flow_experiment_conditions_file(experiment, tmp_path / "conditions.csv")
+    text = (tmp_path / "conditions.csv").read_text(encoding="utf-8")
+    assert "flow_profile_time/ s,0,2,4,\n" in text